@@ -0,0 +1,59 @@
+"""
+Bytes and encode time per encoder profile for typical leaderboard pages.
+
+    python benchmarks/leaderboard_encoders.py [--pages 20] [--level 6]
+
+Pages are drawn with render.leaderboard.draw_leaderboard from 5 rows with
+noisy gradient avatar tiles (photos compress worse than flat colour).
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+from render.avatars import circle_mask  # noqa: E402
+from render.encoders import PROFILES  # noqa: E402
+from render.leaderboard import AVATAR_SIZE, draw_leaderboard  # noqa: E402
+
+
+def fake_tile(seed: int) -> Image.Image:
+    rng = random.Random(seed)
+    base = Image.linear_gradient("L").resize((AVATAR_SIZE, AVATAR_SIZE)).rotate(rng.randint(0, 359))
+    noise = Image.effect_noise((AVATAR_SIZE, AVATAR_SIZE), 40)
+    tile = Image.merge("RGB", (base, noise, Image.new("L", base.size, rng.randint(0, 255)))).convert("RGBA")
+    tile.putalpha(circle_mask(AVATAR_SIZE))
+    return tile
+
+
+def pages(count: int) -> list[Image.Image]:
+    out = []
+    for p in range(count):
+        rows = [
+            (p * 5 + i, f"Member number {p * 5 + i}", random.randint(1, 80), random.randint(0, 50_000), fake_tile(p * 5 + i))
+            for i in range(1, 6)
+        ]
+        out.append(draw_leaderboard(rows, "Level"))
+    return out
+
+
+def main(count: int, level: int):
+    images = pages(count)
+    print(f"{count} pages, {images[0].width}x{images[0].height}, compress level {level}")
+    print(f"{'profile':<15} {'avg bytes':>10} {'avg ms':>8}")
+    for name, profile in PROFILES.items():
+        started = time.perf_counter()
+        sizes = [len(profile.encode(img, level)) for img in images]
+        elapsed = (time.perf_counter() - started) / count * 1000
+        print(f"{name:<15} {sum(sizes) / count:>10,.0f} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard image encoders")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--level", type=int, default=6, help="compression level 0-9")
+    args = parser.parse_args()
+    main(args.pages, args.level)
@@ -0,0 +1,79 @@
+"""
+Rows/sec for building media models from DB rows.
+
+    python benchmarks/model_hydration.py [--rows 20000] [--repeat 5]
+
+Rows mimic what asyncpg hands back: dates as `date`, JSONB as `str`.
+`from_rows` is timed alongside the per-row `from_db` loop when the models have it.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import Movie, Series, UserMedia  # noqa: E402
+
+EPISODE = {"episode_number": 4, "season_number": 2, "name": "Episode", "air_date": "2024-03-01", "overview": "...", "still_path": None}
+SEASONS = [{"season_number": n, "episode_count": 10} for n in range(0, 6)]
+
+
+def movie_rows(n: int) -> list[dict]:
+    return [{
+        "id": i, "title": f"Movie {i}", "tmdb_id": 1000 + i, "overview": "An overview " * 10,
+        "poster_path": "/poster.jpg", "status": "Released", "homepage": None,
+        "release_date": date(2020, 1, 1 + i % 28), "collection": None,
+    } for i in range(n)]
+
+
+def series_rows(n: int) -> list[dict]:
+    return [{
+        "id": i, "title": f"Series {i}", "tmdb_id": 2000 + i, "overview": "An overview " * 10,
+        "poster_path": "/poster.jpg", "status": "Returning Series", "homepage": None,
+        "release_date": date(2019, 5, 1), "first_air_date": date(2019, 5, 1), "last_air_date": "2024-03-01",
+        "number_of_episodes": 50, "number_of_seasons": 5, "in_production": True,
+        "last_episode_to_air": json.dumps(EPISODE), "next_episode_to_air": json.dumps(EPISODE),
+        "seasons": json.dumps(SEASONS),
+    } for i in range(n)]
+
+
+def user_media_rows(n: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": i, "media_type": "series" if i % 2 else "movies", "title": f"Title {i}", "tmdb_id": 3000 + i,
+        "overview": "An overview " * 10, "poster_path": "/poster.jpg", "media_status": "Returning Series",
+        "release_date": date(2021, 1, 1), "user_status": "watching", "user_progress": json.dumps({"season": 2, "episode": 3}),
+        "last_updated": now, "last_episode_info": json.dumps(EPISODE), "next_episode_info": json.dumps(EPISODE),
+        "seasons": json.dumps(SEASONS), "total_count": n,
+    } for i in range(n)]
+
+
+def best_rate(fn, rows: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+def main(n: int, repeat: int):
+    cases = [("Movie", Movie, movie_rows(n)), ("Series", Series, series_rows(n)), ("UserMedia", UserMedia, user_media_rows(n))]
+    print(f"{'model':<10} {'method':<10} {'rows/sec':>12}")
+    for name, model, rows in cases:
+        methods = [("from_db", lambda rs, m=model: [m.from_db(r) for r in rs])]
+        if hasattr(model, "from_rows"):
+            methods.append(("from_rows", model.from_rows))
+        for method, fn in methods:
+            print(f"{name:<10} {method:<10} {best_rate(fn, rows, repeat):>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark media model hydration")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -5,6 +5,15 @@ from rimiru import Rimiru
 from settings import *
 from handle import handler
 from dbmanager.MovieManager import MovieManager
+from dispatch import outbox
+from dbmanager.WatcherIndex import watcher_index
+from dbmanager.RankIndex import rank_index
+from dbmanager import LevelinManager
+from render.pool import render_service
+from render import fonts
+from render.avatars import avatar_cache
+from render.page_cache import page_cache
+from views.LeaderboardPage import LeaderboardButton
 # Logging setup
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger("Ouroboros")
@@ -33,6 +42,11 @@ class Client(commands.Bot):
         await self.load_commands()
         await self.load_cogs()
         self.add_listener(self.on_interaction, "on_interaction") 
+        outbox.start(self)
+        watcher_index.start()
+        rank_index.start()
+        await LevelinManager.load_level_curves()
+        self.add_dynamic_items(LeaderboardButton)  # leaderboard buttons from any earlier run
         handler.log_task("BOT", "Loaded commands and cogs", level="SUCCESS")
 
         if not self.synced:
@@ -43,7 +57,14 @@ class Client(commands.Bot):
             except Exception as e:
                 handler.log_task("BOT", f"Failed to sync slash commands: {e}", level="ERROR")
                 await self.close()
-   
+
+    async def close(self):
+        render_service.shutdown()
+        handler.log_task("RENDER", f"[RENDER] Avatar cache: {avatar_cache.stats()}", level="Info")
+        handler.log_task("RENDER", f"[RENDER] Page cache: {page_cache.stats()}", level="Info")
+        if render_service.kind == "thread":  # process workers keep their own text caches
+            handler.log_task("RENDER", f"[RENDER] Text cache: {fonts.cache_info()}", level="Info")
+        await super().close()
    
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -133,32 +154,27 @@ class Client(commands.Bot):
         await self.change_presence(activity=discord.Game(name="Eternal loop"))
         handler.log_task("BOT", "Ouroboros is ready", level="SUCCESS")
         
-        inphinithy = self.get_user(ALLOWED_ID[0])
-        if inphinithy:
-            try:
-                embed = discord.Embed(
-                    title="Ouroboros Startup",
-                    description="The bot has successfully started and is ready to serve!",
-                    color=discord.Color.green(),
-                    timestamp=discord.utils.utcnow()
-                )
-                embed.add_field(
-                    name="Admin Commands",
-                    value=(
-                        "`$nuke` — leave all guilds\n"
-                        "`$sync` — sync slash commands\n"
-                        "`$clearcache` — clear user cache\n"
-                        "`$reminders` — restart reminder loops"
-                    ),
-                    inline=False
-                )
-                await inphinithy.send("Ouroboros is now online! Here's a summary of the admin commands:")
-                await inphinithy.send(embed=embed)
-                handler.log_task("BOT", "Startup DM sent to creator", level="SUCCESS")
-            except Exception as e:
-                handler.error_handle(e, context="on_ready startup DM")
-        else:
-            handler.log_task("BOT", "Creator user not found, cannot send startup DM", level="WARNING")
+        try:
+            embed = discord.Embed(
+                title="Ouroboros Startup",
+                description="The bot has successfully started and is ready to serve!",
+                color=discord.Color.green(),
+                timestamp=discord.utils.utcnow()
+            )
+            embed.add_field(
+                name="Admin Commands",
+                value=(
+                    "`$nuke` — leave all guilds\n"
+                    "`$sync` — sync slash commands\n"
+                    "`$clearcache` — clear user cache\n"
+                    "`$reminders` — restart reminder loops"
+                ),
+                inline=False
+            )
+            await outbox.enqueue(ALLOWED_ID[0], content="Ouroboros is now online! Here's a summary of the admin commands:", embeds=[embed])
+            handler.log_task("BOT", "Startup DM queued for creator", level="SUCCESS")
+        except Exception as e:
+            handler.error_handle(e, context="on_ready startup DM")
        
 
   
@@ -11,8 +11,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from views.LeaderboardPage import LeaderboardPaginationView  
-from io import BytesIO
+from views.LeaderboardPage import build_page, games_kind
 from dbmanager import Games
 from constants import gameType
 from handle import handler
@@ -37,58 +36,18 @@ class Leaderboard(commands.Cog):
         await interaction.response.defer()
         
         try:
-            rows = None
             game_type_obj = gameType.find_game_type(game_type) 
-            if game_type_obj:
-                rows = await Games.get_leaderboard(interaction.guild.id, game_type_obj)  #type: ignore
-            else:
-                # Fetch overall leaderboard
-                rows = await Games.get_leaderboard(interaction.guild.id) #type: ignore
-            # Process rows into a list of (user_id, total_score)
-            rows = [(row['user_id'], row['total_score']) for row in rows]
-            if not rows:
+            result = await build_page(interaction.guild, games_kind(game_type_obj)) #type: ignore
+            if result is None:
                 if game_type_obj:
                     await interaction.followup.send(f"No leaderboard available for {game_type_obj.value}.")
                 else:
                     await interaction.followup.send("No leaderboard available.")
                 return
-            # Build leaderboard data with member info
-            leaderboard_data = []
-            for idx, (player_id, score) in enumerate(rows, start=1):
-                member = interaction.guild.get_member(player_id) # Get the member object #type: ignore
-                if member:
-                    avatar = await member.display_avatar.read()
-                    leaderboard_data.append((idx, member.display_name, score, 0, avatar))  # rank, username, score, placeholder, avatar bytes
-            
-            if not leaderboard_data:
-                await interaction.followup.send("No active players found on the leaderboard.")
-                return
-
-            # Create pagination view
-            pagination_view = LeaderboardPaginationView(
-                data=leaderboard_data, sep=5, timeout=None,text="Score" 
-            )
-            
-            # Generate the first page's image
-            page_data = pagination_view.get_current_page_data()
-            img = pagination_view.generate_leaderboard_image(page_data)
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-
-            # Prepare discord file
-            discord_file = discord.File(buffer, filename="leaderboard.png")
-
-            # Create embed
-            embed = discord.Embed(
-                title=f"🏆 Leaderboard Page {pagination_view.current_page}/{pagination_view.get_total_pages()}",
-                color=discord.Color.gold()
-            )
-            embed.set_image(url="attachment://leaderboard.png")
-            embed.set_footer(text="Use the buttons below to navigate pages.")
 
-            # Send initial message and store it
-            pagination_view.message = await interaction.followup.send(
+            # Send the first page; the buttons carry everything needed for the others
+            embed, discord_file, pagination_view = result
+            await interaction.followup.send(
                 embed=embed,
                 file=discord_file,
                 view=pagination_view
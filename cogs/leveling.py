@@ -3,8 +3,8 @@ from discord import app_commands
 from discord.ext import commands
 from dbmanager import LevelinManager
 from handle import handler
-from views.LeaderboardPage import LeaderboardPaginationView
-from io import BytesIO
+from leveling_curve import curves
+from views.LeaderboardPage import build_page, levels_kind, render_rank_card
 
 class Levelling(commands.Cog):
     def __init__(self, client):
@@ -21,27 +21,19 @@ class Levelling(commands.Cog):
             user_id = message.author.id
             # Fetch the user's XP and level, or initialize them
             xp, level = await LevelinManager.get_user_level(guild_id, user_id)
-            if not xp or not level:
+            if xp is None or level is None:
                 xp, level = 0, 1 #realistically if only one is None, the other should be as well or there is a data inconsistency
                 
                 await LevelinManager.insert_or_update_user(guild_id, user_id, xp, level)
             # Add XP and check for level up
-            
-            xp += 5  # Customize the XP per message
+            previous = level
+            level, xp = curves.for_guild(guild_id).advance(level, xp, 5)  # Customize the XP per message
 
-            def level_up_xp(level, base_xp=100, growth_factor=1.15):
-                """
-                Calculate the XP needed to level up, with a progressive increase.
-                """
-                return int(base_xp * (growth_factor ** (level - 1)))
-
-            while xp >= level_up_xp(level):
-                xp -= level_up_xp(level)  # Deduct XP required for current level
-                level += 1
+            for reached in range(previous + 1, level + 1):
                 embed = discord.Embed(
                 title="🎉 Level Up!",
                 description=(
-                    f"Congratulations **{message.author.mention}**!\n You reached **Level {level}**.\n\n "
+                    f"Congratulations **{message.author.mention}**!\n You reached **Level {reached}**.\n\n "
                 ),
                 color=discord.Color.purple()  # pick your color
                 )
@@ -57,79 +49,43 @@ class Levelling(commands.Cog):
     async def level_self(self, interaction: discord.Interaction) -> None:
         try:
             await interaction.response.defer()
-            user_data = await LevelinManager.get_user_level(
-                interaction.guild.id, interaction.user.id #type: ignore
-            )
-            if not user_data:
+            card = await LevelinManager.get_level_card(interaction.guild.id, interaction.user.id) #type: ignore
+            if not card:
                 await interaction.followup.send(
                     f"{interaction.user.mention}, you have no recorded level data yet."
                 )
                 return
-            xp, level = user_data
-            rank = await LevelinManager.get_rank(interaction.guild.id, interaction.user.id)#type: ignore  # Get the user's rank
-            
+            xp, level, rank = card["xp"], card["level"], card["rank"]
+            needed = curves.for_guild(interaction.guild.id).xp_for_level(level) #type: ignore
+            file = await render_rank_card(interaction.user, level, xp, needed, rank) #type: ignore
+
             embed = discord.Embed(
                 title="🎉 Current Lvl!",
                 description=(
-                    f"Congratulations **{interaction.user.name}**!\n You are **Rank #{rank} | Level {level}**.\n\n continue chatting to level up more! "
+                    f"**{interaction.user.name}**, you are **Rank #{rank} | Level {level}** with **{xp}/{needed} XP**.\n\n continue chatting to level up more! "
                 ),
                 color=discord.Color.purple()  # pick your color
             )
-            embed.set_thumbnail(url=str(interaction.user.display_avatar.url))
-            await interaction.followup.send(embed=embed)
+            embed.set_image(url=f"attachment://{file.filename}")
+            await interaction.followup.send(embed=embed, file=file)
         except Exception as e:
             handler.error_handle(e, context="Levelling Cog level_self command")
         
 
     @app_commands.command(name="level_server", description="Check the server leaderboard.")
-    @app_commands.describe(limit="Number of top users to display (max 50)")
+    @app_commands.describe(limit="Only show the top N users (default: everyone)")
     @app_commands.guild_only()
-    async def level_server(self, interaction: discord.Interaction, limit: int = 50) -> None:
+    async def level_server(self, interaction: discord.Interaction, limit: int | None = None) -> None:
         try:
             await interaction.response.defer()
-            limit = min(limit, 50)  # Cap the limit to 50
-            # Fetch leaderboard data
-            top_users = await LevelinManager.fetch_top_users(interaction.guild.id, limit) #type: ignore
-
-            table_data = []
-            for idx, data in enumerate(top_users,start=1):
-                user_id = data.get("user_id")
-                level = data.get("level")
-                xp = data.get("xp")
-                member = interaction.guild.get_member(user_id) #type: ignore
-                if member:
-                    avatar = await member.display_avatar.read()
-                    table_data.append(
-                        (idx,member.display_name, level, xp, avatar)
-                    )
-
-            # Create pagination view
-            pagination_view = LeaderboardPaginationView(
-                data=table_data,
-                sep=5,
-                timeout=None
-            )
-
-            # Generate the first page's image
-            page_data = pagination_view.get_current_page_data()
-            img = pagination_view.generate_leaderboard_image(page_data)
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-
-            # Prepare discord file
-            discord_file = discord.File(buffer, filename="leaderboard.png")
-
-            # Create embed
-            embed = discord.Embed(
-                title=f"🏆 Leaderboard Page {pagination_view.current_page}/{pagination_view.get_total_pages()}",
-                color=discord.Color.gold()
-            )
-            embed.set_image(url="attachment://leaderboard.png")
-            embed.set_footer(text="Use the buttons below to navigate pages.")
+            result = await build_page(interaction.guild, levels_kind(limit)) #type: ignore
+            if result is None:
+                await interaction.followup.send("No level data recorded for this server yet.")
+                return
 
-            # Send initial message and store it
-            pagination_view.message = await interaction.followup.send(
+            # Send the first page; the buttons carry everything needed for the others
+            embed, discord_file, pagination_view = result
+            await interaction.followup.send(
                 embed=embed,
                 file=discord_file,
                 view=pagination_view
@@ -1,15 +1,22 @@
 
 
 import asyncio
+import io
 from datetime import datetime, timezone
 from handle import handler
 import discord,typing,asyncio
 from discord import app_commands
 from discord.ext import commands
-from dbmanager.MovieManager import MovieManager
-from views.movieView import MediaSelectionView, create_selection_embed, WatchHistoryPaginationView
+from dbmanager.MovieManager import MovieManager, INCOMPLETE_STATUSES
+from views.movieView import MediaSelectionView, create_selection_embed, WatchHistoryPaginationView, watchlist_field, incomplete_field
+from views.ReminderEmbeds import embed_from_dict, pack_embeds
 from constants import MediaType
+from progress import episode_label
+from dbmanager.HistoryImporter import HistoryImporter
+from dbmanager.Recommender import Recommender
+from settings import IMPORT_MAX_UPLOAD_BYTES
 movieManager = MovieManager()
+recommender = Recommender()
 
 
 
@@ -71,16 +78,17 @@ class Movies(commands.Cog):
         try:
          
             await interaction.response.defer(thinking=True)
-            data = await movieManager.get_user_watch_history(interaction.user.id)
+            view = WatchHistoryPaginationView(user_id=interaction.user.id)
+            if not await view.load_page():
+                await interaction.followup.send("Error: Fetching media failed.")
+                return
 
-            if not data:
+            if not view.total:
                 await interaction.followup.send(
                     f"No  'media' found in your history."
                 )
                 return
-            
 
-            view = WatchHistoryPaginationView(data=data)
             await interaction.followup.send(embed=view.build_embed(), view=view)
             view.message = await interaction.original_response() #type: ignore
 
@@ -243,7 +251,7 @@ class Movies(commands.Cog):
     #                           WATCHLIST COMMANDS                                 #
     # ============================================================================ #
 
-    @app_commands.command(name="watchlist", description="View your watchlist for movies or series. Shows up to 20 items.")
+    @app_commands.command(name="watchlist", description="View your watchlist for movies or series.")
     @app_commands.describe(media_type="Type of media: movie or series")
     @app_commands.dm_only()
     async def view_watchlist(
@@ -254,46 +262,27 @@ class Movies(commands.Cog):
         await interaction.response.defer(thinking=True)
 
         try:
-            watchlist_items = await movieManager.get_watchlist(interaction.user.id)
-            
-            if not watchlist_items:
+            media_type_obj = MediaType.find_media_type(media_type)
+            view = WatchHistoryPaginationView(
+                user_id=interaction.user.id,
+                statuses=["watchlist"],
+                media_type=media_type_obj,
+                title=f"Your {media_type.title()} Watchlist" if media_type else "Your Watchlist",
+                field_builder=watchlist_field,
+            )
+            if not await view.load_page():
+                await interaction.followup.send(f"Error: Failed to retrieve watchlist.")
+                return
+
+            if not view.total:
                 await interaction.followup.send(
-                    f"Your watchlist is empty!"
+                    f"Your {media_type} watchlist is empty!" if media_type else f"Your watchlist is empty!"
                 )
                 return
-            
-            
-            embed = discord.Embed(
-            title=f"Your Watchlist",
-            description=f"You have {len(watchlist_items)} item(s) in your watchlist",
-            color=discord.Color.blue()
-            )
-            if media_type:
-                watchlist_items = [item for item in watchlist_items if item.get("media_type") == media_type]
-                embed.title = f"Your {media_type.title()} Watchlist"
-                embed.description = f"You have {len(watchlist_items)} {media_type}(s) in your watchlist"
-                if not watchlist_items:
-                    await interaction.followup.send(
-                        f"Your {media_type} watchlist is empty!"
-                    )
-                    return
-            
-            for idx, item in enumerate(watchlist_items[:20]):
-                title = item.get("title") or "Unknown title"
 
-                release_date = item.get("release_date")
-                release_date = release_date if release_date else "Unknown date"
-                embed.add_field(
-                    name=f"{idx + 1}. {title}({item.get('media_type','N/A')})",
-                    value=release_date,
-                    inline=False
-                )
+            await interaction.followup.send(embed=view.build_embed(), view=view)
+            view.message = await interaction.original_response() #type: ignore
 
-                if len(watchlist_items) > 20:
-                    embed.set_footer(text=f"+ {len(watchlist_items) - 20} more items")
-                
-            await interaction.followup.send(embed=embed)
-            
         except Exception as e:
             handler.error_handle(e, context=f"view_watchlist()")
             await interaction.followup.send(f"Error: Failed to retrieve watchlist.")
@@ -306,61 +295,26 @@ class Movies(commands.Cog):
         await interaction.response.defer()
         
         try:
-            incomplete_media = await movieManager.check_user_completion(interaction.user.id)
-           
-          
-            if not incomplete_media:
-                await interaction.followup.send(
-                    "You're all caught up! No incomplete media found."
-                )
-                return
-            media_type_obj= MediaType.find_media_type(media_type)
-            if media_type_obj:
-                incomplete_media = [
-                    media for media in incomplete_media
-                    if media.media_type == media_type_obj and not media.has_next_episode
-                ]
-            embed = discord.Embed(
+            view = WatchHistoryPaginationView(
+                user_id=interaction.user.id,
+                statuses=INCOMPLETE_STATUSES,
+                media_type=MediaType.find_media_type(media_type),
                 title="Your Incomplete Media",
-                description=f"You have {len(incomplete_media)} item(s) to catch up on",
-                color=discord.Color.orange()
+                field_builder=incomplete_field,
+                incomplete=True,
             )
+            if not await view.load_page():
+                await interaction.followup.send("Error: Fetching media failed.")
+                return
 
-            for idx, media in enumerate(incomplete_media[:20], start=1):
-                parts = []
-
-                # Progress / status line
-                if media.is_series:
-                    if media.progress_text:
-                        parts.append(f"**Progress:** {media.progress_text}")
-                    else:
-                        parts.append("**Progress:** Not started")
-
-                    if media.next_episode_text:
-                        parts.append(f"**Next:** {media.next_episode_text}")
-                else:
-                    parts.append("✓ Watched" if media.is_completed else "Not watched yet")
-
-                # Media status (Airing / Ended)
-                if media.media_status:
-                    parts.append(f"**Status:** {media.media_status}")
-
-                # Overview (trimmed)
-                if media.overview:
-                    trimmed = media.overview[:120] + "..." if len(media.overview) > 120 else media.overview
-                    parts.append(trimmed)
-
-                embed.add_field(
-                    name=f"{idx}. {media.media_type.table_name.title()} • {media.title}",
-                    value="\n".join(parts),
-                    inline=False
+            if not view.total:
+                await interaction.followup.send(
+                    "You're all caught up! No incomplete media found."
                 )
+                return
 
-            # Footer if truncated
-            if len(incomplete_media) > 20:
-                embed.set_footer(text=f"+ {len(incomplete_media) - 20} more items")
-
-            await interaction.followup.send(embed=embed)
+            await interaction.followup.send(embed=view.build_embed(), view=view)
+            view.message = await interaction.original_response() #type: ignore
 
         except Exception as e:
             handler.error_handle(e, context="check_incomplete")
@@ -377,43 +331,82 @@ class Movies(commands.Cog):
                     "No upcoming episodes found in your watchlist!"
                 )
                 return
-            header_embed = discord.Embed(
+            embeds = [discord.Embed(
                     title="📺 Upcoming Episodes This Week",
                     description=f"You have **{len(reminders)}** show(s) with new episodes coming up!",
                     color=discord.Color.blue(),
                     timestamp=datetime.now(timezone.utc)
-                )
-            await interaction.followup.send(embed=header_embed)
-            await asyncio.sleep(0.5)
-
-                # Send individual show embeds
-            for user_show in reminders:
-                #print(f"user_show: {user_show.title}",user_show)
-                embed_data = user_show.to_embed_dict() 
-                embed = discord.Embed(
-                        title=embed_data["title"],          
-                        description=embed_data["description"],
-                        color=embed_data["color"]             
-                    )
-                    
-                if embed_data.get("thumbnail"):
-                        embed.set_thumbnail(url=embed_data["thumbnail"])
-
-                for field in embed_data["fields"]:
-                    embed.add_field(
-                            name=field["name"],
-                            value=field["value"],
-                            inline=field.get("inline", False)
-                        )
+                )]
+            embeds.extend(embed_from_dict(user_show.to_embed_dict()) for user_show in reminders)
 
-                await interaction.followup.send(embed=embed)  
-            
-                await asyncio.sleep(0.5)  # Rate limit between messages
+            for batch in pack_embeds(embeds):
+                await interaction.followup.send(embeds=batch)
         except Exception as e:
             handler.error_handle(e, context="check_upcoming")
             await interaction.followup.send(f"Error: {str(e)}")
 
-        
+
+    @app_commands.command(name="recommend", description="Get recommendations based on what you've watched")
+    @app_commands.describe(media_type="Type of media: movie or series")
+    @app_commands.dm_only()
+    async def recommend(self, interaction: discord.Interaction, media_type: str | None = None):
+        """Recommend media from precomputed 'also watched' neighbours."""
+        await interaction.response.defer(thinking=True)
+        try:
+            picks = await recommender.recommend(interaction.user.id, MediaType.find_media_type(media_type), limit=10)
+            if not picks:
+                await interaction.followup.send(
+                    "No recommendations yet. Add a few more titles you've watched and check back later!"
+                )
+                return
+
+            embed = discord.Embed(
+                title="🍿 Recommended For You",
+                description="Based on what people with similar taste watched",
+                color=discord.Color.teal()
+            )
+            if picks[0].get("poster_path"):
+                embed.set_thumbnail(url=f"https://image.tmdb.org/t/p/w500{picks[0]['poster_path']}")
+            for idx, pick in enumerate(picks, start=1):
+                year = f" ({pick['release_date'].year})" if pick.get("release_date") else ""
+                embed.add_field(
+                    name=f"{idx}. {pick['title']}{year} • {pick['media_type']}",
+                    value=f"Because you watched **{pick['because']}**",
+                    inline=False
+                )
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            handler.error_handle(e, context="recommend")
+            await interaction.followup.send("Error: Fetching recommendations failed.")
+
+    @app_commands.command(name="next_episode", description="Mark the next episode of a series as watched")
+    @app_commands.describe(title="The series you watched an episode of", count="How many episodes (default 1)")
+    @app_commands.dm_only()
+    async def next_episode(self, interaction: discord.Interaction, title: str, count: app_commands.Range[int, 1, 100] = 1):
+        """Advance series progress from cached season data."""
+        await interaction.response.defer(thinking=True)
+        try:
+            media_id = self.movie_title_cache.get(title)
+            if not media_id:
+                await interaction.followup.send(f" Media title not found in your list: `{title}`")
+                return
+            media = await movieManager.advance_series_progress(interaction.user.id, media_id["id"], by=count)
+            if not media:
+                await interaction.followup.send(f" Couldn't update progress for `{title}`. Is it a series in your list?")
+                return
+
+            lines = [f"**{media.title}** is now at **{media.progress_text}**"]
+            if media.percent_complete is not None:
+                lines.append(f"{media.percent_complete:.0f}% watched • {media.episodes_remaining} aired episode(s) left")
+            if media.is_completed:
+                lines.append("✓ Finished! Marked as watched.")
+            elif media.next_unwatched:
+                lines.append(f"Up next: {episode_label(media.next_unwatched)}")
+            await interaction.followup.send("\n".join(lines))
+        except Exception as e:
+            handler.error_handle(e, context=f"next_episode({title})")
+            await interaction.followup.send("Error: Updating progress failed.")
+
     # ============================================================================ #
     #                              DELETE COMMAND                                  #
     # ============================================================================ #
@@ -500,6 +493,52 @@ class Movies(commands.Cog):
             handler.error_handle(e, context=f"search_media({title})")
             await interaction.followup.send(f"Error: Finding media")
        
+    # ============================================================================ #
+    #                                IMPORT COMMANDS                               #
+    # ============================================================================ #
+
+    @app_commands.command(name="import_history", description="Import a Letterboxd, IMDb or Trakt export")
+    @app_commands.describe(file="CSV (Letterboxd/IMDb) or JSON (Trakt) export file")
+    @app_commands.dm_only()
+    async def import_history(self, interaction: discord.Interaction, file: discord.Attachment):
+        """Bulk import an external watch history."""
+        await interaction.response.defer(thinking=True)
+
+        if file.size > IMPORT_MAX_UPLOAD_BYTES:
+            await interaction.followup.send(f"That file is too large (max {IMPORT_MAX_UPLOAD_BYTES // (1024 * 1024)} MB).")
+            return
+        # resolving titles on TMDB can outlast the 15 minute interaction token, so the result comes by DM
+        await interaction.followup.send(f"📥 Importing `{file.filename}`… I'll message you when it's done.")
+
+        try:
+            # stream the attachment straight into the parser instead of reading it into memory
+            session = await movieManager.get_session()
+            async with session.get(file.url) as resp:
+                resp.raise_for_status()
+                report = await HistoryImporter(movieManager).run_stream(interaction.user.id, resp.content.iter_chunked(65536), file.filename)
+
+            embed = discord.Embed(
+                title="📥 Import complete",
+                description=f"Imported **{report.written}** title(s) from `{file.filename}`",
+                color=discord.Color.green() if not report.unresolved else discord.Color.orange()
+            )
+            embed.add_field(name="Rows read", value=str(report.rows_read), inline=True)
+            embed.add_field(name="Matched", value=f"{report.resolved_local} local • {report.resolved_tmdb} TMDB", inline=True)
+            embed.add_field(name="Unresolved", value=str(len(report.unresolved)), inline=True)
+            embed.set_footer(text=f"{report.elapsed:.1f}s")
+
+            files = []
+            if report.unresolved:
+                lines = "\n".join(f"{e.title} ({e.year or '?'})" for e in report.unresolved)
+                files.append(discord.File(io.BytesIO(lines.encode()), filename="unresolved.txt"))
+            await interaction.user.send(embed=embed, files=files)
+
+        except ValueError as e:
+            await interaction.user.send(f"Error: {e}")
+        except Exception as e:
+            handler.error_handle(e, context=f"import_history({file.filename})")
+            await interaction.user.send("Error: Import failed.")
+
     # ============================================================================ #
     #                                AUTOCOMPLETE                                  #
     # ============================================================================ #
@@ -507,6 +546,7 @@ class Movies(commands.Cog):
     @add_to_watchlist.autocomplete("media_type")
     @view_watchlist.autocomplete("media_type")
     @check_incomplete.autocomplete("media_type")
+    @recommend.autocomplete("media_type")
     async def media_type_autocomplete(
         self,
         interaction: discord.Interaction,
@@ -530,6 +570,7 @@ class Movies(commands.Cog):
     @search_media.autocomplete("title")
     @add_to_watchlist.autocomplete("title")
     @delete_media.autocomplete("title")
+    @next_episode.autocomplete("title")
     async def title_autocomplete(
         self,
         interaction: discord.Interaction,
@@ -5,6 +5,7 @@ from discord.ext import commands, tasks
 from dbmanager import ServerStatManager
 from constants import Roles
 from handle import handler
+from dispatch import outbox
 # ============================================================================ #
 #                                     fixes                                    #
 # ============================================================================ #
@@ -124,12 +125,11 @@ class ServerStat(commands.Cog):
         """
        
         await ServerStatManager.set_server_state(guild.id, "off")  # Initialize server state to "off" when joining a new guild
-        owner = await guild.fetch_member(guild.owner_id) #type: ignore
         embed = discord.Embed(title="Welcome to Ouroboros!", description=
                               f"Thank you for adding me to {guild.name}!, If you have any questions, feel free to ask!, This is the link to our support server: https://discord.gg/yZaUzRBEbF", color=discord.Color.gold(),
                     timestamp=discord.utils.utcnow())
         embed.set_footer(text="Ouroboros Bot")
-        await owner.send(embed=embed)
+        await outbox.enqueue(guild.owner_id, embeds=[embed]) #type: ignore
         handler.log_task(message=f"Joined new guild: {guild.name} ({guild.id})", level="info", context="Guild Join")
         
 
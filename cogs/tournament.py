@@ -13,6 +13,7 @@ from dbmanager import Games, ServerStatManager
 from constants import gameType, channelType, Roles, Status
 from models import Round, Match
 from handle import handler
+from dispatch import outbox
 
 
 
@@ -80,26 +81,16 @@ class MatchView(ui.View):
         # Update the embed
         await self.update_embed(interaction)
 
-        # Notify the opponent
+        # Notify the opponent (queued; the outbox deletes it after 5 minutes and
+        # falls back to the fixtures channel if their DMs are closed)
         opponent_id = match.get_opponent(interaction.user.id)
         if opponent_id:
-            opponent = await interaction.guild.fetch_member(opponent_id) #type: ignore
-            if opponent:
-                try:
-                    message = await opponent.send(
-                        f"Your opponent <@{interaction.user.id}> is now ready! Head to the tournament channel to chat."
-                    )
-                    # Delete notification after 5 minutes
-                    await asyncio.sleep(300)
-                    if message:
-                        await message.delete()
-                except discord.errors.Forbidden:
-                    await self.fixtures_channel.send(
-                        f"Unable to send a DM to <@{opponent_id}>. Please ensure their DMs are open.",
-                        delete_after=300,
-                    )
-                except Exception as e:
-                    handler.error_handle(e, context="DM Error in Tournament Ready")
+            await outbox.enqueue(
+                opponent_id,
+                content=f"Your opponent <@{interaction.user.id}> is now ready! Head to the tournament channel to chat.",
+                delete_after=300,
+                fallback_channel_id=self.fixtures_channel.id,
+            )
 
     async def update_embed(self, interaction: discord.Interaction|None = None):
         """Update the embed to display all matches and their readiness statuses"""
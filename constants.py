@@ -81,13 +81,7 @@ class MediaType(Enum):
     def find_media_type(cls, type_str: str|None) -> "MediaType | None":
         if type_str is None:
             return None
-        mapping = {
-            "movies": cls.MOVIE,
-            "movie": cls.MOVIE,
-            "tv": cls.SERIES,
-            "series": cls.SERIES
-        }
-        result = mapping.get(type_str.lower())
+        result = MEDIA_TYPE_LOOKUP.get(type_str) or MEDIA_TYPE_LOOKUP.get(type_str.lower())
         if result is None:
             raise ValueError(f"Unknown media type: {type_str}")
         return result
@@ -95,11 +89,19 @@ class MediaType(Enum):
     @property
     def table_name(self):
         """Get the database table name"""
-        tables = {
-            MediaType.MOVIE: "movies",
-            MediaType.SERIES: "series"
-        }
-        return tables[self]
+        return MEDIA_TABLE_NAMES[self]
+
+# built once; find_media_type/table_name run for every hydrated row
+MEDIA_TYPE_LOOKUP = {
+    "movies": MediaType.MOVIE,
+    "movie": MediaType.MOVIE,
+    "tv": MediaType.SERIES,
+    "series": MediaType.SERIES,
+}
+MEDIA_TABLE_NAMES = {
+    MediaType.MOVIE: "movies",
+    MediaType.SERIES: "series",
+}
 
 class Roles(Enum):
     PLAYER = "player_role"
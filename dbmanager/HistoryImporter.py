@@ -0,0 +1,406 @@
+import asyncio
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Iterator, TextIO
+from constants import MediaType
+from dbmanager.MovieManager import MovieManager
+from dbmanager.WatcherIndex import USER_MEDIA_CHANGED_CHANNEL
+from handle import handler
+from rimiru import Rimiru
+from settings import IMPORT_TMDB_CONCURRENCY
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Bulk import of external watch histories into user_media.
+#   Letterboxd  diary.csv / watched.csv / watchlist.csv  (Name, Year, ...)
+#   IMDb        ratings.csv / watchlist.csv               (Const, Title, Title Type, Year, ...)
+#   Trakt       history / watchlist JSON                  ([{type, movie|show, episode}, ...])
+# The file is parsed as a stream and folded into one entry per title (a Trakt
+# history has a row per episode), so memory follows distinct titles, not rows.
+# Parsing runs in a worker thread. run_stream feeds it an upload chunk by
+# chunk through ChunkStream (at most STREAM_QUEUE_CHUNKS chunks in flight), so
+# neither memory nor the bot's event loop ever holds the whole file.
+# Titles are resolved against the local media table in batched queries first;
+# only misses go to TMDB, under a semaphore. user_media is written with COPY.
+# ============================================================================ #
+
+RESOLVE_BATCH = 500
+STREAM_QUEUE_CHUNKS = 16
+STATUS_RANK = {"watchlist": 0, "watching": 1, "watched": 2}
+# merge imported rows into what the user already has instead of overwriting it:
+# keep the further-along status, existing progress unless the export has some,
+# and the newer last_updated
+STATUS_ORDER = "ARRAY[" + ", ".join(f"'{status}'" for status in sorted(STATUS_RANK, key=STATUS_RANK.get)) + "]"  # type: ignore
+MERGE_ON_CONFLICT = f"""DO UPDATE SET
+    status = CASE
+        WHEN array_position({STATUS_ORDER}, btrim(EXCLUDED.status)) > coalesce(array_position({STATUS_ORDER}, btrim(user_media.status)), -1)
+        THEN EXCLUDED.status ELSE user_media.status END,
+    progress = COALESCE(EXCLUDED.progress, user_media.progress),
+    last_updated = GREATEST(EXCLUDED.last_updated, user_media.last_updated)"""
+IMDB_MOVIE_TYPES = {"movie", "tvmovie", "short", "tvshort", "video", "tvspecial"}
+IMDB_SERIES_TYPES = {"tvseries", "tvminiseries"}
+
+
+@dataclass
+class ImportEntry:
+    """One title from an export, after folding duplicate rows together."""
+    media_type: MediaType
+    title: str
+    year: int | None = None
+    tmdb_id: int | None = None
+    imdb_id: str | None = None
+    status: str = "watched"
+    season: int | None = None
+    episode: int | None = None
+    watched_at: datetime | None = None
+
+    @property
+    def key(self) -> tuple:
+        if self.tmdb_id:
+            return (self.media_type, "tmdb", self.tmdb_id)
+        if self.imdb_id:
+            return (self.media_type, "imdb", self.imdb_id)
+        return (self.media_type, self.title.lower(), self.year)
+
+    def merge(self, other: "ImportEntry"):
+        if STATUS_RANK[other.status] > STATUS_RANK[self.status]:
+            self.status = other.status
+        if other.season is not None and (other.season, other.episode or 0) > (self.season or 0, self.episode or 0):
+            self.season, self.episode = other.season, other.episode
+        if other.watched_at and (not self.watched_at or other.watched_at > self.watched_at):
+            self.watched_at = other.watched_at
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    skipped: int = 0
+    titles: int = 0
+    resolved_local: int = 0
+    resolved_tmdb: int = 0
+    written: int = 0
+    unresolved: list[ImportEntry] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self) -> str:
+        rate = self.rows_read / self.elapsed if self.elapsed else 0
+        return (
+            f"rows={self.rows_read} skipped={self.skipped} titles={self.titles} "
+            f"local={self.resolved_local} tmdb={self.resolved_tmdb} unresolved={len(self.unresolved)} "
+            f"written={self.written} elapsed={self.elapsed:.1f}s ({rate:.0f} rows/s)"
+        )
+
+
+# ============================================================================ #
+#                                    PARSERS                                   #
+# ============================================================================ #
+
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_json_array(fp: TextIO, chunk_size: int = 65536) -> Iterator[dict]:
+    """Yield the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if not started and buffer.startswith("["):
+            buffer, started = buffer[1:], True
+            continue
+        if started and buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                buffer = buffer[end:]
+                continue
+        if eof:
+            return
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Readable file over byte chunks pulled from `next_chunk` (b"" at the end).
+    Blocking, so only read it from a thread; wrap it in a TextIOWrapper for the parsers.
+    """
+
+    def __init__(self, next_chunk: Callable[[], bytes]):
+        super().__init__()
+        self.next_chunk = next_chunk
+        self.pending = b""
+        self.eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending and not self.eof:
+            self.pending = self.next_chunk()
+            self.eof = not self.pending
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def parse_letterboxd(reader: csv.DictReader, watchlist: bool) -> Iterator[ImportEntry | None]:
+    for row in reader:
+        title = (row.get("Name") or "").strip()
+        if not title:
+            yield None
+            continue
+        yield ImportEntry(
+            media_type=MediaType.MOVIE,
+            title=title,
+            year=_int(row.get("Year")),
+            status="watchlist" if watchlist else "watched",
+            watched_at=_timestamp(row.get("Watched Date") or row.get("Date")),
+        )
+
+
+def parse_imdb(reader: csv.DictReader, watchlist: bool) -> Iterator[ImportEntry | None]:
+    for row in reader:
+        title_type = (row.get("Title Type") or "movie").replace(" ", "").lower()
+        title = (row.get("Title") or "").strip()
+        if not title or title_type not in IMDB_MOVIE_TYPES | IMDB_SERIES_TYPES:
+            yield None  # episodes/games/etc. have no user_media equivalent
+            continue
+        yield ImportEntry(
+            media_type=MediaType.SERIES if title_type in IMDB_SERIES_TYPES else MediaType.MOVIE,
+            title=title,
+            year=_int(row.get("Year")),
+            imdb_id=row.get("Const") or None,
+            status="watchlist" if watchlist else "watched",
+            watched_at=_timestamp(row.get("Date Rated") or row.get("Created")),
+        )
+
+
+def parse_trakt(items: Iterator[dict], watchlist: bool) -> Iterator[ImportEntry | None]:
+    for item in items:
+        kind = item.get("type")
+        data = item.get("movie") if kind == "movie" else item.get("show")
+        if not data or not data.get("title"):
+            yield None
+            continue
+        ids = data.get("ids") or {}
+        episode = item.get("episode") or {}
+        listed = watchlist or "listed_at" in item
+        yield ImportEntry(
+            media_type=MediaType.MOVIE if kind == "movie" else MediaType.SERIES,
+            title=data["title"],
+            year=_int(data.get("year")),
+            tmdb_id=_int(ids.get("tmdb")),
+            imdb_id=ids.get("imdb") or None,
+            status="watchlist" if listed else ("watching" if kind == "episode" else "watched"),
+            season=_int(episode.get("season")),
+            episode=_int(episode.get("number")),
+            watched_at=_timestamp(item.get("watched_at") or item.get("listed_at")),
+        )
+
+
+def parse_export(fp: TextIO, filename: str, fmt: str = "auto") -> Iterator[ImportEntry | None]:
+    """Pick a parser from `fmt` or the file name / CSV header. Yields None for skipped rows."""
+    watchlist = "watchlist" in filename.lower()
+    if fmt == "trakt" or (fmt == "auto" and filename.lower().endswith(".json")):
+        return parse_trakt(iter_json_array(fp), watchlist)
+
+    reader = csv.DictReader(fp)
+    header = set(reader.fieldnames or [])
+    if fmt == "imdb" or (fmt == "auto" and "Const" in header):
+        return parse_imdb(reader, watchlist)
+    if fmt == "letterboxd" or (fmt == "auto" and "Name" in header):
+        return parse_letterboxd(reader, watchlist)
+    raise ValueError(f"Unrecognised export format for {filename}")
+
+
+# ============================================================================ #
+#                                   IMPORTER                                   #
+# ============================================================================ #
+
+class HistoryImporter:
+    def __init__(self, manager: MovieManager | None = None, concurrency: int = IMPORT_TMDB_CONCURRENCY):
+        self.manager = manager or MovieManager()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    @staticmethod
+    def _year(value) -> int | None:
+        return value.year if value else None
+
+    async def _match_local(self, entries: list[ImportEntry]) -> dict[tuple, int]:
+        """One query per batch: match by TMDB id, else by title (+ year when known)."""
+        conn = await Rimiru.shion()
+        rows = await conn.select(
+            "media",
+            columns=["id", "tmdb_id", "title", "media_type", "release_date"],
+            raw_where="tmdb_id = ANY($1) OR lower(title) = ANY($2)",
+            raw_params=[
+                [e.tmdb_id for e in entries if e.tmdb_id],
+                list({e.title.lower() for e in entries}),
+            ],
+        )
+        by_tmdb = {(r["media_type"], r["tmdb_id"]): r["id"] for r in rows}
+        by_title: dict[tuple, list[dict]] = {}
+        for r in rows:
+            by_title.setdefault((r["media_type"], r["title"].lower()), []).append(r)
+
+        matched = {}
+        for entry in entries:
+            table = entry.media_type.table_name
+            if entry.tmdb_id and (table, entry.tmdb_id) in by_tmdb:
+                matched[entry.key] = by_tmdb[(table, entry.tmdb_id)]
+                continue
+            candidates = by_title.get((table, entry.title.lower()), [])
+            if entry.year:
+                candidates = [r for r in candidates if self._year(r["release_date"]) in (None, entry.year)]
+            if len(candidates) == 1:
+                matched[entry.key] = candidates[0]["id"]
+        return matched
+
+    async def _resolve_remote(self, entry: ImportEntry) -> int | None:
+        async with self.semaphore:
+            tmdb_id = entry.tmdb_id or await self.manager.find_tmdb_id(entry.media_type.value, entry.title, entry.year, entry.imdb_id)
+            if not tmdb_id:
+                return None
+            conn = await Rimiru.shion()
+            existing = await conn.select("media", columns=["id"], filters={"tmdb_id": tmdb_id, "media_type": entry.media_type.table_name}, limit=1)
+            if existing:
+                return existing[0]["id"]
+            media = await self.manager.cache_media(entry.media_type.value, tmdb_id)
+            return media.id if media else None
+
+    async def _resolve(self, entries: list[ImportEntry], report: ImportReport) -> dict[tuple, int]:
+        resolved = await self._match_local(entries)
+        report.resolved_local += len(resolved)
+
+        misses = [e for e in entries if e.key not in resolved]
+        remote = await asyncio.gather(*(self._resolve_remote(e) for e in misses), return_exceptions=True)
+        for entry, media_id in zip(misses, remote):
+            if isinstance(media_id, int):
+                resolved[entry.key] = media_id
+                report.resolved_tmdb += 1
+            else:
+                report.unresolved.append(entry)
+        return resolved
+
+    @staticmethod
+    def _collect(fp: TextIO, filename: str, fmt: str, report: ImportReport) -> dict[tuple, ImportEntry]:
+        """Parse `fp` and fold its rows into one entry per title (runs in a worker thread)."""
+        entries: dict[tuple, ImportEntry] = {}
+        for entry in parse_export(fp, filename, fmt):
+            report.rows_read += 1
+            if entry is None:
+                report.skipped += 1
+            elif entry.key in entries:
+                entries[entry.key].merge(entry)
+            else:
+                entries[entry.key] = entry
+        report.titles = len(entries)
+        return entries
+
+    async def run(self, user_id: int, fp: TextIO, filename: str, fmt: str = "auto") -> ImportReport:
+        """Import an export from an open text file."""
+        report = ImportReport()
+        entries = await asyncio.to_thread(self._collect, fp, filename, fmt, report)
+        return await self._store(user_id, entries, filename, report)
+
+    async def run_stream(self, user_id: int, chunks: AsyncIterator[bytes], filename: str, fmt: str = "auto") -> ImportReport:
+        """Import an export arriving as byte chunks (e.g. an HTTP response body), parsing as it downloads."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_CHUNKS)
+
+        def next_chunk() -> bytes:
+            item = asyncio.run_coroutine_threadsafe(queue.get(), loop).result()
+            if isinstance(item, BaseException):
+                raise item
+            return item
+
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    if chunk:
+                        await queue.put(chunk)
+                await queue.put(b"")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await queue.put(e)  # surfaces in the parser thread
+
+        report = ImportReport()
+        feeder = asyncio.create_task(feed())
+        fp = io.TextIOWrapper(io.BufferedReader(ChunkStream(next_chunk)), encoding="utf-8-sig", newline="")
+        try:
+            entries = await asyncio.to_thread(self._collect, fp, filename, fmt, report)
+        except asyncio.CancelledError:
+            # the parser thread outlives us; hand it an error rather than leave it waiting for data
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(EOFError("import cancelled"))
+            raise
+        finally:
+            feeder.cancel()
+        return await self._store(user_id, entries, filename, report)
+
+    async def _store(self, user_id: int, entries: dict[tuple, ImportEntry], filename: str, report: ImportReport) -> ImportReport:
+        """Resolve the folded entries to media ids and merge them into the user's user_media."""
+        pending = list(entries.values())
+        user_rows: dict[int, dict] = {}
+        now = datetime.now(timezone.utc)
+        for i in range(0, len(pending), RESOLVE_BATCH):
+            batch = pending[i:i + RESOLVE_BATCH]
+            resolved = await self._resolve(batch, report)
+            for entry in batch:
+                media_id = resolved.get(entry.key)
+                if media_id is None:
+                    continue
+                # two export rows can land on the same media (e.g. title match + IMDb id)
+                row = user_rows.get(media_id)
+                if row and STATUS_RANK[row["status"]] >= STATUS_RANK[entry.status]:
+                    continue
+                user_rows[media_id] = {
+                    "user_id": user_id,
+                    "media_id": media_id,
+                    "status": entry.status,
+                    "progress": {"season": entry.season, "episode": entry.episode} if entry.season and entry.episode else None,
+                    "last_updated": entry.watched_at or now,
+                }
+
+        conn = await Rimiru.shion()
+        report.written = await conn.copy_upsert("user_media", list(user_rows.values()), conflict_column="user_id, media_id", on_conflict=MERGE_ON_CONFLICT)
+        await conn.notify(USER_MEDIA_CHANGED_CHANNEL, str(user_id))
+        report.finished = time.monotonic()
+        handler.log_task(context="IMPORT", message=f"[IMPORT] {filename} for user {user_id}: {report.summary()}", level="Info")
+        return report
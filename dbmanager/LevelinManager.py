@@ -1,6 +1,8 @@
 from handle import handler
 from rimiru import Rimiru
 from constants import FetchType
+from dbmanager.RankIndex import rank_index
+from leveling_curve import curves
 
 
 # -------------------------------------------------------------
@@ -26,23 +28,39 @@ async def insert_or_update_user(guild_id: int, user_id: int, xp: int, level: int
     try:
         await conn.upsert("users", {"discord_id": user_id, "username": f"{user_id}+not found"}, conflict_column="discord_id") #since this is the only other place a new user is introduced
         await conn.upsert(table="levels", data={"guild_id": guild_id, "user_id": user_id, "xp": xp, "level": level}, conflict_column="user_id,guild_id")
+        rank_index.set(guild_id, user_id, xp, level)
     except Exception as e:
         handler.error_handle(e, context="insert_or_update_user")
 
 
+async def load_level_curves() -> None:
+    """Register every guild's custom XP curve (sql/010_level_curves.sql)."""
+    conn = await Rimiru.shion()
+    try:
+        rows = await conn.select(table="level_curves", columns=["guild_id", "base_xp", "growth_factor"])
+        for row in rows:
+            curves.set(row["guild_id"], row["base_xp"], row["growth_factor"])
+        handler.log_task(context="LEVELS", message=f"[LEVELS] Loaded {len(curves.guilds)} custom level curves", level="Info")
+    except Exception as e:
+        handler.error_handle(e, context="load_level_curves")
+
+
 # -------------------------------------------------------------
 # LEADERBOARD / RANKING
 # -------------------------------------------------------------
-async def fetch_top_users(guild_id: int, limit: int = 10) -> list[dict]:
-    """Return top N users in a guild by level and XP."""
+async def fetch_top_users(guild_id: int, limit: int = 10, offset: int = 0) -> list[dict]:
+    """Return top N users in a guild by level and XP, skipping the first `offset`."""
+    if rank_index.ready:
+        return rank_index.top(guild_id, limit, offset)
     conn = await Rimiru.shion()
     try:
         rows = await conn.select(
             table="levels",
             columns=["user_id", "level", "xp"],
             filters={"guild_id": guild_id},
-            order_by=f"level DESC, xp DESC",
-            limit=limit
+            order_by=f"level DESC, xp DESC, user_id",
+            limit=limit,
+            offset=offset
         )
         #print(rows)
         return rows
@@ -50,12 +68,37 @@ async def fetch_top_users(guild_id: int, limit: int = 10) -> list[dict]:
         handler.error_handle(e, context="fetch_top_users")
         return []
     
+async def count_ranked_users(guild_id: int) -> int:
+    """Number of users on a guild's leaderboard."""
+    if rank_index.ready:
+        return rank_index.count(guild_id)
+    conn = await Rimiru.shion()
+    try:
+        rows = await conn.select(table="levels", columns=["count(*) AS total"], filters={"guild_id": guild_id})
+        return rows[0]["total"] if rows else 0
+    except Exception as e:
+        handler.error_handle(e, context="count_ranked_users")
+        return 0
+
+async def get_level_card(guild_id: int, user_id: int) -> dict | None:
+    """Return {xp, level, rank} for a user, from the rank index or in one query (sql/009_level_card.sql)."""
+    if rank_index.ready:
+        return rank_index.card(guild_id, user_id)
+    conn = await Rimiru.shion()
+    try:
+        rows = await conn.call_function("get_user_level_card", params=[guild_id, user_id], fetch_type=FetchType.FETCH)
+        return dict(rows[0]) if rows else None
+    except Exception as e:
+        handler.error_handle(e, context="get_level_card")
+        return None
+
 async def get_rank(guild_id: int, user_id: int) -> int | None:
     """Return a user's rank in the guild (1 = highest XP)."""
+    if rank_index.ready:
+        return rank_index.rank(guild_id, user_id)
     conn = await Rimiru.shion()
     try:
         rank = await conn.call_function("get_user_lvl_rank",params=[guild_id, user_id],fetch_type=FetchType.FETCHVAL.value)
-        print(rank)
         return rank
     except Exception as e:
         handler.error_handle(e, context="get_rank")
@@ -3,18 +3,28 @@
 
 # ============================================================================ #
 from dataclasses import replace
+import json
 import aiohttp
 from difflib import SequenceMatcher
 import discord
-from settings import MOVIE_BASE_URL, MOVIE_API_KEY
+from settings import MOVIE_BASE_URL, MOVIE_API_KEY, TMDB_FULL_SWEEP_DAYS
 from rimiru import Rimiru
-from models import Series, Movie,UserMedia
+from dbmanager import StateManager
+from dbmanager.ReleaseNotifier import release_notifier, SERIES_UPDATED_CHANNEL
+from dbmanager.ReminderLedger import reminder_ledger, UPCOMING
+from dbmanager.WatcherIndex import watcher_index
+from models import Series, Movie,UserMedia, UserMediaPage
+from progress import SeasonMap
 from constants import FetchType, MediaType
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List
-from asyncio import Semaphore
 from handle import handler
+from views.ReminderEmbeds import embed_from_dict
+from dispatch import outbox
+
+TMDB_CHANGES_WINDOW = timedelta(days=14)  # TMDB only serves the changes feed for the last 14 days
+INCOMPLETE_STATUSES = ["watchlist", "watching"]  # narrowed further by user_media_incomplete() in SQL
 
 # ============================================================================ #
 #                                   DB CALLS                                   #
@@ -23,6 +33,19 @@ class MovieManager:
     def __init__(self):
         self.tasks = []
         self.running = False
+        self._session: aiohttp.ClientSession | None = None
+        self.sync_status: dict[str, dict] = {}  # per media table progress of the current/last refresh
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Shared TMDB HTTP session so repeated calls reuse warm connections."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def add_or_update_user_movie(self, user_id: int, title: str, tmdb_id:int|None=None,watchlist: bool=False):
         """Insert or update a movie watch record for a user."""
@@ -43,6 +66,7 @@ class MovieManager:
                 "status": "watchlist" if watchlist else "watched"
                 }, conflict_column="user_id, media_id")
             if row:
+                watcher_index.set_status(user_id, media_data.id, row["status"]) # type: ignore
                 #the idea is if it actually inserted or updated we return the media data
                 #so we can give feedback to the user with the title/poster etc
                 return media_data
@@ -62,14 +86,22 @@ class MovieManager:
               
             if media_data is None:
                 raise ValueError("Failed to fetch or cache movie data.")
-            # 2. Insert or update user_media record
+            # 2. Check the episode exists (against cached seasons, no TMDB call)
+            progress = None
+            if season and episode:
+                position = SeasonMap.from_series(media_data.seasons, media_data.last_episode_to_air).normalise(season, episode) # type: ignore
+                if position is None:
+                    raise ValueError(f"Invalid progress S{season}E{episode} for {media_data.title}")
+                progress = {"season": position[0], "episode": position[1]}
+            # 3. Insert or update user_media record
             row = await conn.upsert("user_media", data={
                 "user_id": user_id,
                 "media_id": media_data.id ,
-                "progress": {"season": season, "episode": episode} if season and episode else None,
+                "progress": progress,
                 "status": "watchlist" if watchlist else "watching"
                 }, conflict_column="user_id, media_id")
             if row:
+                watcher_index.set_status(user_id, media_data.id, row["status"]) # type: ignore
                 #the idea is if it actually inserted or updated we return the media data
                 #so we can give feedback to the user with the title/poster etc
                 return media_data
@@ -77,6 +109,49 @@ class MovieManager:
             handler.error_handle(e, context=f"add_or_update_series({title})")
             return None
     
+    async def advance_series_progress(self, user_id: int, media_id: int, by: int = 1) -> UserMedia | None:
+        """
+        Move a user's series progress forward `by` episodes using the cached seasons.
+        Not started means the first episode; running off the end of an ended
+        show marks it watched.
+        """
+        conn = await Rimiru.shion()
+        try:
+            series = await conn.select("series", columns=["seasons", "last_episode_to_air"], filters={"id": media_id}, limit=1)
+            current = await conn.select("user_media", columns=["progress", "status"], filters={"user_id": user_id, "media_id": media_id}, limit=1)
+            if not series or not current:
+                return None
+            seasons = SeasonMap.from_series(series[0]["seasons"], series[0]["last_episode_to_air"])
+            if not seasons:
+                raise ValueError(f"No season data cached for media {media_id}")
+
+            progress = current[0]["progress"]
+            progress = json.loads(progress) if isinstance(progress, str) else progress
+            position = seasons.normalise(progress.get("season"), progress.get("episode")) if progress else None
+            if position is None:
+                target = seasons.at(min(by, seasons.total))
+            else:
+                target = seasons.increment(*position, by=by) or seasons.at(seasons.total)
+
+            media = await conn.select("media", columns=["status"], filters={"id": media_id}, limit=1)
+            finished = seasons.absolute(*target) == seasons.total and bool(media) and media[0]["status"] in ("Ended", "Canceled")
+            row = await conn.upsert("user_media", data={
+                "user_id": user_id,
+                "media_id": media_id,
+                "progress": {"season": target[0], "episode": target[1]},
+                "status": "watched" if finished else "watching",
+                }, conflict_column="user_id, media_id")
+            if not row:
+                return None
+            watcher_index.set_status(user_id, media_id, row["status"]) # type: ignore
+            updated = await self.fetch_user_media(user_id, {"id": media_id})
+            if updated:
+                updated.seasons = json.loads(series[0]["seasons"]) if isinstance(series[0]["seasons"], str) else series[0]["seasons"]
+            return updated
+        except Exception as e:
+            handler.error_handle(e, context=f"advance_series_progress({user_id}, {media_id})")
+            return None
+
     async def add_to_watchlist(self, user_id: int, title: str, media_type:str,tmdb_id:int|None=None):
         """Add a media entry to a user's watchlist."""
         conn = await Rimiru.shion()
@@ -92,6 +167,7 @@ class MovieManager:
                 raise ValueError("Failed to fetch or cache movie data.")
             row = await conn.upsert("user_media", data={"user_id": user_id, "media_id": media_data.id, "status": "watchlist"}, conflict_column="user_id, media_id")
             if row:
+                watcher_index.set_status(user_id, media_data.id, row["status"]) # type: ignore
                 return media_data
         except Exception as e:
             handler.error_handle(e, context=f"add_to_watchlist({user_id}, {title})")
@@ -107,25 +183,12 @@ class MovieManager:
             handler.error_handle(e, context="fetch_media_names")
             return {}
 
-    async def get_watchlist(self, user_id: int,):
-        """Fetch a user's watchlist entries.
-        returns list of dicts with media details.
-        """
-        conn = await Rimiru.shion()
-        try:
-
-            rows = await conn.call_function(
-                fn="get_user_watchlist", params=[user_id], fetch_type=FetchType.FETCH)
-            return [dict(row) for row in rows]
-        except Exception as e:
-            handler.error_handle(e, context=f"get_watchlist({user_id})")
-            return []
-
     async def delete_user_media(self, user_id: int, media_id: int):
         """Delete a specific media entry from a user's records."""
         conn = await Rimiru.shion()
         try:
             await conn.delete("user_media", filters={"user_id": user_id, "media_id": media_id})
+            watcher_index.set_status(user_id, media_id, None)
             return True
         except Exception as e:
             handler.error_handle(e, context=f"delete_user_media({user_id}, {media_id})")
@@ -152,26 +215,39 @@ class MovieManager:
             return None
 
     async def check_user_completion(self, user_id: int):
-        """Check if a user has completed all media in their watchlist."""
-        conn = await Rimiru.shion()
-        try:
-            rows = await conn.call_function(
-                fn="get_user_incomplete_media", params=[user_id], fetch_type=FetchType.FETCH)
-            return [UserMedia.from_db(dict(r)) for r in rows]
-
-        except Exception as e:
-            handler.error_handle(e, context=f"check_user_completion({user_id})")
-            return None
+        """A user's incomplete media, by the same definition /incomplete pages through."""
+        incomplete, cursor = [], None
+        while True:
+            page = await self.get_user_media_page(user_id, INCOMPLETE_STATUSES, limit=100, cursor=cursor, incomplete=True)
+            if page is None:
+                return None
+            incomplete.extend(page.items)
+            if page.next_cursor is None:
+                return incomplete
+            cursor = page.next_cursor
         
-    async def get_user_watch_history(self, user_id: int):
-        """Fetch a user's watch history with media details."""
+    async def get_user_media_page(self, user_id: int, statuses: list[str]|None = None, media_type: MediaType|None = None,
+                                  limit: int = 10, cursor: tuple[datetime|None, int]|None = None, incomplete: bool = False) -> UserMediaPage|None:
+        """
+        Fetch one page of a user's media, newest first (rows never updated last).
+        statuses narrows by user_media.status (None = all); incomplete keeps only
+        what user_media_incomplete() counts as unfinished (sql/013_user_media_pages_keyset.sql).
+        Pass the previous page's `next_cursor` to continue. One extra row is read to know if another page exists.
+        """
         conn = await Rimiru.shion()
         try:
+            cursor_ts, cursor_id = cursor if cursor else (None, None)
             rows = await conn.call_function(
-                fn="get_user_watch_history", params=[user_id], fetch_type=FetchType.FETCH)
-            return [UserMedia.from_db(dict(r)) for r in rows]
+                fn="get_user_media_page",
+                params=[user_id, statuses, media_type.table_name if media_type else None, limit + 1, cursor_ts, cursor_id, incomplete],
+                fetch_type=FetchType.FETCH,
+            )
+            items = UserMedia.from_rows(rows[:limit])
+            total = rows[0]["total_count"] if rows else (0 if cursor is None else None)
+            next_cursor = (items[-1].last_updated, items[-1].id) if len(rows) > limit else None
+            return UserMediaPage(items=items, total=total, next_cursor=next_cursor) # type: ignore
         except Exception as e:
-            handler.error_handle(e, context=f"get_user_watch_history({user_id})")
+            handler.error_handle(e, context=f"get_user_media_page({user_id})")
             return None
 
     # ============================================================================ #
@@ -243,6 +319,8 @@ class MovieManager:
             await conn.upsert(f"{table}", data=insert_data, conflict_column="id")
 
             media_data = replace(media_data, id=row.get("id"))
+            if isinstance(media_data, Series):
+                await self.sync_series_episodes(media_data.id, media_data) # type: ignore
             return media_data
         except Exception as e:
             handler.error_handle(e, context="cache_media")
@@ -259,9 +337,9 @@ class MovieManager:
             url = f"{MOVIE_BASE_URL}/search/{media_type}?query={name.replace(' ', '+')}&api_key={MOVIE_API_KEY}"
             #print(url)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as r:
-                    data = await r.json()
+            session = await self.get_session()
+            async with session.get(url) as r:
+                data = await r.json()
 
             results = []
             for result in data.get("results", []):
@@ -297,6 +375,40 @@ class MovieManager:
             return []
 
 
+    async def find_tmdb_id(self, media_type: str, title: str, year: int | None = None, imdb_id: str | None = None) -> int | None:
+        """
+        Resolve a title from an external export to a TMDB id without user input.
+        Uses TMDB's IMDb lookup when an IMDb id is known, else the best search hit
+        (restricted to `year` when given).
+        """
+        try:
+            session = await self.get_session()
+            if imdb_id:
+                url = f"{MOVIE_BASE_URL}/find/{imdb_id}?api_key={MOVIE_API_KEY}&external_source=imdb_id"
+                async with session.get(url) as resp:
+                    data = await resp.json()
+                results = data.get("tv_results" if media_type == "tv" else "movie_results") or []
+                if results:
+                    return results[0]["id"]
+
+            year_param = "first_air_date_year" if media_type == "tv" else "year"
+            params = {"query": title, "api_key": MOVIE_API_KEY}
+            if year:
+                params[year_param] = year
+            async with session.get(f"{MOVIE_BASE_URL}/search/{media_type}", params=params) as resp:
+                data = await resp.json()
+            results = data.get("results") or []
+            if not results:
+                return None
+            # prefer an exact (case-insensitive) title match over TMDB's popularity order
+            for result in results:
+                if (result.get("title") or result.get("name") or "").lower() == title.lower():
+                    return result["id"]
+            return results[0]["id"]
+        except Exception as e:
+            handler.error_handle(e, context=f"find_tmdb_id({media_type}, {title})")
+            return None
+
     async def get_media_details(self, media_type: str, media_id: int | None = None)->Movie | Series | None:
         """
         Fetch media metadata from TMDB.
@@ -312,11 +424,11 @@ class MovieManager:
             if not media_id:
                 return None
 
-            async with aiohttp.ClientSession() as session:
-                url = f"{MOVIE_BASE_URL}/{media_type}/{media_id}?api_key={MOVIE_API_KEY}&append_to_response=watch/providers"
-                #print(url)
-                async with session.get(url) as resp:
-                    data = await resp.json()
+            session = await self.get_session()
+            url = f"{MOVIE_BASE_URL}/{media_type}/{media_id}?api_key={MOVIE_API_KEY}&append_to_response=watch/providers"
+            #print(url)
+            async with session.get(url) as resp:
+                data = await resp.json()
 
             if data.get("status_code") == 34:
                 return None
@@ -332,103 +444,121 @@ class MovieManager:
 
 
 
+    async def get_season_details(self, tmdb_id: int, season_number: int) -> dict | None:
+        """Fetch a full season (with per-episode air dates) from TMDB."""
+        try:
+            session = await self.get_session()
+            url = f"{MOVIE_BASE_URL}/tv/{tmdb_id}/season/{season_number}?api_key={MOVIE_API_KEY}"
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.json()
+        except Exception as e:
+            handler.error_handle(e, context=f"get_season_details({tmdb_id}, {season_number})")
+            return None
+
     # ============================================================================ #
-    #                               BACKGROUND TASKS                               #
+    #                                   EPISODES                                   #
     # ============================================================================ #
 
-    
-    async def send_reminder_to_user(self, client, user_id: int, reminders: List[Series], semaphore: Semaphore):
-        """Send episode reminders to a single user with rate limiting"""
-        async with semaphore:  # Limit concurrent sends
-            try:
-                user = await client.fetch_user(user_id)
-                if not user:
-                
-                    return
+    async def sync_series_episodes(self, series_id: int, series: Series):
+        """
+        Keep the normalized `episodes` table in step with a freshly fetched series.
+        Airing shows get their latest season fetched in full; everything is diffed
+        against the stored rows so only changed episodes are written.
+        """
+        conn = await Rimiru.shion()
+        try:
+            season_details = []
+            if series.next_episode_to_air or series.in_production:
+                latest = series.next_episode_to_air.season_number if series.next_episode_to_air else series.number_of_seasons
+                if latest:
+                    payload = await self.get_season_details(series.tmdb_id, latest)
+                    if payload:
+                        season_details.append(payload)
+
+            new_rows = series.episode_rows(season_details)
+            if not new_rows:
+                return  # no season data, keep whatever we have
+
+            existing = await conn.select("episodes", columns=["season", "episode", "air_date", "name"], filters={"series_id": series_id})
+            existing = {(r["season"], r["episode"]): r for r in existing}
+
+            upserts = []
+            for (season, episode), row in new_rows.items():
+                old = existing.get((season, episode))
+                # season counts alone carry no names/dates; keep details from earlier full fetches
+                air_date = row["air_date"] or (old["air_date"] if old else None)
+                name = row["name"] or (old["name"] if old else None)
+                if old and old["air_date"] == air_date and old["name"] == name:
+                    continue
+                upserts.append({"series_id": series_id, "season": season, "episode": episode, "air_date": air_date, "name": name})
 
-                # Send header embed
-                header_embed = discord.Embed(
-                    title="📺 Upcoming Episodes This Week",
-                    description=f"You have **{len(reminders)}** show(s) with new episodes coming up!",
-                    color=discord.Color.blue(),
-                    timestamp=datetime.now(timezone.utc)
-                )
-                await user.send(embed=header_embed)
-                await asyncio.sleep(0.5)
-
-                # Send individual show embeds
-                for user_show in reminders:
-                    embed_data = discord.Embed(
-                        title=user_show.title,
-                        description=user_show.next_release_info,  # FIXED
-                        color=discord.Color.purple()
-                    )
-                    if user_show.poster_url:
-                        embed_data.set_thumbnail(url=user_show.poster_url)
+            deletes = [
+                {"series_id": series_id, "season": season, "episode": episode}
+                for season, episode in existing.keys() - new_rows.keys()
+            ]
+            await conn.bulk_upsert("episodes", upserts, conflict_column="series_id, season, episode")
+            await conn.bulk_delete("episodes", deletes)
+            # let the bot's release notifier reschedule this series
+            await conn.notify(SERIES_UPDATED_CHANNEL, str(series_id))
+        except Exception as e:
+            handler.error_handle(e, context=f"sync_series_episodes({series_id})")
 
-                    await user.send(embed=embed_data)
-                    await asyncio.sleep(0.5)  # Rate limit between messages
+    # ============================================================================ #
+    #                               BACKGROUND TASKS                               #
+    # ============================================================================ #
 
-            except discord.Forbidden:
-                handler.log_task(context="Discord.Forbidden reminder media", message=f"[REMINDERS] Cannot send DM to user {user_id} (DMs disabled)", level="warning")
-            except discord.HTTPException as e:
-                handler.log_task(context="Discord.HTTPException reminder media", message=f"[REMINDERS] Discord API error for user {user_id}: {e}", level="warning")
-            except Exception as e:
-                handler.error_handle(e, context=f"send_reminder_to_{user_id}")
+    
+    async def send_reminder_to_user(self, user_id: int, reminders: List[Series]):
+        """Queue episode reminders for a single user; the outbox packs them into as few DMs as possible"""
+        try:
+            embeds = [discord.Embed(
+                title="📺 Upcoming Episodes This Week",
+                description=f"You have **{len(reminders)}** show(s) with new episodes coming up!",
+                color=discord.Color.blue(),
+                timestamp=datetime.now(timezone.utc)
+            )]
+            for user_show in reminders:
+                embed_data = discord.Embed(
+                    title=user_show.title,
+                    description=user_show.next_release_info,  # FIXED
+                    color=discord.Color.purple()
+                )
+                if user_show.poster_url:
+                    embed_data.set_thumbnail(url=user_show.poster_url)
+                embeds.append(embed_data)
 
-    async def send_incomplete_reminder_to_user(self, client, user_id: int, incomplete: list[UserMedia], semaphore: Semaphore):
-        """Send incomplete media reminders to a single user"""
-        async with semaphore:
-            try:
-                user = await client.fetch_user(user_id)
-                if not user:
-                    return
+            if not await outbox.enqueue(user_id, embeds=embeds):
+                return
 
-                # Send header message
-                header_embed = discord.Embed(
-                    title="📚 Your Incomplete Media",
-                    description=f"You have **{len(incomplete)}** item(s) to catch up on",
-                    color=discord.Color.orange(),
-                    timestamp=datetime.now(timezone.utc)
-                )
-                await user.send(embed=header_embed)
-                await asyncio.sleep(0.5)
-
-                # Send individual embed for each media
-                for media in incomplete:
-                    embed_data = media.to_embed_dict() 
-                    embed = discord.Embed(
-                        title=embed_data["title"],          
-                        description=embed_data["description"],
-                        color=embed_data["color"]             
-                    )
-                    
-                    if embed_data.get("thumbnail"):
-                        embed.set_thumbnail(url=embed_data["thumbnail"])
-
-                    for field in embed_data["fields"]:
-                        embed.add_field(
-                            name=field["name"],
-                            value=field["value"],
-                            inline=field.get("inline", False)
-                        )
+            await reminder_ledger.record(user_id, UPCOMING, [
+                (show.id, show.next_episode_to_air.season_number, show.next_episode_to_air.episode_number) # type: ignore
+                for show in reminders
+            ])
 
-                    await user.send(embed=embed)  
-                    await asyncio.sleep(0.5)
+        except Exception as e:
+            handler.error_handle(e, context=f"send_reminder_to_{user_id}")
 
-                # Send footer message
-                footer_embed = discord.Embed(
-                    description="✅ All incomplete media listed above!",
-                    color=discord.Color.green()
-                )
-                await user.send(embed=footer_embed)
+    async def send_incomplete_reminder_to_user(self, user_id: int, incomplete: list[UserMedia]):
+        """Queue incomplete media reminders for a single user; the outbox packs them into as few DMs as possible"""
+        try:
+            embeds = [discord.Embed(
+                title="📚 Your Incomplete Media",
+                description=f"You have **{len(incomplete)}** item(s) to catch up on",
+                color=discord.Color.orange(),
+                timestamp=datetime.now(timezone.utc)
+            )]
+            embeds.extend(embed_from_dict(media.to_embed_dict()) for media in incomplete)
+            embeds.append(discord.Embed(
+                description="✅ All incomplete media listed above!",
+                color=discord.Color.green()
+            ))
+
+            await outbox.enqueue(user_id, embeds=embeds)
 
-            except discord.Forbidden:
-                handler.log_task(context="Discord.Forbidden reminder media", message=f"[REMINDERS] Cannot send DM to user {user_id} (DMs disabled)", level="warning")
-            except discord.HTTPException as e:
-                handler.log_task(context="Discord.HTTPException reminder media", message=f"[REMINDERS] Discord API error for user {user_id}: {e}", level="warning")
-            except Exception as e:
-                handler.error_handle(e, context=f"send_incomplete_reminder_{user_id}")
+        except Exception as e:
+            handler.error_handle(e, context=f"send_incomplete_reminder_{user_id}")
 
     async def send_upcoming_episode_reminders(self, client):
         """Send reminders to users about upcoming episodes - PARALLEL VERSION"""
@@ -456,7 +586,14 @@ class MovieManager:
                         fetch_type=FetchType.FETCH
                     )
 
-                    reminders = [Series.from_db(dict(r)) for r in reminders]
+                    reminders = Series.from_rows(reminders)
+                    # skip episodes this user was already told about
+                    reminders = [
+                        show for show in reminders
+                        if show.next_episode_to_air and await reminder_ledger.is_new(
+                            user_id, UPCOMING, show.id, show.next_episode_to_air.season_number, show.next_episode_to_air.episode_number # type: ignore
+                        )
+                    ]
 
                     if reminders:
                         user_reminders.append((user_id, reminders))
@@ -470,17 +607,10 @@ class MovieManager:
 
             handler.log_task(context="REMINDERS", message=f"Sending notifications to {len(user_reminders)} users", level="Info")
 
-            # Create semaphore to limit concurrent sends (avoid rate limits)
-            semaphore = Semaphore(3)  # Max 3 users being notified simultaneously
-
-            # Send reminders in parallel
-            tasks = [
-                self.send_reminder_to_user(client, user_id, reminders, semaphore)
-                for user_id, reminders in user_reminders
-            ]
-
-            await asyncio.gather(*tasks, return_exceptions=True)
-            handler.log_task(context="REMINDERS", message=f"[REMINDERS] Finished sending episode reminders", level="Info")
+            # Queue reminders; the outbox worker delivers them with adaptive concurrency
+            for user_id, reminders in user_reminders:
+                await self.send_reminder_to_user(user_id, reminders)
+            handler.log_task(context="REMINDERS", message=f"[REMINDERS] Queued episode reminders for {len(user_reminders)} users", level="Info")
 
         except Exception as e:
             handler.error_handle(e, context="send_upcoming_episode_reminders")
@@ -494,7 +624,7 @@ class MovieManager:
                     params=[user_id, 7],
                     fetch_type=FetchType.FETCH
                 )
-            return [UserMedia.from_db(dict(r)) for r in reminders]
+            return UserMedia.from_rows(reminders)
         except Exception as e:
             handler.error_handle(e, context="send_upcoming_episode_reminders")
             return None
@@ -533,17 +663,10 @@ class MovieManager:
 
             handler.log_task(context="REMINDERS", message=f"[REMINDERS] Sending incomplete media notifications to {len(user_incomplete)} users", level="Info")
 
-            # Create semaphore to limit concurrent sends
-            semaphore = Semaphore(3)  # Max 3 users simultaneously
-
-            # Send reminders in parallel
-            tasks = [
-                self.send_incomplete_reminder_to_user(client, user_id, incomplete, semaphore)
-                for user_id, incomplete in user_incomplete
-            ]
-
-            await asyncio.gather(*tasks, return_exceptions=True)
-            handler.log_task(context="REMINDERS", message=f"[REMINDERS] Finished sending incomplete media reminders", level="Info")
+            # Queue reminders; the outbox worker delivers them with adaptive concurrency
+            for user_id, incomplete in user_incomplete:
+                await self.send_incomplete_reminder_to_user(user_id, incomplete)
+            handler.log_task(context="REMINDERS", message=f"[REMINDERS] Queued incomplete media reminders for {len(user_incomplete)} users", level="Info")
 
             await asyncio.sleep(1209600)  # Wait 2 weeks before next run
 
@@ -573,6 +696,7 @@ class MovieManager:
                              data=update_data, 
                              conflict_column="id")
 
+            await self.sync_series_episodes(series_id, media_data) # type: ignore
             return True
         except Exception as e:
             handler.error_handle(e, context=f"update_series_details({series_id})")
@@ -604,8 +728,8 @@ class MovieManager:
             handler.error_handle(e, context=f"update_movie_details({movie_id})")
             return False
 
-    async def get_series_needing_update(self):
-        """Get series that need updating based on their status and last update."""
+    async def get_series_needing_update(self) -> list[dict] | None:
+        """Get series that need updating based on their status and last update. None if the query failed."""
         conn = await Rimiru.shion()
         try:
             rows = await conn.call_function(
@@ -615,10 +739,10 @@ class MovieManager:
             return [{"id": r["id"], "tmdb_id": r["tmdb_id"]} for r in rows]
         except Exception as e:
             handler.error_handle(e, context="get_series_needing_update")
-            return []
+            return None
 
-    async def get_movies_needing_update(self):
-        """Get movies that need updating (much less frequent than series)."""
+    async def get_movies_needing_update(self) -> list[dict] | None:
+        """Get movies that need updating (much less frequent than series). None if the query failed."""
         conn = await Rimiru.shion()
         try:
             rows = await conn.call_function(
@@ -628,60 +752,206 @@ class MovieManager:
             return [{"id": r["id"], "tmdb_id": r["tmdb_id"]} for r in rows]
         except Exception as e:
             handler.error_handle(e, context="get_movies_needing_update")
-            return []
+            return None
 
-    async def series_background_updater(self):
-        """Background task to periodically update series data."""
+    @staticmethod
+    def _merge_media_lists(media_list: list[dict], extra: list[dict] | None) -> list[dict]:
+        """`media_list` followed by the `extra` entries it doesn't already contain."""
+        if not extra:
+            return media_list
+        seen = {media["id"] for media in media_list}
+        return media_list + [media for media in extra if media["id"] not in seen]
+
+    async def _refresh_media_list(self, media_type: MediaType, media_list: list[dict], stop: asyncio.Event | None = None) -> tuple[int, list[dict]]:
+        """
+        Refetch each {id, tmdb_id} entry from TMDB. Returns (updated count, entries that failed).
+        Once `stop` is set the remaining entries are skipped and returned as failed.
+        """
+        update = self.update_series_details if media_type == MediaType.SERIES else self.update_movie_details
+        status = self.sync_status[media_type.table_name] = {
+            "running": True,
+            "total": len(media_list),
+            "updated": 0,
+            "failed": 0,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+        }
+        failed = []
+        try:
+            for i, media in enumerate(media_list):
+                if stop is not None and stop.is_set():
+                    handler.log_task(context="UPDATER", message=f"[UPDATER] Stop requested, skipping {len(media_list) - i} {media_type.table_name}", level="Info")
+                    failed.extend(media_list[i:])
+                    break
+                success = await update(media["id"], media["tmdb_id"])
+                if success:
+                    status["updated"] += 1
+                else:
+                    status["failed"] += 1
+                    failed.append(media)
+                await asyncio.sleep(0.5)  # Rate limit
+        finally:
+            status["running"] = False
+            status["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return status["updated"], failed
+
+    async def series_background_updater(self, stop: asyncio.Event | None = None, extra: list[dict] | None = None) -> list[dict] | None:
+        """
+        Background task to periodically update series data.
+        `extra` entries are refreshed too, unless already in the stale list.
+        Returns the entries that failed, None if the sweep itself failed or was stopped.
+        """
         handler.log_task(context="UPDATER", message="[UPDATER] Series background updater started", level="Info")
         try:
             # Get series that need updating
             series_list = await self.get_series_needing_update()
+            if series_list is None:
+                return None
+            series_list = self._merge_media_lists(series_list, extra)
 
             if series_list:
                 handler.log_task(context="UPDATER", message=f"[UPDATER] Updating {len(series_list)} series...", level="Info")
-
-                updated_count = 0
-                failed_count = 0
-
-                for series in series_list:
-                    success = await self.update_series_details(series["id"], series["tmdb_id"])
-                    if success:
-                        updated_count += 1
-                    else:
-                        failed_count += 1
-                    await asyncio.sleep(0.5)  # Rate limit
-
-                handler.log_task(context="UPDATER", message=f"[UPDATER] Series update complete: {updated_count} updated, {failed_count} failed", level="Info")
-            else:
-                handler.log_task(context="UPDATER", message="[UPDATER] No series need updating at this time", level="Info")
-
+                updated_count, failed = await self._refresh_media_list(MediaType.SERIES, series_list, stop)
+                handler.log_task(context="UPDATER", message=f"[UPDATER] Series update complete: {updated_count} updated, {len(failed)} failed", level="Info")
+                return None if stop is not None and stop.is_set() else failed
+            handler.log_task(context="UPDATER", message="[UPDATER] No series need updating at this time", level="Info")
+            return []
         except Exception as e:
             handler.error_handle(e, context="series_background_updater")
+            return None
 
-    async def movie_background_updater(self):
-        """Background task to periodically update movie data (less frequent than series)."""
+    async def movie_background_updater(self, stop: asyncio.Event | None = None, extra: list[dict] | None = None) -> list[dict] | None:
+        """Background task to periodically update movie data (less frequent than series). Same contract as series_background_updater."""
         handler.log_task(context="UPDATER", message="[UPDATER] Movie background updater started", level="Info")
         try:
             movies_list = await self.get_movies_needing_update()
+            if movies_list is None:
+                return None
+            movies_list = self._merge_media_lists(movies_list, extra)
             if movies_list:
                 handler.log_task(context="UPDATER", message=f"[UPDATER] Updating {len(movies_list)} movies...", level="Info")
-                updated_count = 0
-                failed_count = 0
-                for movie in movies_list:
-                    success = await self.update_movie_details(movie["id"], movie["tmdb_id"])
-                    if success:
-                        updated_count += 1
-                    else:
-                        failed_count += 1
-                    # Rate limiting
-                    await asyncio.sleep(0.5)  # Adjust as needed to avoid hitting TMDB rate limits
-                handler.log_task(context="UPDATER", message=f"[UPDATER] Movie update complete: {updated_count} updated, {failed_count} failed", level="Info")
-            else:
-                handler.log_task(context="UPDATER", message="[UPDATER] No movies need updating at this time", level="Info")
-           
+                updated_count, failed = await self._refresh_media_list(MediaType.MOVIE, movies_list, stop)
+                handler.log_task(context="UPDATER", message=f"[UPDATER] Movie update complete: {updated_count} updated, {len(failed)} failed", level="Info")
+                return None if stop is not None and stop.is_set() else failed
+            handler.log_task(context="UPDATER", message="[UPDATER] No movies need updating at this time", level="Info")
+            return []
         except Exception as e:
             handler.error_handle(e, context="movie_background_updater")
-          
+            return None
+
+    # ============================================================================ #
+    #                               INCREMENTAL SYNC                               #
+    # ============================================================================ #
+
+    async def get_changed_tmdb_ids(self, media_type: MediaType, start: datetime, end: datetime) -> set[int] | None:
+        """
+        Pull TMDB's /{tv|movie}/changes feed between two dates.
+        Returns the set of changed tmdb ids, or None if the feed could not be read
+        (so the caller knows not to advance its checkpoint).
+        """
+        base = f"{MOVIE_BASE_URL}/{media_type.value}/changes?api_key={MOVIE_API_KEY}&start_date={start.date().isoformat()}&end_date={end.date().isoformat()}"
+        changed: set[int] = set()
+        try:
+            session = await self.get_session()
+            page, total_pages = 1, 1
+            while page <= total_pages:
+                async with session.get(f"{base}&page={page}") as resp:
+                    if resp.status != 200:
+                        handler.log_task(context="UPDATER", message=f"[UPDATER] {media_type.value} changes feed returned {resp.status}", level="Warning")
+                        return None
+                    data = await resp.json()
+                changed.update(r["id"] for r in data.get("results", []) if r.get("id"))
+                total_pages = data.get("total_pages") or 1
+                page += 1
+            return changed
+        except Exception as e:
+            handler.error_handle(e, context=f"get_changed_tmdb_ids({media_type.value})")
+            return None
+
+    async def get_tracked_media(self, media_type: MediaType, tmdb_ids: set[int]) -> list[dict] | None:
+        """Intersect a set of tmdb ids with the titles we actually store. None if the lookup failed."""
+        if not tmdb_ids:
+            return []
+        conn = await Rimiru.shion()
+        try:
+            rows = await conn.select(
+                "media",
+                columns=["id", "tmdb_id"],
+                filters={"media_type": media_type.table_name},
+                raw_where="tmdb_id = ANY($2)",
+                raw_params=[list(tmdb_ids)],
+            )
+            return [{"id": r["id"], "tmdb_id": r["tmdb_id"]} for r in rows]
+        except Exception as e:
+            handler.error_handle(e, context=f"get_tracked_media({media_type.value})")
+            return None
+
+    async def incremental_background_updater(self, media_type: MediaType, stop: asyncio.Event | None = None):
+        """
+        Refresh only the stored titles TMDB reports as changed since the last checkpoint.
+        Falls back to the full staleness-based updater when there is no usable checkpoint
+        (first run, or older than the 14 day changes window) or a full sweep is due;
+        a due sweep also refreshes what the changes feed lists since the checkpoint.
+        The checkpoint only moves once the run has completed; titles whose refresh
+        failed, or were skipped because `stop` was set, are kept in the state and
+        retried by the next run. A stopped full sweep leaves the checkpoint alone:
+        the next one picks up whatever is still stale.
+        """
+        key = f"tmdb_changes:{media_type.table_name}"
+        full_updater = self.series_background_updater if media_type == MediaType.SERIES else self.movie_background_updater
+        run_started = datetime.now(timezone.utc)
+        try:
+            state = await StateManager.get_state(key)
+            last_synced = datetime.fromisoformat(state["last_synced_at"]) if state.get("last_synced_at") else None
+            last_full = datetime.fromisoformat(state["last_full_sweep_at"]) if state.get("last_full_sweep_at") else None
+            retry = set(state.get("failed_tmdb_ids") or [])
+
+            if (
+                last_synced is None
+                or last_full is None
+                or run_started - last_synced > TMDB_CHANGES_WINDOW
+                or run_started - last_full > timedelta(days=TMDB_FULL_SWEEP_DAYS)
+            ):
+                handler.log_task(context="UPDATER", message=f"[UPDATER] Running full {media_type.table_name} sweep", level="Info")
+                changed = set()
+                if last_synced is not None and run_started - last_synced <= TMDB_CHANGES_WINDOW:
+                    changed = await self.get_changed_tmdb_ids(media_type, last_synced, run_started)
+                    if changed is None:
+                        return  # keep the old checkpoint so the next run retries the same window
+                extra = await self.get_tracked_media(media_type, changed | retry)
+                if extra is None:
+                    return
+                failed = await full_updater(stop, extra)
+                if failed is None:
+                    return  # keep the old checkpoint so the next run sweeps again
+                await StateManager.set_state(key, {
+                    "last_synced_at": run_started.isoformat(),
+                    "last_full_sweep_at": run_started.isoformat(),
+                    "failed_tmdb_ids": sorted({m["tmdb_id"] for m in failed}),
+                })
+                return
+
+            changed = await self.get_changed_tmdb_ids(media_type, last_synced, run_started)
+            if changed is None:
+                return  # keep the old checkpoint so the next run retries the same window
+
+            media_list = await self.get_tracked_media(media_type, changed | retry)
+            if media_list is None:
+                return
+            handler.log_task(context="UPDATER", message=f"[UPDATER] {len(changed)} {media_type.table_name} changed on TMDB, {len(retry)} to retry, {len(media_list)} tracked", level="Info")
+            failed = []
+            if media_list:
+                updated_count, failed = await self._refresh_media_list(media_type, media_list, stop)
+                handler.log_task(context="UPDATER", message=f"[UPDATER] Incremental {media_type.table_name} update complete: {updated_count} updated, {len(failed)} failed", level="Info")
+
+            await StateManager.set_state(key, {
+                "last_synced_at": run_started.isoformat(),
+                "last_full_sweep_at": last_full.isoformat(),
+                "failed_tmdb_ids": sorted({m["tmdb_id"] for m in failed}),
+            })
+        except Exception as e:
+            handler.error_handle(e, context=f"incremental_background_updater({media_type.value})")
+
     async def send_upcoming_episode_reminders_loop(self, client):
         while self.running:
             try:
@@ -718,4 +988,5 @@ class MovieManager:
         self.running = True
         self.tasks.append(asyncio.create_task(self.send_incomplete_media_reminders_loop(client)))
         self.tasks.append(asyncio.create_task(self.send_upcoming_episode_reminders_loop(client)))
+        self.tasks.append(asyncio.create_task(release_notifier.run(client)))
     
@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+import json
+import discord
+from handle import handler
+from rimiru import Rimiru
+from dbmanager import StateManager
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Storage side of the DM outbox (see sql/004_dm_outbox.sql). Senders call
+# `enqueue`; the worker in dispatch.py claims due rows, delivers them and
+# records the outcome here. Delivery is at-least-once: a crash between the
+# Discord send and `mark_sent` re-sends that message on the next scan. A DM
+# split over several messages marks its rows sent as each message lands, and a
+# row cut off mid-way is trimmed to its undelivered embeds before the retry.
+# Scheduled deletions back off the same way (sql/015_dm_outbox_delete_attempts.sql).
+# Finished rows (sent with nothing left to delete, deleted, failed) are pruned
+# after OUTBOX_RETENTION_DAYS so the table, and every scan, stays small.
+# ============================================================================ #
+
+CURSOR_KEY = "dm_outbox"
+BASE_BACKOFF = 30     # seconds before the first retry, doubled per attempt
+MAX_BACKOFF = 3600
+
+
+async def enqueue(user_id: int, content: str|None = None, embeds: list[discord.Embed]|None = None,
+                  delete_after: int|None = None, fallback_channel_id: int|None = None) -> int|None:
+    """Queue a DM for delivery and return its outbox id."""
+    conn = await Rimiru.shion()
+    try:
+        row = await conn.insert("dm_outbox", {
+            "user_id": user_id,
+            "content": content,
+            "embeds": [embed.to_dict() for embed in embeds or []],
+            "delete_after": delete_after,
+            "fallback_channel_id": fallback_channel_id,
+        })
+        return row["id"] if row else None
+    except Exception as e:
+        handler.error_handle(e, context=f"OutboxManager.enqueue({user_id})")
+        return None
+
+
+def row_embeds(row: dict) -> list[discord.Embed]:
+    embeds = row.get("embeds") or []
+    if isinstance(embeds, str):
+        embeds = json.loads(embeds)
+    return [discord.Embed.from_dict(data) for data in embeds]
+
+
+# ============================================================================ #
+#                                    CURSOR                                    #
+# ============================================================================ #
+
+async def get_cursor() -> int:
+    return int((await StateManager.get_state(CURSOR_KEY)).get("cursor", 0))
+
+
+async def advance_cursor(cursor: int) -> int:
+    """
+    Move the cursor to the lowest id that may still need delivery.
+    Rows from the last minute are included so an insert that committed out of
+    id order is never skipped.
+    """
+    conn = await Rimiru.shion()
+    try:
+        rows = await conn.select(
+            "dm_outbox",
+            columns=["MIN(id) AS low"],
+            raw_where="status = 'pending' OR created_at > now() - interval '1 minute'",
+        )
+        low = rows[0]["low"] if rows else None
+        if low is not None and low != cursor:
+            await StateManager.set_state(CURSOR_KEY, {"cursor": low})
+            return low
+    except Exception as e:
+        handler.error_handle(e, context="OutboxManager.advance_cursor")
+    return cursor
+
+
+# ============================================================================ #
+#                                   DELIVERY                                   #
+# ============================================================================ #
+
+async def claim_due(cursor: int, limit: int) -> list[dict]:
+    """Pending rows at or after the cursor whose next attempt is due, oldest first."""
+    conn = await Rimiru.shion()
+    try:
+        return await conn.select(
+            "dm_outbox",
+            filters={"status": "pending"},
+            raw_where="id >= $2 AND next_attempt_at <= now()",
+            raw_params=[cursor],
+            order_by="id",
+            limit=limit,
+        )
+    except Exception as e:
+        handler.error_handle(e, context="OutboxManager.claim_due")
+        return []
+
+
+async def mark_sent(ids: list[int], message: discord.Message, delete_after: int|None = None):
+    conn = await Rimiru.shion()
+    now = datetime.now(timezone.utc)
+    await conn.update(
+        "dm_outbox",
+        {
+            "status": "sent",
+            "sent_at": now,
+            "channel_id": message.channel.id,
+            "message_id": message.id,
+            "delete_at": now + timedelta(seconds=delete_after) if delete_after else None,
+        },
+        raw_where="id = ANY($6)",
+        raw_params=[ids],
+    )
+
+
+async def trim_delivered(outbox_id: int, remaining_embeds: list[dict]):
+    """Drop the part of a row that already went out (its content and delivered embeds)."""
+    conn = await Rimiru.shion()
+    await conn.update("dm_outbox", {"content": None, "embeds": remaining_embeds}, filters={"id": outbox_id})
+
+
+async def mark_failed(ids: list[int], error: str):
+    """Give up on rows that can never be delivered (e.g. the user's DMs are closed)."""
+    conn = await Rimiru.shion()
+    await conn.update("dm_outbox", {"status": "failed", "last_error": error}, raw_where="id = ANY($3)", raw_params=[ids])
+
+
+async def mark_retry(rows: list[dict], error: str, max_attempts: int):
+    """Push rows back with exponential backoff, failing those out of attempts."""
+    conn = await Rimiru.shion()
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        attempts = row["attempts"] + 1
+        delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1))
+        await conn.update(
+            "dm_outbox",
+            {
+                "attempts": attempts,
+                "last_error": error,
+                "status": "failed" if attempts >= max_attempts else "pending",
+                "next_attempt_at": now + timedelta(seconds=delay),
+            },
+            filters={"id": row["id"]},
+        )
+
+
+# ============================================================================ #
+#                              SCHEDULED DELETION                              #
+# ============================================================================ #
+
+async def due_deletions(limit: int) -> list[dict]:
+    conn = await Rimiru.shion()
+    try:
+        return await conn.select(
+            "dm_outbox",
+            columns=["id", "channel_id", "message_id", "delete_attempts"],
+            raw_where="delete_at <= now()",
+            order_by="delete_at",
+            limit=limit,
+        )
+    except Exception as e:
+        handler.error_handle(e, context="OutboxManager.due_deletions")
+        return []
+
+
+async def mark_deleted(ids: list[int]):
+    conn = await Rimiru.shion()
+    await conn.update("dm_outbox", {"status": "deleted", "delete_at": None}, raw_where="id = ANY($3)", raw_params=[ids])
+
+
+async def mark_delete_retry(row: dict, error: str, max_attempts: int):
+    """Push a failed deletion back with backoff, giving up (delete_at cleared) after `max_attempts`."""
+    conn = await Rimiru.shion()
+    attempts = row["delete_attempts"] + 1
+    delay = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1))
+    await conn.update(
+        "dm_outbox",
+        {
+            "delete_attempts": attempts,
+            "last_error": error,
+            "delete_at": None if attempts >= max_attempts else datetime.now(timezone.utc) + timedelta(seconds=delay),
+        },
+        filters={"id": row["id"]},
+    )
+
+
+async def prune(retention_days: int) -> int:
+    """Delete finished rows older than `retention_days`."""
+    conn = await Rimiru.shion()
+    try:
+        removed = await conn.delete_where(
+            "dm_outbox",
+            "status <> 'pending' AND delete_at IS NULL AND created_at < now() - make_interval(days => $1)",
+            [retention_days],
+        )
+        if removed:
+            handler.log_task(context="OUTBOX", message=f"[OUTBOX] Pruned {removed} finished rows", level="Info")
+        return removed
+    except Exception as e:
+        handler.error_handle(e, context="OutboxManager.prune")
+        return 0
+
+
+# ============================================================================ #
+#                                  DM CHANNELS                                 #
+# ============================================================================ #
+
+async def get_dm_channel_ids(user_ids: list[int]) -> dict[int, int]:
+    """Stored DM channel ids for the given users (missing users are left out)."""
+    conn = await Rimiru.shion()
+    try:
+        rows = await conn.select("dm_channels", columns=["user_id", "channel_id"], raw_where="user_id = ANY($1)", raw_params=[user_ids])
+        return {row["user_id"]: row["channel_id"] for row in rows}
+    except Exception as e:
+        handler.error_handle(e, context="OutboxManager.get_dm_channel_ids")
+        return {}
+
+
+async def save_dm_channel_id(user_id: int, channel_id: int):
+    conn = await Rimiru.shion()
+    try:
+        await conn.upsert("dm_channels", {"user_id": user_id, "channel_id": channel_id, "updated_at": datetime.now(timezone.utc)}, conflict_column="user_id")
+    except Exception as e:
+        handler.error_handle(e, context=f"OutboxManager.save_dm_channel_id({user_id})")
+
+
+async def forget_dm_channel_id(user_id: int):
+    conn = await Rimiru.shion()
+    try:
+        await conn.delete("dm_channels", {"user_id": user_id})
+    except Exception as e:
+        handler.error_handle(e, context=f"OutboxManager.forget_dm_channel_id({user_id})")
@@ -0,0 +1,159 @@
+# ============================================================================ #
+# MODULE: RankIndex.py
+
+# ============================================================================ #
+import asyncio
+from itertools import islice
+from sortedcontainers import SortedList
+from handle import handler
+from rimiru import Rimiru
+from settings import RANK_RECONCILE_INTERVAL
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# In-memory per-guild order statistics over `levels`, so /level_self ranks and
+# leaderboard pages don't query the table each time. Each guild keeps a
+# SortedList of (-level, -xp, user_id), the leaderboard order, plus a
+# user_id -> key dict: rank is one bisect, top N / page k is an islice, and a
+# score change is a remove + add, all O(log n).
+# Rank counts members strictly ahead, so ties share a rank (same rule as
+# get_user_level_card in sql/009_level_card.sql).
+# Built at startup by streaming `levels`. LevelinManager.insert_or_update_user
+# keeps it current; every RANK_RECONCILE_INTERVAL seconds it is rebuilt from
+# the table to pick up anything written behind its back, logging the drift.
+# ============================================================================ #
+
+
+class GuildRanks:
+    __slots__ = ("order", "scores")
+
+    def __init__(self):
+        self.order = SortedList()
+        self.scores: dict[int, tuple[int, int, int]] = {}  # user_id -> (-level, -xp, user_id)
+
+    def set(self, user_id: int, xp: int, level: int):
+        old = self.scores.get(user_id)
+        key = (-level, -xp, user_id)
+        if old == key:
+            return
+        if old is not None:
+            self.order.remove(old)
+        self.order.add(key)
+        self.scores[user_id] = key
+
+    def rank(self, user_id: int) -> int | None:
+        key = self.scores.get(user_id)
+        if key is None:
+            return None
+        return self.order.bisect_left(key[:2]) + 1
+
+    def top(self, limit: int, offset: int = 0) -> list[dict]:
+        return [
+            {"user_id": user_id, "level": -level, "xp": -xp}
+            for level, xp, user_id in islice(self.order.islice(offset), limit)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+
+class RankIndex:
+    def __init__(self):
+        self.guilds: dict[int, GuildRanks] = {}
+        self.ready = False
+        self.task: asyncio.Task | None = None
+        self._pending: list[tuple[int, int, int, int]] | None = None  # writes seen while a rebuild streams
+
+    # ============================================================================ #
+    #                                    QUERIES                                   #
+    # ============================================================================ #
+
+    def rank(self, guild_id: int, user_id: int) -> int | None:
+        """1-based rank of `user_id` in the guild, None if they have no row."""
+        ranks = self.guilds.get(guild_id)
+        return ranks.rank(user_id) if ranks else None
+
+    def top(self, guild_id: int, limit: int = 10, offset: int = 0) -> list[dict]:
+        """Rows {user_id, level, xp} in leaderboard order, skipping the first `offset`."""
+        ranks = self.guilds.get(guild_id)
+        return ranks.top(limit, offset) if ranks else []
+
+    def count(self, guild_id: int) -> int:
+        """Members with a row in the guild."""
+        ranks = self.guilds.get(guild_id)
+        return len(ranks) if ranks else 0
+
+    def card(self, guild_id: int, user_id: int) -> dict | None:
+        """{xp, level, rank} for a member, as get_user_level_card returns it."""
+        ranks = self.guilds.get(guild_id)
+        key = ranks.scores.get(user_id) if ranks else None
+        if key is None:
+            return None
+        return {"xp": -key[1], "level": -key[0], "rank": ranks.rank(user_id)} # type: ignore
+
+    def __len__(self) -> int:
+        return sum(len(ranks) for ranks in self.guilds.values())
+
+    # ============================================================================ #
+    #                                    UPDATES                                   #
+    # ============================================================================ #
+
+    def set(self, guild_id: int, user_id: int, xp: int, level: int):
+        """Apply a levels upsert."""
+        if self._pending is not None:
+            self._pending.append((guild_id, user_id, xp, level))
+        ranks = self.guilds.get(guild_id)
+        if ranks is None:
+            ranks = self.guilds[guild_id] = GuildRanks()
+        ranks.set(user_id, xp, level)
+
+    # ============================================================================ #
+    #                                    LOADING                                   #
+    # ============================================================================ #
+
+    async def load(self):
+        """Rebuild from `levels`; the old index keeps serving until the new one is complete."""
+        conn = await Rimiru.shion()
+        self._pending = []
+        try:
+            scores: dict[int, dict[int, tuple[int, int, int]]] = {}
+            async for row in conn.stream("levels", columns=["guild_id", "user_id", "level", "xp"]):
+                user_id = row["user_id"]
+                scores.setdefault(row["guild_id"], {})[user_id] = (-row["level"], -row["xp"], user_id)
+
+            guilds: dict[int, GuildRanks] = {}
+            drift = 0
+            for guild_id, members in scores.items():
+                ranks = guilds[guild_id] = GuildRanks()
+                ranks.scores = members
+                ranks.order = SortedList(members.values())
+                if self.ready:
+                    current = self.guilds.get(guild_id)
+                    drift += sum(1 for user_id, key in members.items() if current is None or current.scores.get(user_id) != key)
+            # replay writes that raced the stream onto the fresh index
+            pending, self._pending = self._pending, None
+            self.guilds = guilds
+            for change in pending:
+                self.set(*change)
+            message = f"[RANKS] Indexed {len(self)} members across {len(guilds)} guilds"
+            if self.ready:
+                message += f", {drift} out of sync"
+            self.ready = True
+            handler.log_task(context="RANKS", message=message, level="Info")
+        except Exception as e:
+            self._pending = None
+            handler.error_handle(e, context="RankIndex.load")
+
+    async def run(self):
+        while True:
+            await self.load()
+            await asyncio.sleep(RANK_RECONCILE_INTERVAL)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+
+# Global instance — one index per bot process
+rank_index = RankIndex()
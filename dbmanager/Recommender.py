@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from scipy import sparse
+from constants import FetchType, MediaType
+from dbmanager import StateManager
+from handle import handler
+from rimiru import Rimiru
+from settings import RECOMMENDER_FULL_SWEEP_DAYS, RECOMMENDER_TOP_K
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# "People who watched X also watched Y". user_media is read as an implicit
+# feedback matrix (rows = users, cols = media; watched/watching = 1.0,
+# watchlist = 0.5), columns are L2-normalised and X.T @ X gives item-item
+# cosine similarity. Only the top-K neighbours per media are kept, in
+# media_neighbours (sql/007_recommendations.sql).
+# Incremental runs only recompute and rewrite the neighbours of media whose
+# watchers changed since the last run plus every media that shares a watcher
+# with them, since those are the only scores that can have moved. The matrix
+# itself is still loaded in full: a neighbour's score needs its whole column
+# norm. Changes are found by user_media.changed_at, which a trigger sets on
+# every write (sql/012_user_media_changed_at.sql); last_updated can't be used
+# because imported history carries its original watch dates. Removed rows leave
+# no trace, so a full rebuild still runs every RECOMMENDER_FULL_SWEEP_DAYS.
+# Each rebuild replaces its neighbour rows in one transaction.
+# ============================================================================ #
+
+STATE_KEY = "recommender"
+STATUS_WEIGHTS = {"watched": 1.0, "watching": 1.0, "watchlist": 0.5}
+
+
+def top_k_neighbours(matrix: sparse.csc_matrix, columns: np.ndarray, k: int) -> list[tuple[int, int, float]]:
+    """
+    Top-k cosine neighbours for each column index in `columns`.
+    Returns (column, neighbour_column, score) triples; self-similarity is dropped.
+    """
+    sims = (matrix[:, columns].T @ matrix).tocsr()  # len(columns) x n_items, sparse
+    out = []
+    for row, col in enumerate(columns):
+        start, end = sims.indptr[row], sims.indptr[row + 1]
+        idx, scores = sims.indices[start:end], sims.data[start:end]
+        keep = idx != col
+        idx, scores = idx[keep], scores[keep]
+        if len(idx) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            idx, scores = idx[best], scores[best]
+        out.extend((int(col), int(n), float(s)) for n, s in zip(idx, scores))
+    return out
+
+
+class Recommender:
+    def __init__(self, top_k: int = RECOMMENDER_TOP_K):
+        self.top_k = top_k
+
+    async def load_matrix(self) -> tuple[sparse.csc_matrix, np.ndarray]:
+        """Build the normalised user x media matrix; returns it with the media id of each column."""
+        conn = await Rimiru.shion()
+        rows = await conn.select("user_media", columns=["user_id", "media_id", "status"], raw_where="status = ANY($1)", raw_params=[list(STATUS_WEIGHTS)])
+        return await asyncio.to_thread(self._build_matrix, rows)
+
+    @staticmethod
+    def _build_matrix(rows: list[dict]) -> tuple[sparse.csc_matrix, np.ndarray]:
+        user_ids, user_idx = np.unique(np.fromiter((r["user_id"] for r in rows), dtype=np.int64, count=len(rows)), return_inverse=True)
+        media_ids, media_idx = np.unique(np.fromiter((r["media_id"] for r in rows), dtype=np.int64, count=len(rows)), return_inverse=True)
+        weights = np.fromiter((STATUS_WEIGHTS[r["status"].strip()] for r in rows), dtype=np.float32, count=len(rows))
+        matrix = sparse.csc_matrix((weights, (user_idx, media_idx)), shape=(len(user_ids), len(media_ids)))
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=0)).A1
+        norms[norms == 0] = 1.0
+        return sparse.csc_matrix(matrix.multiply(1 / norms)), media_ids
+
+    async def changed_media(self, since: datetime) -> list[int]:
+        conn = await Rimiru.shion()
+        rows = await conn.select("user_media", columns=["DISTINCT media_id"], raw_where="changed_at > $1", raw_params=[since])
+        return [r["media_id"] for r in rows]
+
+    async def recompute(self, changed: list[int] | None = None) -> int:
+        """
+        Rebuild neighbours for `changed` media (and everything sharing a watcher), or all media when None.
+        Loads the full matrix either way; only the recomputed and rewritten rows are limited.
+        """
+        matrix, media_ids = await self.load_matrix()
+        if not len(media_ids):
+            return 0
+
+        if changed is None:
+            columns = np.arange(len(media_ids))
+        else:
+            changed_cols = np.flatnonzero(np.isin(media_ids, changed))
+            if not len(changed_cols):
+                return 0
+            # media co-watched with a changed one: their score against it moved too
+            watchers = np.unique(matrix[:, changed_cols].nonzero()[0])
+            columns = np.unique(np.concatenate([changed_cols, matrix[watchers].nonzero()[1]]))
+
+        triples = await asyncio.to_thread(top_k_neighbours, matrix, columns, self.top_k)
+        rows = [
+            {"media_id": int(media_ids[col]), "neighbour_id": int(media_ids[n]), "score": score}
+            for col, n, score in triples
+        ]
+
+        conn = await Rimiru.shion()
+        affected = [int(media_ids[col]) for col in columns]
+        if changed is None:
+            replace_where, replace_params = "TRUE", None
+        else:
+            replace_where, replace_params = "media_id = ANY($1)", [affected]
+        await conn.copy_upsert("media_neighbours", rows, conflict_column="media_id, neighbour_id", replace_where=replace_where, replace_params=replace_params)
+        return len(affected)
+
+    async def run(self):
+        """Scheduled entry point: incremental rebuild, or a full one when due."""
+        try:
+            run_started = datetime.now(timezone.utc)
+            state = await StateManager.get_state(STATE_KEY)
+            last_run = datetime.fromisoformat(state["last_run_at"]) if state.get("last_run_at") else None
+            last_full = datetime.fromisoformat(state["last_full_at"]) if state.get("last_full_at") else None
+
+            if not last_run or not last_full or run_started - last_full > timedelta(days=RECOMMENDER_FULL_SWEEP_DAYS):
+                count = await self.recompute()
+                last_full = run_started
+                mode = "full"
+            else:
+                count = await self.recompute(await self.changed_media(last_run))
+                mode = "incremental"
+
+            handler.log_task(context="RECOMMENDER", message=f"[RECOMMENDER] {mode} rebuild updated neighbours for {count} media", level="Info")
+            await StateManager.set_state(STATE_KEY, {"last_run_at": run_started.isoformat(), "last_full_at": last_full.isoformat()})
+        except Exception as e:
+            handler.error_handle(e, context="Recommender.run")
+
+    async def recommend(self, user_id: int, media_type: MediaType | None = None, limit: int = 10) -> list[dict]:
+        """Rank precomputed neighbours against the user's history."""
+        conn = await Rimiru.shion()
+        try:
+            rows = await conn.call_function(
+                fn="get_user_recommendations",
+                params=[user_id, media_type.table_name if media_type else None, limit],
+                fetch_type=FetchType.FETCH,
+            )
+            return [dict(r) for r in rows]
+        except Exception as e:
+            handler.error_handle(e, context=f"Recommender.recommend({user_id})")
+            return []
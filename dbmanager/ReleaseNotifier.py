@@ -0,0 +1,201 @@
+# ============================================================================ #
+# MODULE: ReleaseNotifier.py
+
+# ============================================================================ #
+import asyncio
+import heapq
+from datetime import datetime, time, timezone, date
+import discord
+from rimiru import Rimiru
+from models import Episode
+from dbmanager.ReminderLedger import reminder_ledger, RELEASE
+from dbmanager.WatcherIndex import watcher_index
+from handle import handler
+from settings import RELEASE_NOTIFY_HOUR_UTC
+from dispatch import outbox
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Event-driven "new episode out" DMs. Each tracked series' next_episode_to_air
+# sits in a min-heap keyed by release time; the loop sleeps until the earliest
+# one, then DMs only the users tracking that series.
+# The updater (separate process) sends NOTIFY series_updated <series_id> after
+# a refresh, which reschedules that series. Rescheduling is lazy: the newest
+# entry per series lives in `scheduled`, older heap entries are skipped on pop.
+# If the LISTEN connection drops, Rimiru re-establishes it and every series is
+# reloaded, since notifications sent in between are gone. Dates are compared in
+# UTC, the same clock release_time uses. An error anywhere in the loop is
+# logged and the loop carries on after RETRY_DELAY, like the outbox worker.
+# ============================================================================ #
+
+SERIES_UPDATED_CHANNEL = "series_updated"
+MAX_SLEEP = 3600  # cap single sleeps so long waits stay accurate
+RETRY_DELAY = 60  # seconds before the loop carries on after an unexpected error
+
+
+class ReleaseNotifier:
+    def __init__(self):
+        self.heap: list[tuple[datetime, int, int, int]] = []  # (release_at, series_id, season, episode)
+        self.scheduled: dict[int, tuple[datetime, int, int, int]] = {}
+        self.wakeup = asyncio.Event()
+
+    # ============================================================================ #
+    #                                  SCHEDULING                                  #
+    # ============================================================================ #
+
+    @staticmethod
+    def release_time(air_date: date) -> datetime:
+        return datetime.combine(air_date, time(hour=RELEASE_NOTIFY_HOUR_UTC), tzinfo=timezone.utc)
+
+    def schedule(self, series_id: int, episode: Episode | None):
+        """(Re)schedule a series' next episode. Past or undated episodes are dropped."""
+        if not episode or not episode.air_date or episode.air_date < datetime.now(timezone.utc).date():
+            self.scheduled.pop(series_id, None)
+            return
+        entry = (self.release_time(episode.air_date), series_id, episode.season_number, episode.episode_number)
+        if self.scheduled.get(series_id) == entry:
+            return
+        self.scheduled[series_id] = entry
+        heapq.heappush(self.heap, entry)
+        self.wakeup.set()
+
+    async def load(self):
+        """Seed the heap from every series with a known next episode."""
+        conn = await Rimiru.shion()
+        try:
+            rows = await conn.select("series", columns=["id", "next_episode_to_air"], raw_where="next_episode_to_air IS NOT NULL")
+            for row in rows:
+                self.schedule(row["id"], Episode.from_dict(row["next_episode_to_air"]))
+            handler.log_task(context="RELEASES", message=f"[RELEASES] Tracking {len(self.scheduled)} upcoming releases", level="Info")
+        except Exception as e:
+            handler.error_handle(e, context="ReleaseNotifier.load")
+
+    async def refresh_series(self, series_id: int):
+        """Reload one series after the updater changed it."""
+        conn = await Rimiru.shion()
+        try:
+            row = await conn.selectOne("series", columns=["id", "next_episode_to_air"], filters={"id": series_id})
+            self.schedule(series_id, Episode.from_dict(row["next_episode_to_air"]) if row else None)
+        except Exception as e:
+            handler.error_handle(e, context=f"ReleaseNotifier.refresh_series({series_id})")
+
+    def _on_series_updated(self, connection, pid, channel, payload):
+        if payload and payload.isdigit():
+            asyncio.get_running_loop().create_task(self.refresh_series(int(payload)))
+
+    def _on_listen_restored(self):
+        asyncio.get_running_loop().create_task(self.load())
+
+    # ============================================================================ #
+    #                                 NOTIFICATIONS                                #
+    # ============================================================================ #
+
+    async def get_series_watchers(self, series_id: int) -> list[int]:
+        """Users watching (or planning to watch) a series."""
+        if watcher_index.ready:
+            return list(watcher_index.watchers(series_id))
+        conn = await Rimiru.shion()
+        try:
+            rows = await conn.select(
+                "user_media",
+                columns=["user_id"],
+                filters={"media_id": series_id},
+                raw_where="status IN ('watchlist','watching')",
+            )
+            return [r["user_id"] for r in rows]
+        except Exception as e:
+            handler.error_handle(e, context=f"get_series_watchers({series_id})")
+            return []
+
+    async def build_release_embed(self, series_id: int, season: int, episode: int) -> discord.Embed | None:
+        conn = await Rimiru.shion()
+        media = await conn.selectOne("media", columns=["title", "poster_path"], filters={"id": series_id})
+        if not media:
+            return None
+        embed = discord.Embed(
+            title=f"🎬 New episode out today: {media['title']}",
+            description=f"S{season}E{episode} is now available.",
+            color=discord.Color.green(),
+            timestamp=datetime.now(timezone.utc),
+        )
+        if media.get("poster_path"):
+            embed.set_thumbnail(url=f"https://image.tmdb.org/t/p/w500{media['poster_path']}")
+        return embed
+
+    async def _send(self, user_id: int, embed: discord.Embed, episode: tuple[int, int, int]):
+        if await outbox.enqueue(user_id, embeds=[embed]):
+            await reminder_ledger.record(user_id, RELEASE, [episode])
+
+    async def announce(self, client, series_id: int, season: int, episode: int):
+        try:
+            watchers = [
+                user_id for user_id in await self.get_series_watchers(series_id)
+                if await reminder_ledger.is_new(user_id, RELEASE, series_id, season, episode)
+            ]
+            if not watchers:
+                return
+            embed = await self.build_release_embed(series_id, season, episode)
+            if not embed:
+                return
+            for user_id in watchers:
+                await self._send(user_id, embed, (series_id, season, episode))
+            handler.log_task(context="RELEASES", message=f"[RELEASES] Series {series_id} S{season}E{episode}: queued for {len(watchers)} users", level="Info")
+        except Exception as e:
+            handler.error_handle(e, context=f"ReleaseNotifier.announce({series_id})")
+
+    # ============================================================================ #
+    #                                     LOOP                                     #
+    # ============================================================================ #
+
+    async def _listen(self):
+        """LISTEN for updater refreshes, retrying until the database lets us."""
+        while True:
+            try:
+                conn = await Rimiru.shion()
+                return conn, await conn.listen(SERIES_UPDATED_CHANNEL, self._on_series_updated, on_reconnect=self._on_listen_restored)
+            except Exception as e:
+                handler.error_handle(e, context="ReleaseNotifier.listen")
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _step(self, client):
+        """Sleep until the earliest release (or a reschedule), or announce it if it is due."""
+        self.wakeup.clear()
+        # drop entries superseded by a later reschedule
+        while self.heap and self.scheduled.get(self.heap[0][1]) != self.heap[0]:
+            heapq.heappop(self.heap)
+
+        if not self.heap:
+            delay = MAX_SLEEP
+        else:
+            delay = (self.heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        release_at, series_id, season, episode = heapq.heappop(self.heap)
+        self.scheduled.pop(series_id, None)
+        await self.announce(client, series_id, season, episode)
+
+    async def run(self, client):
+        conn, listener = await self._listen()
+        try:
+            await self.load()
+            while True:
+                try:
+                    await self._step(client)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    handler.error_handle(e, context="ReleaseNotifier.run")
+                    await asyncio.sleep(RETRY_DELAY)
+        finally:
+            await conn.unlisten(listener)
+
+
+# Global instance — one heap per bot process
+release_notifier = ReleaseNotifier()
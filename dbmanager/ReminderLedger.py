@@ -0,0 +1,67 @@
+# ============================================================================ #
+# MODULE: ReminderLedger.py
+
+# ============================================================================ #
+from datetime import datetime, timezone
+from rimiru import Rimiru
+from handle import handler
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Remembers the last (season, episode) each user was notified about per series,
+# so reminders only go out for new information. Backed by `reminder_state`
+# (sql/003_reminder_state.sql) and cached per (user, kind) after first read.
+# ============================================================================ #
+
+UPCOMING = "upcoming"
+RELEASE = "release"
+
+
+class ReminderLedger:
+    def __init__(self):
+        self._cache: dict[tuple[int, str], dict[int, tuple[int, int]]] = {}
+
+    async def last_notified(self, user_id: int, kind: str) -> dict[int, tuple[int, int]]:
+        """{series_id: (season, episode)} last sent to this user for `kind`."""
+        key = (user_id, kind)
+        if key in self._cache:
+            return self._cache[key]
+        conn = await Rimiru.shion()
+        try:
+            rows = await conn.select("reminder_state", columns=["series_id", "season", "episode"], filters={"user_id": user_id, "kind": kind})
+            self._cache[key] = {r["series_id"]: (r["season"], r["episode"]) for r in rows}
+        except Exception as e:
+            handler.error_handle(e, context=f"ReminderLedger.last_notified({user_id}, {kind})")
+            return {}  # don't cache a failed read
+        return self._cache[key]
+
+    async def is_new(self, user_id: int, kind: str, series_id: int, season: int, episode: int) -> bool:
+        last = (await self.last_notified(user_id, kind)).get(series_id)
+        return last is None or (season, episode) > last
+
+    async def record(self, user_id: int, kind: str, episodes: list[tuple[int, int, int]]):
+        """Mark (series_id, season, episode) entries as sent to this user."""
+        if not episodes:
+            return
+        conn = await Rimiru.shion()
+        try:
+            now = datetime.now(timezone.utc)
+            await conn.bulk_upsert(
+                "reminder_state",
+                [
+                    {"user_id": user_id, "kind": kind, "series_id": series_id, "season": season, "episode": episode, "notified_at": now}
+                    for series_id, season, episode in episodes
+                ],
+                conflict_column="user_id, kind, series_id",
+            )
+            cached = self._cache.get((user_id, kind))
+            if cached is not None:  # otherwise the next read loads it from the DB
+                for series_id, season, episode in episodes:
+                    cached[series_id] = (season, episode)
+        except Exception as e:
+            handler.error_handle(e, context=f"ReminderLedger.record({user_id}, {kind})")
+
+
+# Global instance — shared cache for every reminder sender
+reminder_ledger = ReminderLedger()
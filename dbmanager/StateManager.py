@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+import json
+from handle import handler
+from rimiru import Rimiru
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Checkpoints for background jobs live in the `sync_state` key/value table
+# (see sql/001_sync_state.sql). Values are small JSON documents.
+# ============================================================================ #
+
+
+async def get_state(key: str) -> dict:
+    """Return the stored state for `key`, or an empty dict if none is saved."""
+    conn = await Rimiru.shion()
+    try:
+        row = await conn.selectOne("sync_state", columns=["value"], filters={"key": key})
+        if not row or not row.get("value"):
+            return {}
+        value = row["value"]
+        return json.loads(value) if isinstance(value, str) else dict(value)
+    except Exception as e:
+        handler.error_handle(e, context=f"get_state({key})")
+        return {}
+
+
+async def set_state(key: str, value: dict) -> None:
+    """Insert or replace the stored state for `key`."""
+    conn = await Rimiru.shion()
+    try:
+        await conn.upsert("sync_state", {"key": key, "value": value, "updated_at": datetime.now(timezone.utc)}, conflict_column="key")
+    except Exception as e:
+        handler.error_handle(e, context=f"set_state({key})")
@@ -0,0 +1,137 @@
+# ============================================================================ #
+# MODULE: WatcherIndex.py
+
+# ============================================================================ #
+import asyncio
+from array import array
+from bisect import bisect_left
+from handle import handler
+from rimiru import Rimiru
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# In-memory inverted index media_id -> sorted array('q') of user ids tracking
+# it (status watchlist/watching), so "who tracks this series?" is one dict
+# lookup instead of a user_media scan. 8 bytes per pair.
+# Built at startup by streaming user_media in (media_id, user_id) order, so
+# each array is filled by appends. MovieManager's write methods keep it
+# current; bulk writers from other processes (import_history.py) send
+# NOTIFY user_media_changed, which triggers a rebuild. A notification that
+# lands mid-rebuild marks the index dirty and queues one more rebuild, since
+# the running stream may already be past the change. If the LISTEN connection
+# drops it is re-established and the index rebuilt, to cover anything missed.
+# ============================================================================ #
+
+USER_MEDIA_CHANGED_CHANNEL = "user_media_changed"
+TRACKING_STATUSES = ("watchlist", "watching")
+
+
+class WatcherIndex:
+    def __init__(self):
+        self.index: dict[int, array] = {}
+        self.ready = False
+        self.task: asyncio.Task | None = None
+        self._rebuild: asyncio.Task | None = None
+        self._listener = None
+        self._dirty = False  # a change arrived while a rebuild was running
+        self._pending: list[tuple[int, int, str | None]] | None = None  # writes seen while a rebuild streams
+
+    # ============================================================================ #
+    #                                    QUERIES                                   #
+    # ============================================================================ #
+
+    def watchers(self, media_id: int) -> array:
+        """User ids tracking `media_id` (empty if none)."""
+        return self.index.get(media_id, array("q"))
+
+    def __len__(self) -> int:
+        return sum(len(users) for users in self.index.values())
+
+    # ============================================================================ #
+    #                                    UPDATES                                   #
+    # ============================================================================ #
+
+    def add(self, user_id: int, media_id: int):
+        users = self.index.setdefault(media_id, array("q"))
+        i = bisect_left(users, user_id)
+        if i == len(users) or users[i] != user_id:
+            users.insert(i, user_id)
+
+    def remove(self, user_id: int, media_id: int):
+        users = self.index.get(media_id)
+        if not users:
+            return
+        i = bisect_left(users, user_id)
+        if i < len(users) and users[i] == user_id:
+            del users[i]
+            if not users:
+                del self.index[media_id]
+
+    def set_status(self, user_id: int, media_id: int, status: str | None):
+        """Apply a user_media upsert (or delete, with status None)."""
+        if self._pending is not None:
+            self._pending.append((user_id, media_id, status))
+        if status and status.strip() in TRACKING_STATUSES:
+            self.add(user_id, media_id)
+        else:
+            self.remove(user_id, media_id)
+
+    # ============================================================================ #
+    #                                    LOADING                                   #
+    # ============================================================================ #
+
+    async def load(self):
+        """Rebuild from user_media; the old index keeps serving until the new one is complete."""
+        conn = await Rimiru.shion()
+        self._pending = []
+        try:
+            index: dict[int, array] = {}
+            current_id, users = None, None
+            async for row in conn.stream(
+                "user_media",
+                columns=["media_id", "user_id"],
+                raw_where="status = ANY($1)",
+                raw_params=[list(TRACKING_STATUSES)],
+                order_by="media_id, user_id",
+            ):
+                if row["media_id"] != current_id:
+                    current_id = row["media_id"]
+                    users = index[current_id] = array("q")
+                users.append(row["user_id"]) # type: ignore
+            # replay writes that raced the stream onto the fresh index
+            pending, self._pending = self._pending, None
+            self.index = index
+            for change in pending:
+                self.set_status(*change)
+            self.ready = True
+            handler.log_task(context="WATCHERS", message=f"[WATCHERS] Indexed {len(self)} trackers across {len(index)} media", level="Info")
+        except Exception as e:
+            self._pending = None
+            handler.error_handle(e, context="WatcherIndex.load")
+
+    async def _rebuild_while_dirty(self):
+        while self._dirty:
+            self._dirty = False
+            await self.load()
+
+    def _request_rebuild(self):
+        self._dirty = True
+        if self._rebuild is None or self._rebuild.done():
+            self._rebuild = asyncio.get_running_loop().create_task(self._rebuild_while_dirty())
+
+    def _on_user_media_changed(self, connection, pid, channel, payload):
+        self._request_rebuild()
+
+    async def run(self):
+        conn = await Rimiru.shion()
+        self._listener = await conn.listen(USER_MEDIA_CHANGED_CHANNEL, self._on_user_media_changed, on_reconnect=self._request_rebuild)
+        await self.load()
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+
+# Global instance — one index per bot process
+watcher_index = WatcherIndex()
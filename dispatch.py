@@ -0,0 +1,368 @@
+"""
+Outbound DM delivery helpers shared by every bulk sender.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import discord
+from settings import DM_CONCURRENCY_INITIAL, DM_CONCURRENCY_MAX, OUTBOX_POLL_INTERVAL, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, DM_CHANNEL_CACHE_SIZE, OUTBOX_RETENTION_DAYS, OUTBOX_PRUNE_INTERVAL
+from dbmanager import OutboxManager
+from views.ReminderEmbeds import pack_embeds
+from handle import handler
+
+
+# ============================================================================ #
+#                                  FAN-OUT STATS                               #
+# ============================================================================ #
+@dataclass
+class FanoutStats:
+    """Per-run counters for a bulk DM job."""
+    sent: int = 0
+    forbidden: int = 0
+    retried: int = 0
+    failed: int = 0
+    peak_concurrency: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def wall_time(self) -> float:
+        return time.monotonic() - self.started
+
+    def summary(self) -> str:
+        return (
+            f"sent={self.sent} forbidden={self.forbidden} retried={self.retried} "
+            f"failed={self.failed} peak_concurrency={self.peak_concurrency} wall_time={self.wall_time:.1f}s"
+        )
+
+
+# ============================================================================ #
+#                              ADAPTIVE CONCURRENCY                            #
+# ============================================================================ #
+class AdaptiveLimiter:
+    """
+    AIMD concurrency control for Discord REST calls.
+    - every success grows the limit by 1/limit (≈ +1 per full window of successes)
+    - a 429 or retryable HTTPException halves it
+    - Retry-After / X-RateLimit-Reset-After from the failed response pauses all callers
+    """
+
+    def __init__(self, initial: int = DM_CONCURRENCY_INITIAL, minimum: int = 1, maximum: int = DM_CONCURRENCY_MAX):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.resume_at = 0.0  # monotonic time before which nobody may send
+        self._cond = asyncio.Condition()
+
+    @staticmethod
+    def _retry_after(error: discord.DiscordException) -> float:
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        headers = getattr(error.response, "headers", None) or {}
+        for header in ("Retry-After", "X-RateLimit-Reset-After"):
+            try:
+                return float(headers[header])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return 1.0
+
+    def _increase(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _decrease(self, retry_after: float):
+        self.limit = max(self.minimum, self.limit / 2)
+        self.resume_at = max(self.resume_at, time.monotonic() + retry_after)
+
+    async def _acquire(self, stats: FanoutStats | None):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            if stats:
+                stats.peak_concurrency = max(stats.peak_concurrency, self.in_flight)
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def call(self, fn, stats: FanoutStats | None = None, retries: int = 3):
+        """
+        Run one REST call (`fn` returns an awaitable) under the adaptive limit.
+        Forbidden and other 4xx errors are raised immediately; 429s and 5xx are
+        retried after backing off. When `stats` is given the outcome is counted as a DM.
+        """
+        error: discord.DiscordException | None = None
+        for attempt in range(retries + 1):
+            if attempt and stats:
+                stats.retried += 1
+            await self._acquire(stats)
+            try:
+                result = await fn()
+            except discord.Forbidden:
+                if stats:
+                    stats.forbidden += 1
+                raise
+            except discord.RateLimited as e:
+                error = e
+                self._decrease(self._retry_after(e))
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    if stats:
+                        stats.failed += 1
+                    raise
+                error = e
+                self._decrease(self._retry_after(e))
+            else:
+                self._increase()
+                if stats:
+                    stats.sent += 1
+                return result
+            finally:
+                await self._release()
+        if stats:
+            stats.failed += 1
+        raise error # type: ignore
+
+
+# Global instance — DM capacity is shared by every sender in the process
+dm_limiter = AdaptiveLimiter()
+
+
+# ============================================================================ #
+#                                  DM RESOLVER                                 #
+# ============================================================================ #
+class DMResolver:
+    """
+    Finds something to `.send()` to for a user with as few REST calls as possible:
+    1. bounded in-memory LRU of recent results
+    2. the gateway cache (`client.get_user`) when it already holds the DM channel
+    3. the persisted user_id -> dm_channel_id map, as a PartialMessageable
+    4. only then `client.create_dm` over REST, remembering the new channel id
+    """
+
+    def __init__(self, maxsize: int = DM_CHANNEL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.cache: OrderedDict[int, discord.abc.Messageable] = OrderedDict()
+        self.stored: dict[int, int] = {}  # prefetched channel ids, consumed by resolve()
+        self.rest_calls = 0
+
+    def _remember(self, user_id: int, channel: discord.abc.Messageable):
+        self.cache[user_id] = channel
+        self.cache.move_to_end(user_id)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    async def prefetch(self, user_ids: list[int]):
+        """Load stored channel ids for a batch of users in one query."""
+        missing = [user_id for user_id in user_ids if user_id not in self.cache and user_id not in self.stored]
+        if missing:
+            self.stored.update(await OutboxManager.get_dm_channel_ids(missing))
+
+    async def resolve(self, client, user_id: int, limiter: AdaptiveLimiter) -> discord.abc.Messageable:
+        channel = self.cache.get(user_id)
+        if channel is not None:
+            self.cache.move_to_end(user_id)
+            return channel
+
+        user = client.get_user(user_id)
+        channel_id = self.stored.pop(user_id, None)
+        if user and user.dm_channel:
+            channel = user.dm_channel
+        elif channel_id:
+            channel = client.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+        else:
+            self.rest_calls += 1
+            channel = await limiter.call(lambda: client.create_dm(user or discord.Object(id=user_id)))
+            await OutboxManager.save_dm_channel_id(user_id, channel.id)
+        self._remember(user_id, channel)
+        return channel
+
+    async def forget(self, user_id: int):
+        """Drop a channel that turned out to be unusable."""
+        self.cache.pop(user_id, None)
+        self.stored.pop(user_id, None)
+        await OutboxManager.forget_dm_channel_id(user_id)
+
+
+# ============================================================================ #
+#                                   DM OUTBOX                                  #
+# ============================================================================ #
+MAX_CONTENT_CHARS = 2000  # Discord message content limit
+
+
+class OutboxWorker:
+    """
+    Delivers rows from the dm_outbox table. Senders call `enqueue` and return
+    immediately; the worker claims due rows from its cursor onwards, merges each
+    user's pending DMs into as few messages as possible, retries failures with
+    backoff and deletes messages once their `delete_at` passes.
+    """
+
+    def __init__(self, limiter: AdaptiveLimiter = dm_limiter):
+        self.limiter = limiter
+        self.resolver = DMResolver()
+        self.cursor = 0
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.next_prune = 0.0
+
+    async def enqueue(self, user_id: int, content: str | None = None, embeds: list[discord.Embed] | None = None,
+                      delete_after: int | None = None, fallback_channel_id: int | None = None) -> int | None:
+        outbox_id = await OutboxManager.enqueue(user_id, content, embeds, delete_after, fallback_channel_id)
+        self.wakeup.set()
+        return outbox_id
+
+    def start(self, client):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(client))
+
+    # ── delivery ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _plan(rows: list[dict]) -> list[tuple[str | None, list[discord.Embed], list[dict]]]:
+        """
+        Group one user's rows into messages. Rows with `delete_after` keep their
+        own message so it can be deleted alone; the rest are merged.
+        """
+        plans = [(row["content"], OutboxManager.row_embeds(row), [row]) for row in rows if row["delete_after"]]
+        merged = [row for row in rows if not row["delete_after"]]
+        content = "\n\n".join(row["content"] for row in merged if row["content"])
+        if len(content) > MAX_CONTENT_CHARS:
+            plans.extend((row["content"], OutboxManager.row_embeds(row), [row]) for row in merged)
+        elif merged:
+            plans.append((content or None, [embed for row in merged for embed in OutboxManager.row_embeds(row)], merged))
+        return plans
+
+    async def _notify_fallback(self, client, rows: list[dict], user_id: int):
+        for channel_id in {row["fallback_channel_id"] for row in rows if row["fallback_channel_id"]}:
+            try:
+                await client.get_partial_messageable(channel_id).send(
+                    f"Unable to send a DM to <@{user_id}>. Please ensure their DMs are open.",
+                    delete_after=300,
+                )
+            except discord.HTTPException as e:
+                handler.log_task(context="OUTBOX", message=f"[OUTBOX] Fallback notice to channel {channel_id} failed: {e}", level="warning")
+
+    async def _deliver_user(self, client, user_id: int, rows: list[dict], stats: FanoutStats):
+        try:
+            channel = await self.resolver.resolve(client, user_id, self.limiter)
+        except discord.Forbidden as e:
+            await OutboxManager.mark_failed([row["id"] for row in rows], str(e))
+            await self._notify_fallback(client, rows, user_id)
+            return
+        except discord.NotFound as e:
+            await OutboxManager.mark_failed([row["id"] for row in rows], str(e))
+            return
+        except Exception as e:
+            await OutboxManager.mark_retry(rows, str(e), OUTBOX_MAX_ATTEMPTS)
+            return
+
+        for content, embeds, plan_rows in self._plan(rows):
+            # embeds[ends[j - 1]:ends[j]] belong to plan_rows[j]
+            ends, total = [], 0
+            for row in plan_rows:
+                total += len(OutboxManager.row_embeds(row))
+                ends.append(total)
+            done_rows = 0   # plan_rows[:done_rows] are recorded as sent
+            delivered = 0   # embeds delivered so far
+            content_sent = False  # the merged content goes out with the first message
+            try:
+                for i, batch in enumerate(pack_embeds(embeds) or [[]]):
+                    message = await self.limiter.call(
+                        lambda batch=batch, text=content if i == 0 else None: channel.send(content=text, embeds=batch), stats
+                    )
+                    delivered += len(batch)
+                    content_sent = True
+                    # record every row this message completed, so a later failure doesn't resend it
+                    finished = done_rows
+                    while finished < len(plan_rows) and ends[finished] <= delivered:
+                        finished += 1
+                    if finished > done_rows:
+                        await OutboxManager.mark_sent([row["id"] for row in plan_rows[done_rows:finished]], message, plan_rows[0]["delete_after"])
+                        done_rows = finished
+            except discord.Forbidden as e:
+                await OutboxManager.mark_failed([row["id"] for row in plan_rows[done_rows:]], str(e))
+                await self._notify_fallback(client, plan_rows[done_rows:], user_id)
+            except discord.NotFound as e:
+                await self.resolver.forget(user_id)  # stale stored channel; reopen it on the retry
+                await self._retry_rest(plan_rows, ends, done_rows, delivered, content_sent, str(e))
+                return
+            except Exception as e:
+                await self._retry_rest(plan_rows, ends, done_rows, delivered, content_sent, str(e))
+
+    @staticmethod
+    async def _retry_rest(plan_rows: list[dict], ends: list[int], done_rows: int, delivered: int, content_sent: bool, error: str):
+        """Requeue what a failed plan didn't deliver, trimming anything of those rows that already went out."""
+        rest = plan_rows[done_rows:]
+        if not rest:
+            return
+        for j in range(done_rows, len(plan_rows)):
+            row = plan_rows[j]
+            start = ends[j - 1] if j else 0
+            sent_embeds = min(max(delivered - start, 0), ends[j] - start)
+            if sent_embeds or (content_sent and row["content"]):
+                remaining = [embed.to_dict() for embed in OutboxManager.row_embeds(row)[sent_embeds:]]
+                await OutboxManager.trim_delivered(row["id"], remaining)
+        await OutboxManager.mark_retry(rest, error, OUTBOX_MAX_ATTEMPTS)
+
+    async def deliver_due(self, client) -> int:
+        rows = await OutboxManager.claim_due(self.cursor, OUTBOX_BATCH_SIZE)
+        if not rows:
+            return 0
+        by_user: dict[int, list[dict]] = {}
+        for row in rows:
+            by_user.setdefault(row["user_id"], []).append(row)
+
+        await self.resolver.prefetch(list(by_user))
+        stats = FanoutStats()
+        rest_calls = self.resolver.rest_calls
+        await asyncio.gather(*(self._deliver_user(client, user_id, user_rows, stats) for user_id, user_rows in by_user.items()), return_exceptions=True)
+        self.cursor = await OutboxManager.advance_cursor(self.cursor)
+        handler.log_task(context="OUTBOX", message=f"[OUTBOX] Delivered {len(rows)} queued DMs to {len(by_user)} users: {stats.summary()} dm_opens={self.resolver.rest_calls - rest_calls}", level="Info")
+        return len(rows)
+
+    # ── scheduled deletion ───────────────────────────────────────────────
+
+    async def delete_due(self, client):
+        rows = await OutboxManager.due_deletions(OUTBOX_BATCH_SIZE)
+        for row in rows:
+            try:
+                message = client.get_partial_messageable(row["channel_id"]).get_partial_message(row["message_id"])
+                await self.limiter.call(message.delete)
+            except (discord.NotFound, discord.Forbidden):
+                pass  # already gone, or the DM channel is no longer reachable
+            except discord.HTTPException as e:
+                handler.log_task(context="OUTBOX", message=f"[OUTBOX] Could not delete message {row['message_id']}: {e}", level="warning")
+                await OutboxManager.mark_delete_retry(row, str(e), OUTBOX_MAX_ATTEMPTS)
+                continue
+            await OutboxManager.mark_deleted([row["id"]])
+
+    # ── loop ─────────────────────────────────────────────────────────────
+
+    async def run(self, client):
+        self.cursor = await OutboxManager.get_cursor()
+        while True:
+            self.wakeup.clear()
+            try:
+                if await self.deliver_due(client) >= OUTBOX_BATCH_SIZE:
+                    self.wakeup.set()  # more rows are waiting
+                await self.delete_due(client)
+                if time.monotonic() >= self.next_prune:
+                    self.next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL
+                    await OutboxManager.prune(OUTBOX_RETENTION_DAYS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                handler.error_handle(e, context="OutboxWorker.run")
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global instance — started from Client.setup_hook
+outbox = OutboxWorker()
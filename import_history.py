@@ -0,0 +1,38 @@
+import asyncio
+import argparse
+import csv
+from pathlib import Path
+from dbmanager.HistoryImporter import HistoryImporter
+from rimiru import Rimiru
+
+
+async def main(user_id: int, path: Path, fmt: str, unresolved_out: Path | None):
+    importer = HistoryImporter()
+    try:
+        with path.open(newline="", encoding="utf-8-sig") as fp:
+            report = await importer.run(user_id, fp, path.name, fmt)
+    finally:
+        await importer.manager.close()
+        await Rimiru.close()
+
+    print(report.summary())
+    if report.unresolved and unresolved_out:
+        with unresolved_out.open("w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(["type", "title", "year", "imdb_id"])
+            for entry in report.unresolved:
+                writer.writerow([entry.media_type.table_name, entry.title, entry.year or "", entry.imdb_id or ""])
+        print(f"Unresolved titles written to {unresolved_out}")
+    else:
+        for entry in report.unresolved[:20]:
+            print(f"  unresolved: {entry.title} ({entry.year or '?'})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a Letterboxd / IMDb / Trakt export into a user's media records")
+    parser.add_argument("user_id", type=int, help="Discord id of the user to import for")
+    parser.add_argument("path", type=Path, help="CSV or JSON export file")
+    parser.add_argument("--format", choices=["auto", "letterboxd", "imdb", "trakt"], default="auto")
+    parser.add_argument("--unresolved-out", type=Path, help="write titles that could not be matched to this CSV")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.path, args.format, args.unresolved_out))
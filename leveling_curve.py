@@ -0,0 +1,137 @@
+import math
+from functools import lru_cache
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# XP maths for the levelling system. The `levels` table stores (level, xp into
+# that level); reaching level L+1 from L costs int(base_xp * growth ** (L-1)).
+# A LevelCurve computes every step cost and the cumulative XP to reach each
+# level once, as a table, so:
+#   - cost of a level / total XP of a (level, xp) pair is one index,
+#   - total XP -> (level, xp) is a closed-form log estimate (the curve is a
+#     geometric series) corrected against the table, O(1).
+# The table stops at TABLE_LEVELS or before totals would overflow int64, far
+# beyond any real level; past it the step cost falls back to the formula.
+# Guilds can have their own (base_xp, growth) (sql/010_level_curves.sql);
+# curves are shared between guilds with the same parameters, and looking one
+# up is a dict get, so custom curves cost the message hot path nothing.
+# ============================================================================ #
+
+DEFAULT_BASE_XP = 100
+DEFAULT_GROWTH = 1.15
+TABLE_LIMIT = 2 ** 62   # cumulative XP stays inside int64
+TABLE_LEVELS = 1000     # and flat / slow curves stop somewhere
+
+
+class LevelCurve:
+    __slots__ = ("base_xp", "growth", "_costs", "_totals", "_log_growth")
+
+    def __init__(self, base_xp: int = DEFAULT_BASE_XP, growth: float = DEFAULT_GROWTH):
+        if base_xp <= 0 or growth < 1:
+            raise ValueError(f"Invalid level curve: base_xp={base_xp}, growth={growth}")
+        self.base_xp = base_xp
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        # costs[L-1] = XP to go from level L to L+1; totals[L-1] = total XP at the start of level L
+        costs, totals = [], [0]
+        while True:
+            cost = self.formula(len(costs) + 1)
+            if len(costs) >= TABLE_LEVELS or totals[-1] + cost >= TABLE_LIMIT or cost <= 0:
+                break
+            costs.append(cost)
+            totals.append(totals[-1] + cost)
+        self._costs, self._totals = costs, totals
+
+    def formula(self, level: int) -> int:
+        return int(self.base_xp * (self.growth ** (level - 1)))
+
+    @property
+    def max_level(self) -> int:
+        return len(self._totals)
+
+    # ============================================================================ #
+    #                                    SINGLE                                    #
+    # ============================================================================ #
+
+    def xp_for_level(self, level: int) -> int:
+        """XP needed to go from `level` to `level + 1`."""
+        if 1 <= level < self.max_level:
+            return self._costs[level - 1]
+        return self.formula(level)
+
+    def total_xp(self, level: int, xp: int) -> int:
+        """Lifetime XP of someone at `level` with `xp` into it."""
+        if level > self.max_level:
+            return self._totals[-1] + self._past_table(level) + xp
+        return self._totals[max(level, 1) - 1] + xp
+
+    def from_total(self, total: int) -> tuple[int, int]:
+        """(level, xp into that level) for a lifetime XP `total`."""
+        totals = self._totals
+        if total <= 0:
+            return 1, 0
+        if total >= totals[-1]:
+            return self._walk(self.max_level, total - totals[-1])
+        if self._log_growth:
+            level = 1 + int(math.log1p(total * (self.growth - 1) / self.base_xp) / self._log_growth)
+        else:
+            level = 1 + total // self.base_xp
+        level = min(max(level, 1), self.max_level)
+        # the estimate ignores int() truncation of each cost; at most a step off
+        while level < self.max_level and totals[level] <= total:
+            level += 1
+        while level > 1 and totals[level - 1] > total:
+            level -= 1
+        return level, total - totals[level - 1]
+
+    def advance(self, level: int, xp: int, gained: int) -> tuple[int, int]:
+        """(level, xp) after earning `gained` more XP."""
+        if level < 1:
+            level = 1
+        if 0 <= xp + gained < self.xp_for_level(level):
+            return level, xp + gained  # the common case: no level-up
+        if level >= self.max_level:
+            return self._walk(level, xp + gained)
+        return self.from_total(self.total_xp(level, xp) + gained)
+
+    def _past_table(self, level: int) -> int:
+        """XP from the start of the last table level to the start of `level`."""
+        if not self._log_growth:
+            return (level - self.max_level) * self.base_xp
+        return sum(self.formula(step) for step in range(self.max_level, level))
+
+    def _walk(self, level: int, xp: int) -> tuple[int, int]:
+        """Level up step by step past the end of the table."""
+        if not self._log_growth:  # flat curve: every level costs base_xp
+            return level + xp // self.base_xp, xp % self.base_xp
+        while xp >= self.xp_for_level(level):
+            xp -= self.xp_for_level(level)
+            level += 1
+        return level, xp
+
+
+@lru_cache(maxsize=32)
+def get_curve(base_xp: int = DEFAULT_BASE_XP, growth: float = DEFAULT_GROWTH) -> LevelCurve:
+    """Shared curve for these parameters (tables are built once)."""
+    return LevelCurve(base_xp, growth)
+
+
+class CurveRegistry:
+    def __init__(self):
+        self.default = get_curve(DEFAULT_BASE_XP, DEFAULT_GROWTH)
+        self.guilds: dict[int, LevelCurve] = {}
+
+    def for_guild(self, guild_id: int | None) -> LevelCurve:
+        return self.guilds.get(guild_id, self.default) # type: ignore
+
+    def set(self, guild_id: int, base_xp: int, growth: float):
+        curve = get_curve(int(base_xp), float(growth))
+        if curve is self.default:
+            self.guilds.pop(guild_id, None)
+        else:
+            self.guilds[guild_id] = curve
+
+
+# Global instance — one curve registry per bot process
+curves = CurveRegistry()
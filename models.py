@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
 import json
 import random
-from typing import Any, Optional,List,Dict
-from constants import Status, WatchStatus, MediaType
+from typing import Any, Iterable, Mapping, Optional,List,Dict
+from constants import Status, WatchStatus, MediaType, MEDIA_TYPE_LOOKUP
 from datetime import datetime, date
+from progress import SeasonMap, episode_label
 
 # ============================================================================ #
 #                                     NOTES                                    #
@@ -11,10 +12,29 @@ from datetime import datetime, date
 # This module defines data models for users, servers, and media entities.
 # The models include user scores, server details, and media information.
 # These models facilitate structured data handling within the application.
+# Media models are slotted and have a `from_rows` for whole result sets: list
+# commands and reminder runs hydrate hundreds of rows at a time, and from_rows
+# decodes each JSONB column for every row in one json.loads call.
+# benchmarks/model_hydration.py measures rows/sec.
 # TODO: test models and ensure they meet application needs. Also consider expanding
 # with additional fields or methods as necessary.
 # ============================================================================ #
 
+def _loads(value):
+    """Decode a JSONB value asyncpg handed back as text; anything else passes through."""
+    if isinstance(value, str):
+        return json.loads(value) if value else None
+    return value
+
+
+def _json_column(rows: List[Mapping[str, Any]], key: str) -> list:
+    """Decode one JSONB column across all rows with a single json.loads call."""
+    values = [row.get(key) for row in rows]
+    if all(value is None or isinstance(value, str) for value in values):
+        return json.loads("[" + ",".join(value or "null" for value in values) + "]")
+    return [_loads(value) for value in values]
+
+
 @dataclass(frozen=True)
 class User:
     id: int
@@ -43,7 +63,7 @@ class Server:
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Media:
     title: str
     tmdb_id: int
@@ -62,7 +82,7 @@ class Media:
         if isinstance(date_value, date):
             return date_value
         try:
-            return datetime.strptime(date_value, "%Y-%m-%d").date()
+            return date.fromisoformat(date_value)
         except (ValueError, TypeError):
             return None
     
@@ -73,7 +93,7 @@ class Media:
         return f"https://image.tmdb.org/t/p/w500{self.poster_path}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Episode:
     """Represents a single episode"""
     episode_number: int
@@ -123,7 +143,7 @@ class Episode:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Series(Media):
     first_air_date: Optional[date] = None
     last_air_date: Optional[date] = None
@@ -162,11 +182,23 @@ class Series(Media):
         )
     
     @classmethod
-    def from_db(cls, data: dict) -> "Series":
+    def from_db(cls, data: Mapping[str, Any]) -> "Series":
         """Build Series from database row"""
-       # print("Building Series from DB:", data)
-        last_episode = Episode.from_dict(data.get("last_episode_to_air"))
-        next_episode = Episode.from_dict(data.get("next_episode_to_air"))
+        return cls._build(data, Episode.from_dict(data.get("last_episode_to_air")), Episode.from_dict(data.get("next_episode_to_air")))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> List["Series"]:
+        """Hydrate a whole result set; asyncpg Records can be passed as-is."""
+        rows = list(rows)
+        episode = Episode.from_dict
+        build = cls._build
+        return [
+            build(row, episode(last), episode(following))
+            for row, last, following in zip(rows, _json_column(rows, "last_episode_to_air"), _json_column(rows, "next_episode_to_air"))
+        ]
+
+    @classmethod
+    def _build(cls, data: Mapping[str, Any], last_episode: Optional[Episode], next_episode: Optional[Episode]) -> "Series":
         return cls(
             id=data["id"],
             title=data["title"],
@@ -212,6 +244,29 @@ class Series(Media):
             "release_date": self.release_date,
         }
     
+    def episode_rows(self, season_details: Optional[List[dict]] = None) -> Dict[tuple, dict]:
+        """
+        Flatten into {(season, episode): {"air_date", "name"}} for the episodes table.
+        `seasons` only carries episode counts, so names/air dates come from the
+        last/next episode and any full season payloads fetched from TMDB.
+        """
+        seasons = json.loads(self.seasons) if isinstance(self.seasons, str) else self.seasons
+        rows = {}
+        for season in seasons or []:
+            number = season.get("season_number")
+            if not number:  # skip specials (season 0)
+                continue
+            for episode in range(1, (season.get("episode_count") or 0) + 1):
+                rows[(number, episode)] = {"air_date": None, "name": None}
+
+        known = [self.last_episode_to_air, self.next_episode_to_air]
+        for payload in season_details or []:
+            known.extend(Episode.from_dict(ep) for ep in payload.get("episodes", []))
+        for ep in known:
+            if ep and ep.season_number:
+                rows[(ep.season_number, ep.episode_number)] = {"air_date": ep.air_date, "name": ep.name}
+        return rows
+
     @property
     def is_ended(self) -> bool:
         return self.status == "Ended"
@@ -261,7 +316,7 @@ class Series(Media):
             return f"S{ep.season_number}E{ep.episode_number}: {ep.name} (in {days} days)"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Movie(Media):
     collection: Optional[dict] = None
     
@@ -279,8 +334,13 @@ class Movie(Media):
         )
     
     @classmethod
-    def from_db(cls, data: dict) -> "Movie":
-        print("Building Movie from DB:", data)
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> List["Movie"]:
+        """Hydrate a whole result set; asyncpg Records can be passed as-is."""
+        from_db = cls.from_db
+        return [from_db(row) for row in rows]
+
+    @classmethod
+    def from_db(cls, data: Mapping[str, Any]) -> "Movie":
         return cls(
             id=data["id"],
             title=data["title"],
@@ -327,12 +387,12 @@ class Movie(Media):
 
 
 
-@dataclass
+@dataclass(slots=True)
 class UserMedia:
     """
     Represents a user's relationship with a media item.
     Aligned with:
-    - get_user_incomplete_media
+    - get_user_media_page
     - get_user_media_by_id
     """
 
@@ -355,11 +415,15 @@ class UserMedia:
 
     # Dates
     last_updated: Optional[datetime] = None
+    release_date: Optional[date] = None
 
     last_episode_info: Optional[Dict[str, Any]] = None
 
     # Series-only
     next_episode_info: Optional[Dict[str, Any]] = None
+    seasons: Optional[List[Dict[str, Any]]] = None   # cached TMDB seasons (episode counts)
+
+    _season_map: Optional[SeasonMap] = field(default=None, init=False, repr=False, compare=False)
 
     # -----------------------
     # Type helpers
@@ -428,16 +492,37 @@ class UserMedia:
         Human-readable progress from JSONB.
         Assumes {season, episode} unless expanded later.
         """
+        return episode_label(self.position)
+
+    # -----------------------
+    # Progress (from cached seasons, see progress.py)
+    # -----------------------
+
+    @property
+    def season_map(self) -> SeasonMap:
+        if self._season_map is None:
+            self._season_map = SeasonMap.from_series(self.seasons, self.last_episode_info)
+        return self._season_map
+
+    @property
+    def position(self) -> Optional[tuple[int, int]]:
+        """Stored progress snapped onto a real episode, or None if not started."""
         if not self.progress:
             return None
+        return self.season_map.normalise(self.progress.get("season"), self.progress.get("episode")) # type: ignore
 
-        season = self.progress.get("season")
-        episode = self.progress.get("episode")
+    @property
+    def next_unwatched(self) -> Optional[tuple[int, int]]:
+        return self.season_map.next_episode(self.position)
 
-        if season and episode:
-            return f"S{season}E{episode}"
+    @property
+    def episodes_remaining(self) -> Optional[int]:
+        """Aired episodes left to watch; None without season data."""
+        return self.season_map.remaining(self.position) if self.season_map else None
 
-        return None
+    @property
+    def percent_complete(self) -> Optional[float]:
+        return self.season_map.percent(self.position) if self.season_map else None
     @property
     def has_next_episode(self) -> bool:
         return self.next_episode_info is not None
@@ -517,21 +602,34 @@ class UserMedia:
     # -----------------------
 
     @classmethod
-    def from_db(cls, row: Dict[str, Any]) -> "UserMedia":
-       # print(type(row["next_episode_info"]), row["next_episode_info"])
-        next_episode = None
-        progress = None
-        last_episode = None
-        if isinstance(row.get("next_episode_info"), str):
-            next_episode = json.loads(row["next_episode_info"]) if row["next_episode_info"] else None
-        if isinstance(row.get("user_progress"), str):
-            progress = json.loads(row["user_progress"]) if row["user_progress"] else None
-        if isinstance(row.get("last_episode_info"), str):
-            last_episode = json.loads(row["last_episode_info"]) if row["last_episode_info"] else None
-       
+    def from_db(cls, row: Mapping[str, Any]) -> "UserMedia":
+        return cls._build(
+            row,
+            _loads(row.get("user_progress")),
+            _loads(row.get("last_episode_info")),
+            _loads(row.get("next_episode_info")),
+            _loads(row.get("seasons")),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> List["UserMedia"]:
+        """Hydrate a whole result set; asyncpg Records can be passed as-is."""
+        rows = list(rows)
+        columns = zip(
+            _json_column(rows, "user_progress"),
+            _json_column(rows, "last_episode_info"),
+            _json_column(rows, "next_episode_info"),
+            _json_column(rows, "seasons"),
+        )
+        build = cls._build
+        return [build(row, *decoded) for row, decoded in zip(rows, columns)]
+
+    @classmethod
+    def _build(cls, row: Mapping[str, Any], progress, last_episode, next_episode, seasons) -> "UserMedia":
+        media_type = row.get("media_type", "")
         return cls(
             id=row["id"],
-            media_type=MediaType.find_media_type(row.get("media_type", "")), # type: ignore
+            media_type=MEDIA_TYPE_LOOKUP.get(media_type) or MediaType.find_media_type(media_type), # type: ignore
             title=row["title"],
             tmdb_id=row["tmdb_id"],
             overview=row.get("overview"),
@@ -541,10 +639,20 @@ class UserMedia:
             progress=progress,
             last_episode_info=last_episode,
             last_updated=row.get("last_updated"),
+            release_date=row.get("release_date"),
             next_episode_info=next_episode,
+            seasons=seasons,
         )
 
 
+@dataclass(slots=True)
+class UserMediaPage:
+    """One keyset page of a user's media list (see get_user_media_page)."""
+    items: List[UserMedia]
+    total: Optional[int] = None                              # only known for the first page
+    next_cursor: Optional[tuple[datetime, int]] = None       # (last_updated, media_id) of this page's last row
+
+
 
 @dataclass
 class Match:
@@ -0,0 +1,141 @@
+from bisect import bisect_left
+import json
+from typing import Any, Optional
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Series progress maths over the cached TMDB `seasons` list in the series
+# table, so /incomplete and friends never need a TMDB call for it.
+# Episode counts are folded into prefix sums once; a (season, episode) pair
+# then maps to an absolute episode number with a dict lookup, which makes
+# "episodes remaining", "percent complete" and "+1 episode" O(1).
+# Specials (season 0) are not counted. "Aired" is capped at
+# last_episode_to_air when known, since TMDB counts announced episodes too.
+# ============================================================================ #
+
+
+class SeasonMap:
+    """Prefix sums over a series' per-season episode counts."""
+
+    __slots__ = ("numbers", "counts", "offsets", "position", "total", "aired")
+
+    def __init__(self, seasons: Optional[list[dict]] = None, last_aired: Optional[tuple[int, int]] = None):
+        entries = sorted(
+            (s["season_number"], s.get("episode_count") or 0)
+            for s in seasons or []
+            if s.get("season_number") and (s.get("episode_count") or 0) > 0
+        )
+        self.numbers = [number for number, _ in entries]
+        self.counts = [count for _, count in entries]
+        self.position = {number: i for i, number in enumerate(self.numbers)}
+        # offsets[i] = episodes before season numbers[i]; offsets[-1] = total
+        self.offsets = [0]
+        for count in self.counts:
+            self.offsets.append(self.offsets[-1] + count)
+        self.total = self.offsets[-1]
+        self.aired = self.total
+        if last_aired and self.total:
+            self.aired = self.absolute(*self.normalise(*last_aired) or (0, 0))
+
+    @classmethod
+    def from_series(cls, seasons: Any, last_episode: Any = None) -> "SeasonMap":
+        """Build from raw DB values: `seasons` may be a JSON string, `last_episode` a dict or Episode."""
+        if isinstance(seasons, str):
+            seasons = json.loads(seasons)
+        if isinstance(last_episode, str):
+            last_episode = json.loads(last_episode)
+        if isinstance(last_episode, dict):
+            last_aired = (last_episode.get("season_number"), last_episode.get("episode_number"))
+        elif last_episode is not None:
+            last_aired = (last_episode.season_number, last_episode.episode_number)
+        else:
+            last_aired = None
+        if last_aired and not all(last_aired):
+            last_aired = None
+        return cls(seasons, last_aired) # type: ignore
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    # ============================================================================ #
+    #                                  POSITIONS                                   #
+    # ============================================================================ #
+
+    def normalise(self, season: int, episode: int) -> Optional[tuple[int, int]]:
+        """
+        Snap user input onto a real episode.
+        An episode past the end of its season rolls into the next ones (S1E15 of
+        a 10+12 show is S2E5); anything past the last episode clamps to it.
+        Returns None for input that can't be placed (non-positive numbers).
+        With no season data the input is passed through unchecked.
+        """
+        if not season or not episode or season < 1 or episode < 1:
+            return None
+        if not self:
+            return season, episode
+        i = self.position.get(season)
+        if i is None:
+            # unknown season: before our data starts -> first episode, past it -> last
+            if season < self.numbers[0]:
+                return self.numbers[0], 1
+            if season > self.numbers[-1]:
+                return self.numbers[-1], self.counts[-1]
+            i = bisect_left(self.numbers, season)
+            return self.numbers[i], 1
+        if episode <= self.counts[i]:
+            return season, episode
+        return self.at(min(self.offsets[i] + episode, self.total))
+
+    def absolute(self, season: int, episode: int) -> int:
+        """1-based position of a normalised (season, episode) across the whole show."""
+        return self.offsets[self.position[season]] + episode
+
+    def at(self, n: int) -> tuple[int, int]:
+        """(season, episode) for absolute episode `n` (1..total)."""
+        i = bisect_left(self.offsets, n) - 1
+        return self.numbers[i], n - self.offsets[i]
+
+    # ============================================================================ #
+    #                                   PROGRESS                                   #
+    # ============================================================================ #
+
+    def increment(self, season: int, episode: int, by: int = 1) -> Optional[tuple[int, int]]:
+        """The episode `by` after (season, episode), or None once the show runs out."""
+        i = self.position[season]
+        if episode + by <= self.counts[i]:
+            return season, episode + by
+        n = self.offsets[i] + episode + by
+        if n > self.total:
+            return None
+        if i + 1 < len(self.numbers) and n <= self.offsets[i + 2]:
+            return self.numbers[i + 1], n - self.offsets[i + 1]
+        return self.at(n)
+
+    def next_episode(self, progress: Optional[tuple[int, int]]) -> Optional[tuple[int, int]]:
+        """First unwatched episode, or None when caught up with what has aired."""
+        if not self:
+            return None
+        if progress is None:
+            return (self.numbers[0], 1) if self.aired else None
+        following = self.increment(*progress)
+        if following is None or self.absolute(*following) > self.aired:
+            return None
+        return following
+
+    def watched(self, progress: Optional[tuple[int, int]]) -> int:
+        return self.absolute(*progress) if progress and self else 0
+
+    def remaining(self, progress: Optional[tuple[int, int]]) -> int:
+        """Aired episodes not yet watched."""
+        return max(self.aired - self.watched(progress), 0)
+
+    def percent(self, progress: Optional[tuple[int, int]]) -> float:
+        """Share of aired episodes watched, 0-100."""
+        if not self.aired:
+            return 0.0
+        return min(self.watched(progress) / self.aired, 1.0) * 100
+
+
+def episode_label(position: Optional[tuple[int, int]]) -> Optional[str]:
+    return f"S{position[0]}E{position[1]}" if position else None
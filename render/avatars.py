@@ -0,0 +1,137 @@
+"""
+Process-wide cache of circular-cropped avatar tiles for rendered images.
+"""
+import asyncio
+import aiohttp
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+import discord
+from PIL import Image, ImageChops, ImageDraw
+from settings import AVATAR_FETCH_CONCURRENCY, AVATAR_FETCH_SIZE, AVATAR_CACHE_MAX_BYTES
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Tiles are keyed by (avatar hash, size) and hold the final RGBA image, so a
+# repeat render of the same member skips the download, the decode, the resize
+# and the mask. Discord gives a changed avatar a new hash, so entries never go
+# stale; they only get evicted (LRU) once the tiles exceed AVATAR_CACHE_MAX_BYTES.
+# Concurrent misses on one key share a single download.
+# ============================================================================ #
+
+SUPERSAMPLE = 4  # mask is drawn this much larger and scaled down for smooth edges
+
+
+@lru_cache(maxsize=8)
+def circle_mask(size: int) -> Image.Image:
+    """Anti-aliased circular alpha mask, built once per tile size."""
+    big = Image.new("L", (size * SUPERSAMPLE, size * SUPERSAMPLE), 0)
+    ImageDraw.Draw(big).ellipse((0, 0, size * SUPERSAMPLE - 1, size * SUPERSAMPLE - 1), fill=255)
+    return big.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def make_tile(data: bytes, size: int) -> Image.Image:
+    """Decode avatar bytes into a `size`x`size` circular RGBA tile."""
+    with Image.open(BytesIO(data)) as src:
+        src.draft("RGB", (size, size))  # lets JPEG decode at a reduced scale
+        tile = src.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+    tile.putalpha(ImageChops.multiply(tile.getchannel("A"), circle_mask(size)))
+    return tile
+
+
+class AvatarCache:
+    def __init__(self, max_bytes: int = AVATAR_CACHE_MAX_BYTES, concurrency: int = AVATAR_FETCH_CONCURRENCY):
+        self.max_bytes = max_bytes
+        self.tiles: OrderedDict[tuple[str, int], Image.Image] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.failures = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: dict[tuple[str, int], asyncio.Future] = {}
+
+    # ============================================================================ #
+    #                                     STORE                                    #
+    # ============================================================================ #
+
+    @staticmethod
+    def _cost(tile: Image.Image) -> int:
+        return tile.width * tile.height * 4
+
+    def _store(self, key: tuple[str, int], tile: Image.Image):
+        self.tiles[key] = tile
+        self.bytes += self._cost(tile)
+        while self.bytes > self.max_bytes and len(self.tiles) > 1:
+            _, evicted = self.tiles.popitem(last=False)
+            self.bytes -= self._cost(evicted)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "tiles": len(self.tiles),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "failures": self.failures,
+        }
+
+    # ============================================================================ #
+    #                                     FETCH                                    #
+    # ============================================================================ #
+
+    async def _load(self, asset: discord.Asset, size: int) -> Image.Image | None:
+        fetch_size = max(AVATAR_FETCH_SIZE, 1 << (size - 1).bit_length())  # CDN sizes are powers of 2
+        async with self._semaphore:
+            try:
+                data = await asset.with_size(fetch_size).read()
+            except (discord.DiscordException, aiohttp.ClientError, asyncio.TimeoutError):  # HTTP errors and dropped connections alike
+                self.failures += 1
+                return None
+        try:
+            return make_tile(data, size)
+        except (OSError, ValueError):
+            self.failures += 1
+            return None
+
+    async def get(self, asset: discord.Asset | None, size: int) -> Image.Image | None:
+        """The tile for `asset` at `size`, or None if it can't be fetched."""
+        if asset is None:
+            return None
+        key = (asset.key, size)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        pending = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            tile = await self._load(asset, size)
+            if tile is not None:
+                self._store(key, tile)
+            pending.set_result(tile)
+            return tile
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def get_many(self, assets: list[discord.Asset | None], size: int) -> list[Image.Image | None]:
+        return list(await asyncio.gather(*(self.get(asset, size) for asset in assets)))
+
+
+# Global instance — one tile cache per bot process
+avatar_cache = AvatarCache()
@@ -0,0 +1,56 @@
+"""
+Encoder profiles for rendered images.
+"""
+from dataclasses import dataclass, field
+from io import BytesIO
+from PIL import Image
+from settings import RENDER_ENCODER, RENDER_COMPRESS_LEVEL
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Leaderboard pages are flat backgrounds, text and five small avatars, so a
+# 256-colour palette loses nothing visible and deflates far better than RGB.
+# benchmarks/leaderboard_encoders.py reports bytes and encode ms per profile;
+# on typical pages png-quant was the smallest output for the least CPU, so it
+# is the default. RENDER_COMPRESS_LEVEL (0-9) trades CPU for size: it is
+# zlib's level for PNG and is scaled onto WebP's 0-6 `method`.
+# ============================================================================ #
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    name: str
+    format: str                      # PIL format name
+    ext: str                         # file extension for the Discord attachment
+    colors: int | None = None        # quantize to a palette of this many colours first
+    options: dict = field(default_factory=dict)
+
+    def encode(self, img: Image.Image, level: int = RENDER_COMPRESS_LEVEL) -> bytes:
+        if self.colors:
+            img = img.convert("RGB").quantize(self.colors, method=Image.Quantize.FASTOCTREE)
+        options = dict(self.options)
+        if self.format == "PNG":
+            options.setdefault("compress_level", level)
+        elif self.format == "WEBP":
+            options.setdefault("method", round(level * 6 / 9))
+        buffer = BytesIO()
+        img.save(buffer, format=self.format, **options)
+        return buffer.getvalue()
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        EncoderProfile("png", "PNG", "png"),
+        EncoderProfile("png-optimize", "PNG", "png", options={"optimize": True}),
+        EncoderProfile("png-quant", "PNG", "png", colors=256),
+        EncoderProfile("webp-lossless", "WEBP", "webp", options={"lossless": True, "quality": 100}),
+        EncoderProfile("webp", "WEBP", "webp", options={"quality": 90}),
+    )
+}
+
+
+def get_profile(name: str | None = None) -> EncoderProfile:
+    """The named profile, falling back to RENDER_ENCODER and then png-quant."""
+    return PROFILES.get(name or RENDER_ENCODER) or PROFILES["png-quant"]
@@ -0,0 +1,92 @@
+"""
+Font registry and memoised text measurement/rasterisation for render jobs.
+"""
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+from settings import FONT_DIR
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Only the (weight, size) pairs the renderers actually use are listed in SIZES
+# and loaded by preload(), which render.pool runs as each worker's initializer,
+# so no job pays for opening a .ttf; anything else loads on first use.
+# Widths and text masks are memoised per (text, weight, size): pages repeat
+# the same strings ("Level 12", "#3", "XP 3,400") constantly, and a cache hit
+# skips FreeType layout entirely.
+# Masks are only reused at whole-pixel positions (text() rounds xy), which is
+# all the renderers ask for anyway.
+# ============================================================================ #
+
+SIZES = {
+    "Bold": (24, 34, 40),      # leaderboard rows; rank card name, rank and level
+    "SemiBold": (22,),         # rank card progress caption
+}
+TEXT_CACHE_SIZE = 4096
+
+
+class FontRegistry:
+    def __init__(self, font_dir=FONT_DIR):
+        self.font_dir = font_dir
+        self.fonts: dict[tuple[str, int], ImageFont.FreeTypeFont | ImageFont.ImageFont] = {}
+
+    def get(self, weight: str = "Bold", size: int = 24):
+        """OpenSans-{weight} at `size`, falling back to PIL's default font if the file is missing."""
+        font = self.fonts.get((weight, size))
+        if font is None:
+            try:
+                font = ImageFont.truetype(str(self.font_dir / f"OpenSans-{weight}.ttf"), size)
+            except OSError:
+                font = ImageFont.load_default()
+            self.fonts[(weight, size)] = font
+        return font
+
+    def preload(self):
+        for weight, sizes in SIZES.items():
+            for size in sizes:
+                self.get(weight, size)
+
+
+# Global instance — one font registry per process (each render worker has its own)
+fonts = FontRegistry()
+
+
+def preload():
+    """Executor initializer: load every configured font before the first job."""
+    fonts.preload()
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_width(text: str, weight: str = "Bold", size: int = 24) -> float:
+    """Same as ImageDraw.textlength, memoised."""
+    return fonts.get(weight, size).getlength(text)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_mask(text: str, weight: str = "Bold", size: int = 24) -> tuple[Image.Image, tuple[int, int]]:
+    """`text` rasterised once into an L mask, plus its offset from the draw origin."""
+    font = fonts.get(weight, size)
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new("L", (max(1, int(right - left)), max(1, int(bottom - top))), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    return mask, (int(left), int(top))
+
+
+def text(img: Image.Image, xy: tuple[float, float], text: str, weight: str = "Bold", size: int = 24, fill=(255, 255, 255)):
+    """Stamp `text` onto `img` at `xy` (top-left origin, as ImageDraw.text) from the mask cache."""
+    if not text:
+        return
+    mask, (dx, dy) = text_mask(text, weight, size)
+    img.paste(fill, (round(xy[0]) + dx, round(xy[1]) + dy), mask)
+
+
+def fit(text: str, max_width: float, weight: str = "Bold", size: int = 24) -> str:
+    """Trim `text` with "..." until it fits in `max_width` pixels."""
+    while text_width(text, weight, size) > max_width and len(text) > 4:
+        text = text[:-4] + "..."
+    return text
+
+
+def cache_info() -> dict:
+    """Font and text cache counters for this process (each render worker keeps its own)."""
+    return {"fonts": len(fonts.fonts), "width": text_width.cache_info()._asdict(), "mask": text_mask.cache_info()._asdict()}
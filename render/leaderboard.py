@@ -0,0 +1,98 @@
+"""
+Leaderboard page drawing. Pure functions of picklable inputs, run by render.pool.
+"""
+from PIL import Image, ImageDraw
+from render import fonts
+from render.encoders import get_profile
+
+AVATAR_SIZE = 50
+RENDER_VERSION = 1  # bump when the drawing changes; part of every page cache key
+
+
+def truncate_name(name, max_length=18):
+    """Truncate long names with ellipsis"""
+    return name if len(name) <= max_length else name[:max_length - 3] + "..."
+
+
+def draw_leaderboard(data: list[tuple], label: str | None = None) -> Image.Image:
+    """
+    Compose one leaderboard page.
+    `data` rows are (rank, name, level, xp, avatar tile or None); everything is
+    plain and picklable so this can run in a render worker process.
+    """
+    # Config
+    ROW_HEIGHT = 80
+    IMAGE_WIDTH = 800
+    MARGIN = 10
+    FONT_SIZE = 24
+
+    # Colors
+    BACKGROUND = (44, 47, 51)
+    TEXT_COLOR = (255, 255, 255)
+    DIVIDER = (60, 60, 60)
+    RANK_COLORS = {
+        1: (255, 215, 0),    # Gold
+        2: (192, 192, 192),  # Silver
+        3: (205, 127, 50),   # Bronze
+    }
+
+    image_height = len(data) * (ROW_HEIGHT + MARGIN) + MARGIN
+    img = Image.new("RGB", (IMAGE_WIDTH, image_height), color=BACKGROUND)
+    draw = ImageDraw.Draw(img)
+
+    for i, (rank, username, level, xp, avatar_tile) in enumerate(data):
+        top = MARGIN + i * (ROW_HEIGHT + MARGIN)
+        left = MARGIN
+
+        # Draw avatar (already cropped and sized by the avatar cache)
+        if avatar_tile is not None:
+            img.paste(avatar_tile, (left, top), avatar_tile)
+
+        # Truncate username
+        username_trunc = truncate_name(username)
+
+        # Rank color (gold/silver/bronze for top 3)
+        rank_color = RANK_COLORS.get(rank, TEXT_COLOR)
+
+        # Draw rank
+        rank_text = f"#{rank}"
+        text_x = left + AVATAR_SIZE + MARGIN
+        text_y = top + 10
+        fonts.text(img, (text_x, text_y), rank_text, size=FONT_SIZE, fill=rank_color)
+
+        # Draw username
+        rank_width = fonts.text_width(rank_text, size=FONT_SIZE)
+        name_x = text_x + rank_width + 8
+        fonts.text(img, (name_x, text_y), f"• {username_trunc}", size=FONT_SIZE, fill=TEXT_COLOR)
+
+        # Right side: Level and XP
+        level_label = label or "Level"
+        level_text = f"{level_label} {level}"
+        xp_text = f"XP {xp:,}" if xp != 0 else ""
+
+        level_width = fonts.text_width(level_text, size=FONT_SIZE)
+        xp_width = fonts.text_width(xp_text, size=FONT_SIZE)
+        right_width = max(level_width, xp_width)
+
+        right_x = IMAGE_WIDTH - MARGIN - right_width
+        level_y = top + 5
+        xp_y = level_y + FONT_SIZE + 2
+
+        fonts.text(img, (right_x, level_y), level_text, size=FONT_SIZE, fill=TEXT_COLOR)
+        fonts.text(img, (right_x, xp_y), xp_text, size=FONT_SIZE, fill=TEXT_COLOR)
+
+        # Divider line
+        if i < len(data) - 1:  # Don't draw after last item
+            line_y = top + ROW_HEIGHT + 2
+            draw.line(
+                [(MARGIN, line_y), (IMAGE_WIDTH - MARGIN, line_y)],
+                fill=DIVIDER,
+                width=1
+            )
+
+    return img
+
+
+def leaderboard_image(data: list[tuple], label: str | None = None, encoder: str | None = None) -> bytes:
+    """Draw and encode a page in one call, so only bytes come back from the worker."""
+    return get_profile(encoder).encode(draw_leaderboard(data, label))
@@ -0,0 +1,65 @@
+"""
+Bounded cache of encoded leaderboard pages.
+"""
+import hashlib
+from collections import OrderedDict
+from settings import PAGE_CACHE_MAX_BYTES
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Keys are (RENDER_VERSION, digest of what's drawn on the page): rank, name,
+# level/score, xp and avatar hash per row, plus the label and encoder profile.
+# A score change, rename or new avatar changes the digest, so stale pages are
+# never served, they just stop being asked for and age out (LRU, bounded by
+# bytes). Bump RENDER_VERSION in render/leaderboard.py whenever the drawing changes.
+# ============================================================================ #
+
+
+def page_key(version: int, rows: list[tuple], label: str | None = None, encoder: str | None = None) -> tuple[int, str]:
+    digest = hashlib.blake2b(repr((label, encoder, rows)).encode(), digest_size=16).hexdigest()
+    return version, digest
+
+
+class PageCache:
+    def __init__(self, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.pages: OrderedDict[tuple[int, str], bytes] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[int, str]) -> bytes | None:
+        data = self.pages.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.pages.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: tuple[int, str], data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self.pages.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self.pages[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, evicted = self.pages.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pages": len(self.pages),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global instance — one page cache per bot process
+page_cache = PageCache()
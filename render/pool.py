@@ -0,0 +1,102 @@
+"""
+Runs PIL composition/encoding off the event loop.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable
+from handle import handler
+from render import fonts
+from settings import RENDER_EXECUTOR, RENDER_WORKERS, RENDER_MAX_CONCURRENT
+
+# ============================================================================ #
+#                                     NOTES                                    #
+# ============================================================================ #
+# Drawing a page and PNG-optimising it holds the GIL for tens of ms, which on
+# the bot's loop stalls the gateway heartbeat and every other command. Jobs are
+# module-level functions of picklable arguments (rows + avatar tiles) that
+# return bytes, run in a ProcessPoolExecutor (RENDER_EXECUTOR=thread swaps in
+# threads, e.g. where spawning processes isn't allowed).
+# At most RENDER_MAX_CONCURRENT jobs are handed to the executor at once; the
+# rest wait on a semaphore, and that wait is what `queue_time` measures.
+# ============================================================================ #
+
+
+@dataclass
+class RenderStats:
+    jobs: int = 0
+    failed: int = 0
+    queued: int = 0             # currently waiting for a slot
+    queue_time_total: float = 0.0
+    queue_time_max: float = 0.0
+    render_time_total: float = 0.0
+
+    def summary(self) -> str:
+        done = self.jobs or 1
+        return (
+            f"jobs={self.jobs} failed={self.failed} queued={self.queued} "
+            f"avg_queue={self.queue_time_total / done * 1000:.1f}ms max_queue={self.queue_time_max * 1000:.1f}ms "
+            f"avg_render={self.render_time_total / done * 1000:.1f}ms"
+        )
+
+
+class RenderService:
+    def __init__(self, workers: int = RENDER_WORKERS, max_concurrent: int = RENDER_MAX_CONCURRENT, kind: str = RENDER_EXECUTOR):
+        self.workers = workers
+        self.kind = kind
+        self.stats = RenderStats()
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render", initializer=fonts.preload)
+            else:
+                # spawn: forking a process that runs an event loop and a DB pool isn't safe
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=fonts.preload)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run `fn(*args)` in the pool once a slot is free."""
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        self.stats.queued += 1
+        async with self._semaphore:
+            self.stats.queued -= 1
+            waited = time.monotonic() - queued_at
+            self.stats.queue_time_total += waited
+            self.stats.queue_time_max = max(self.stats.queue_time_max, waited)
+
+            started = time.monotonic()
+            executor = self.executor
+            try:
+                try:
+                    return await loop.run_in_executor(executor, fn, *args)
+                except BrokenProcessPool:
+                    # a worker died (OOM, killed); start a fresh pool and retry once
+                    if self._executor is executor:
+                        handler.log_task(context="RENDER", message="[RENDER] Process pool broke, restarting it", level="Warning")
+                        executor.shutdown(wait=False)
+                        self._executor = None
+                    return await loop.run_in_executor(self.executor, fn, *args)
+            except Exception:
+                self.stats.failed += 1
+                raise
+            finally:
+                self.stats.jobs += 1
+                self.stats.render_time_total += time.monotonic() - started
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            handler.log_task(context="RENDER", message=f"[RENDER] Pool stopped: {self.stats.summary()}", level="Info")
+
+
+# Global instance — one render pool per bot process
+render_service = RenderService()
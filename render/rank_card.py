@@ -0,0 +1,78 @@
+"""
+/level_self rank card drawing. Pure functions of picklable inputs, run by render.pool.
+"""
+from functools import lru_cache
+from PIL import Image, ImageDraw
+from render import fonts
+from render.encoders import get_profile
+from settings import IMGS_DIR
+
+AVATAR_SIZE = 128
+CARD_VERSION = 1   # bump when the drawing changes; part of every card cache key
+XP_BUCKETS = 50    # progress bar steps; cards are cached per bucket, not per XP point
+
+TEXT_COLOR = (255, 255, 255)
+MUTED = (185, 187, 190)
+BAR_BACK = (72, 75, 81)
+BAR_FILL = (155, 89, 182)  # discord.Color.purple(), same as the old embed
+
+
+@lru_cache(maxsize=1)
+def background() -> Image.Image:
+    """imgs/darkbg.png, decoded once per worker process."""
+    return Image.open(IMGS_DIR / "darkbg.png").convert("RGBA")
+
+
+def xp_bucket(xp: int, needed: int) -> int:
+    """How many of XP_BUCKETS bar steps `xp` out of `needed` fills."""
+    if needed <= 0:
+        return XP_BUCKETS
+    return min(XP_BUCKETS, max(0, xp * XP_BUCKETS // needed))
+
+
+def draw_rank_card(name: str, rank: int | None, level: int, bucket: int, avatar_tile: Image.Image | None = None) -> Image.Image:
+    """
+    Compose a rank card on the background template.
+    The bar is drawn from `bucket` (see xp_bucket) so one image serves every
+    XP value inside a bucket; the exact numbers go in the embed text.
+    """
+    card = background().copy()
+    draw = ImageDraw.Draw(card)
+    width, height = card.size
+    margin = 40
+
+    # Avatar, vertically centred on the left
+    avatar_top = (height - AVATAR_SIZE) // 2
+    if avatar_tile is not None:
+        card.paste(avatar_tile, (margin, avatar_top), avatar_tile)
+    text_x = margin + AVATAR_SIZE + 30
+
+    # Rank / level, right aligned on the top line
+    level_text = f"LEVEL {level}"
+    right = width - margin
+    level_w = fonts.text_width(level_text, "Bold", 40)
+    fonts.text(card, (right - level_w, avatar_top - 10), level_text, "Bold", 40, fill=BAR_FILL)
+    if rank:
+        rank_text = f"RANK #{rank}"
+        rank_w = fonts.text_width(rank_text, "Bold", 40)
+        fonts.text(card, (right - level_w - 24 - rank_w, avatar_top - 10), rank_text, "Bold", 40, fill=TEXT_COLOR)
+
+    # Name
+    name = fonts.fit(name, right - text_x, "Bold", 34)
+    fonts.text(card, (text_x, avatar_top + 45), name, "Bold", 34, fill=TEXT_COLOR)
+
+    # Progress bar toward the next level
+    bar_top = avatar_top + AVATAR_SIZE - 34
+    bar_h = 30
+    draw.rounded_rectangle((text_x, bar_top, right, bar_top + bar_h), radius=bar_h // 2, fill=BAR_BACK)
+    filled = int((right - text_x) * bucket / XP_BUCKETS)
+    if filled >= bar_h:
+        draw.rounded_rectangle((text_x, bar_top, text_x + filled, bar_top + bar_h), radius=bar_h // 2, fill=BAR_FILL)
+    fonts.text(card, (text_x, bar_top + bar_h + 8), f"{bucket * 100 // XP_BUCKETS}% to level {level + 1}", "SemiBold", 22, fill=MUTED)
+
+    return card
+
+
+def rank_card_image(name: str, rank: int | None, level: int, bucket: int, avatar_tile: Image.Image | None = None, encoder: str | None = None) -> bytes:
+    """Draw and encode a card in one call, so only bytes come back from the worker."""
+    return get_profile(encoder).encode(draw_rank_card(name, rank, level, bucket, avatar_tile))
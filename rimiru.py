@@ -1,6 +1,7 @@
 """
 Look am anime lover, I legit have a rimuru wallpaper in my room ok?  Don't judge me.
 """
+import asyncio
 import json
 import asyncpg
 import ssl
@@ -47,6 +48,14 @@ class Rimiru:
         cls._instance = cls(cls._pool)
         return cls._instance
 
+    @classmethod
+    async def close(cls):
+        """Close the shared pool (used by long-running scripts on shutdown)."""
+        if cls._pool is not None:
+            await cls._pool.close()
+        cls._pool = None # type: ignore
+        cls._instance = None
+
     # ----------------------------------------------------
     # TRANSACTION HELPER
     # ----------------------------------------------------
@@ -64,7 +73,7 @@ class Rimiru:
     # ----------------------------------------------------
     async def select(self, table: str, columns: list|None = None, filters: dict|None = None, 
                 raw_where: str|None = None, raw_params: list|None = None,
-                order_by: str|None = None, limit: int|None = None) -> list[dict]:
+                order_by: str|None = None, limit: int|None = None, offset: int|None = None) -> list[dict]:
         """
         Select records with optional filtering
         
@@ -75,6 +84,7 @@ class Rimiru:
         :param raw_params: Parameters for raw_where clause
         :param order_by: Column to order by
         :param limit: Maximum number of records to return
+        :param offset: Number of records to skip first
         """
         cols = ", ".join(columns) if columns else "*"
         sql = f"SELECT {cols} FROM {table}"
@@ -101,7 +111,10 @@ class Rimiru:
             sql += f" ORDER BY {order_by}"
         
         if limit:
-            sql += f" LIMIT {limit}"
+            sql += f" LIMIT {int(limit)}"
+
+        if offset:
+            sql += f" OFFSET {int(offset)}"
         
         sql += ";"
         
@@ -109,6 +122,26 @@ class Rimiru:
             rows = await conn.fetch(sql, *params)
             return [dict(r) for r in rows]
 
+    async def stream(self, table: str, columns: list|None = None, raw_where: str|None = None,
+                     raw_params: list|None = None, order_by: str|None = None, prefetch: int = 5000):
+        """
+        Async-iterate a large result set through a server-side cursor, `prefetch`
+        rows per round trip, instead of materialising it like `select`.
+
+            async for row in db.stream("user_media", ["user_id", "media_id"]):
+                ...
+        """
+        cols = ", ".join(columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {table}"
+        if raw_where:
+            sql += f" WHERE {raw_where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor(sql, *(raw_params or []), prefetch=prefetch):
+                    yield record
+
     async def selectOne(self, table: str, columns: list|None = None, filters: dict|None = None, order_by: str|None = None):
         """
         Select a single record with optional filtering
@@ -121,6 +154,41 @@ class Rimiru:
         row = await self.select(table, columns, filters, order_by, limit=1)
         return row[0] if row else None
    
+    # -------------------------
+    # INSERT / UPDATE
+    # -------------------------
+    async def insert(self, table: str, data: dict) -> dict|None:
+        """Insert a record and return it (including generated columns such as ids)."""
+        columns = list(data.keys())
+        values = [json.dumps(v) if isinstance(v, (dict, list)) else v for v in data.values()]
+        placeholders = ", ".join(f"${i+1}" for i in range(len(values)))
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING *;"
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(sql, *values)
+            return dict(row) if row else None
+
+    async def update(self, table: str, data: dict, filters: dict|None = None,
+                     raw_where: str|None = None, raw_params: list|None = None) -> int:
+        """
+        Update records matching filters / raw_where and return how many changed.
+        raw_where placeholders are numbered after the SET and filter values.
+        """
+        values = [json.dumps(v) if isinstance(v, (dict, list)) else v for v in data.values()]
+        set_clause = ", ".join(f"{k} = ${i+1}" for i, k in enumerate(data.keys()))
+        where = []
+        for key, value in (filters or {}).items():
+            values.append(value)
+            where.append(f"{key} = ${len(values)}")
+        if raw_where:
+            where.append(f"({raw_where})")
+            values.extend(raw_params or [])
+        sql = f"UPDATE {table} SET {set_clause}"
+        if where:
+            sql += f" WHERE {' AND '.join(where)}"
+        async with self.pool.acquire() as conn:
+            status = await conn.execute(sql + ";", *values)
+            return int(status.split()[-1])
+
     # -------------------------
     # UPSERT (INSERT or UPDATE)
     # -------------------------
@@ -159,6 +227,91 @@ class Rimiru:
         except Exception as e:
             print(f"Error during upsert into {table}: {e}")
             raise
+
+    # -------------------------
+    # BULK WRITES
+    # -------------------------
+    async def bulk_upsert(self, table: str, rows: list[dict], conflict_column: str):
+        """Upsert many rows with one prepared statement (executemany).
+            All rows must share the same keys.
+
+                parameters:
+                    :param table: Table name
+                    :param rows: List of column-value dictionaries
+                    :param conflict_column: Column name(s) of the unique constraint
+            """
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        placeholders = ", ".join(f"${i+1}" for i in range(len(columns)))
+        update_cols = ", ".join(f"{k} = EXCLUDED.{k}" for k in columns if k not in conflict_column.replace(" ", "").split(","))
+        sql = f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES ({placeholders})
+            ON CONFLICT ({conflict_column})
+            DO UPDATE SET {update_cols};
+        """
+        records = [
+            [json.dumps(v) if isinstance(v, (dict, list)) else v for v in (row[c] for c in columns)]
+            for row in rows
+        ]
+        async with self.pool.acquire() as conn:
+            await conn.executemany(sql, records)
+
+    async def copy_upsert(self, table: str, rows: list[dict], conflict_column: str, on_conflict: str | None = None,
+                          replace_where: str | None = None, replace_params: list | None = None) -> int:
+        """Bulk upsert through COPY: rows are copied into a temp staging table, then
+            merged with one INSERT ... ON CONFLICT. Much faster than executemany for
+            large batches. Rows must share keys and be unique on conflict_column.
+
+                parameters:
+                    :param table: Table name
+                    :param rows: List of column-value dictionaries
+                    :param conflict_column: Column name(s) of the unique constraint
+                    :param on_conflict: Action replacing the default "DO UPDATE SET <every column> = EXCLUDED.<column>",
+                        e.g. "DO NOTHING" or a DO UPDATE SET that merges with the existing row
+                    :param replace_where: Raw WHERE clause of rows to delete first, in the same
+                        transaction, so readers never see the table between delete and insert
+                    :param replace_params: Parameters for replace_where
+                returns the number of rows inserted or updated
+            """
+        if not rows and not replace_where:
+            return 0
+        if not rows:
+            await self.delete_where(table, replace_where, replace_params) # type: ignore
+            return 0
+        columns = list(rows[0].keys())
+        cols = ", ".join(columns)
+        staging = f"_{table}_staging"
+        update_cols = ", ".join(f"{k} = EXCLUDED.{k}" for k in columns if k not in conflict_column.replace(" ", "").split(","))
+        records = [
+            tuple(json.dumps(v) if isinstance(v, (dict, list)) else v for v in (row[c] for c in columns))
+            for row in rows
+        ]
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if replace_where:
+                    await conn.execute(f"DELETE FROM {table} WHERE {replace_where};", *(replace_params or []))
+                await conn.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA;")
+                await conn.copy_records_to_table(staging, records=records, columns=columns)
+                status = await conn.execute(f"""
+                    INSERT INTO {table} ({cols})
+                    SELECT {cols} FROM {staging}
+                    ON CONFLICT ({conflict_column})
+                    {on_conflict or f"DO UPDATE SET {update_cols}"};
+                """)
+        return int(status.split()[-1])
+
+    async def bulk_delete(self, table: str, rows: list[dict]):
+        """Delete many rows, each matched on all of its column-value pairs."""
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        where_clause = " AND ".join(f"{k} = ${i+1}" for i, k in enumerate(columns))
+        sql = f"DELETE FROM {table} WHERE {where_clause};"
+        async with self.pool.acquire() as conn:
+            await conn.executemany(sql, [[row[c] for c in columns] for row in rows])
+
         # -------------------------
         # DELETE
     # -------------------------
@@ -170,6 +323,74 @@ class Rimiru:
 
         async with self.pool.acquire() as conn:
             return await conn.fetch(sql, *params)
+    async def delete_where(self, table: str, raw_where: str, raw_params: list|None = None) -> int:
+        """Delete records matching a raw WHERE clause and return how many were removed."""
+        async with self.pool.acquire() as conn:
+            status = await conn.execute(f"DELETE FROM {table} WHERE {raw_where};", *(raw_params or []))
+            return int(status.split()[-1])
+    # ----------------------------------------------------
+    # LISTEN / NOTIFY
+    # ----------------------------------------------------
+    async def notify(self, channel: str, payload: str = ""):
+        """Send a Postgres NOTIFY so other processes (bot <-> updater) can react."""
+        async with self.pool.acquire() as conn:
+            await conn.execute("SELECT pg_notify($1, $2);", channel, payload)
+
+    async def listen(self, channel: str, callback, on_reconnect=None) -> "Subscription":
+        """
+        Subscribe `callback(connection, pid, channel, payload)` to a channel.
+        Holds a dedicated pool connection. If that connection drops, the LISTEN is
+        re-established on a fresh one and `on_reconnect()` is called, since any
+        notifications sent in between are lost. Returns a handle for `unlisten`.
+        """
+        sub = Subscription(channel, callback, on_reconnect)
+        await self._subscribe(sub)
+        return sub
+
+    async def _subscribe(self, sub: "Subscription"):
+        conn = await self.pool.acquire()
+        try:
+            await conn.add_listener(sub.channel, sub.callback)
+        except BaseException:
+            await self.pool.release(conn)
+            raise
+        # the callback is handed the raw connection, not the pool proxy we hold
+        conn.add_termination_listener(lambda _: self._on_listener_lost(sub, conn))
+        sub.conn = conn
+
+    def _on_listener_lost(self, sub: "Subscription", dead):
+        if sub.closed or sub.conn is not dead or self.pool.is_closing():
+            return
+        sub.conn = None
+        sub.task = asyncio.get_running_loop().create_task(self._resubscribe(sub, dead))
+
+    async def _resubscribe(self, sub: "Subscription", dead, retry: float = 5.0):
+        try:
+            await self.pool.release(dead)
+        except Exception:
+            pass
+        while not sub.closed and not self.pool.is_closing():
+            try:
+                await self._subscribe(sub)
+                break
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError, asyncio.TimeoutError):
+                await asyncio.sleep(retry)
+                retry = min(retry * 2, 60.0)
+        else:
+            return
+        if sub.on_reconnect:
+            sub.on_reconnect()
+
+    async def unlisten(self, sub: "Subscription", channel: str | None = None, callback=None):
+        sub.closed = True
+        conn, sub.conn = sub.conn, None
+        if conn is None:
+            return
+        try:
+            await conn.remove_listener(sub.channel, sub.callback)
+        finally:
+            await self.pool.release(conn)
+
     # ----------------------------------------------------
     # ASYNC FUNCTION CALLS
     # ----------------------------------------------------
@@ -200,4 +421,17 @@ class Rimiru:
 
 
  
-       
\ No newline at end of file
+       
+
+
+class Subscription:
+    """A LISTEN held by Rimiru.listen; `conn` is swapped when it reconnects."""
+    __slots__ = ("channel", "callback", "on_reconnect", "conn", "closed", "task")
+
+    def __init__(self, channel: str, callback, on_reconnect=None):
+        self.channel = channel
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self.conn = None
+        self.closed = False
+        self.task: asyncio.Task | None = None
@@ -34,6 +34,7 @@ X_ACCESS_TOKEN = os.getenv("X_ACCESS_TOKEN")
 X_ACCESS_SECRET = os.getenv("X_ACCESS_SECRET")
 MOVIE_BASE_URL = os.getenv("MOVIE_BASE_URL")
 MOVIE_API_KEY = os.getenv("MOVIE_API_KEY")
+TMDB_FULL_SWEEP_DAYS = int(os.getenv("TMDB_FULL_SWEEP_DAYS", "7"))  # fallback full refresh for incremental sync
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 SPOTIFY_REDIRECT_URI = os.getenv("SPOTIFY_REDIRECT_URI")
@@ -48,6 +49,62 @@ PGPASSWORD = os.getenv("PGPASSWORD")
 PGDATABASE = os.getenv("PGDATABASE")
 SQLITE_DATA_DIR = os.getenv("SQLITE_DATA_DIR", "data")
 
+# ---------------------------
+# Media Updater Daemon
+# ---------------------------
+UPDATER_SERIES_INTERVAL = int(os.getenv("UPDATER_SERIES_INTERVAL", "3600"))   # seconds
+UPDATER_MOVIE_INTERVAL = int(os.getenv("UPDATER_MOVIE_INTERVAL", "43200"))    # seconds
+UPDATER_HEALTH_HOST = os.getenv("UPDATER_HEALTH_HOST", "127.0.0.1")
+UPDATER_HEALTH_PORT = int(os.getenv("UPDATER_HEALTH_PORT", "8081"))
+
+# ---------------------------
+# Recommendations
+# ---------------------------
+RECOMMENDER_INTERVAL = int(os.getenv("RECOMMENDER_INTERVAL", "21600"))         # seconds between incremental recomputes
+RECOMMENDER_FULL_SWEEP_DAYS = int(os.getenv("RECOMMENDER_FULL_SWEEP_DAYS", "7"))  # force a full rebuild (catches removed entries)
+RECOMMENDER_TOP_K = int(os.getenv("RECOMMENDER_TOP_K", "20"))                  # neighbours stored per media
+
+# ---------------------------
+# History Import
+# ---------------------------
+IMPORT_TMDB_CONCURRENCY = int(os.getenv("IMPORT_TMDB_CONCURRENCY", "8"))        # parallel TMDB lookups for unresolved titles
+IMPORT_MAX_UPLOAD_BYTES = int(os.getenv("IMPORT_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))  # DM attachment size cap
+
+# ---------------------------
+# Media Notifications
+# ---------------------------
+RELEASE_NOTIFY_HOUR_UTC = int(os.getenv("RELEASE_NOTIFY_HOUR_UTC", "12"))  # hour on release day to DM watchers
+DM_CONCURRENCY_INITIAL = int(os.getenv("DM_CONCURRENCY_INITIAL", "3"))   # starting parallel DM sends
+DM_CONCURRENCY_MAX = int(os.getenv("DM_CONCURRENCY_MAX", "20"))          # AIMD ceiling
+
+# ---------------------------
+# DM Outbox
+# ---------------------------
+OUTBOX_POLL_INTERVAL = int(os.getenv("OUTBOX_POLL_INTERVAL", "15"))  # seconds between outbox scans
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))       # rows claimed per scan
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))     # delivery (or scheduled delete) attempts before giving up on a row
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))  # finished rows are deleted after this long
+OUTBOX_PRUNE_INTERVAL = int(os.getenv("OUTBOX_PRUNE_INTERVAL", "3600"))  # seconds between retention deletes
+DM_CHANNEL_CACHE_SIZE = int(os.getenv("DM_CHANNEL_CACHE_SIZE", "5000"))  # resolved DM channels kept in memory
+
+# ---------------------------
+# Leaderboards
+# ---------------------------
+AVATAR_FETCH_CONCURRENCY = int(os.getenv("AVATAR_FETCH_CONCURRENCY", "8"))  # parallel avatar downloads per process
+AVATAR_FETCH_SIZE = int(os.getenv("AVATAR_FETCH_SIZE", "64"))               # requested CDN size (power of 2)
+AVATAR_CACHE_MAX_BYTES = int(os.getenv("AVATAR_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # decoded avatar tiles kept in memory
+RANK_RECONCILE_INTERVAL = int(os.getenv("RANK_RECONCILE_INTERVAL", "900"))  # seconds between rank index rebuilds from `levels`
+
+# ---------------------------
+# Rendering
+# ---------------------------
+RENDER_EXECUTOR = os.getenv("RENDER_EXECUTOR", "process")                # "process" or "thread"
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))                   # pool size
+RENDER_MAX_CONCURRENT = int(os.getenv("RENDER_MAX_CONCURRENT", "4"))     # jobs handed to the pool at once; the rest queue
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))  # encoded leaderboard pages kept in memory
+RENDER_ENCODER = os.getenv("RENDER_ENCODER", "png-quant")                # profile from render/encoders.py
+RENDER_COMPRESS_LEVEL = int(os.getenv("RENDER_COMPRESS_LEVEL", "6"))     # 0-9, CPU vs size
+
 # ---------------------------
 # Paths
 # ---------------------------
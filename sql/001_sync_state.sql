@@ -0,0 +1,11 @@
+-- ============================================================================ --
+--                                  SYNC STATE                                  --
+-- ============================================================================ --
+-- Small key/value store for background job checkpoints
+-- (e.g. the last TMDB changes-feed sync per media table).
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key        TEXT PRIMARY KEY,
+    value      JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,58 @@
+-- ============================================================================ --
+--                                   EPISODES                                   --
+-- ============================================================================ --
+-- Normalized per-episode rows maintained by MovieManager.sync_series_episodes,
+-- so upcoming-episode lookups are an index range scan on air_date instead of
+-- unpacking the series JSON blobs row by row.
+
+CREATE TABLE IF NOT EXISTS episodes (
+    series_id INT  NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    season    INT  NOT NULL,
+    episode   INT  NOT NULL,
+    air_date  DATE,
+    name      TEXT,
+    PRIMARY KEY (series_id, season, episode)
+);
+
+CREATE INDEX IF NOT EXISTS idx_episodes_air_date ON episodes (air_date, series_id);
+
+
+-- Series (same columns as before) with an episode airing in the next p_days days
+-- that the user is watching or has on their watchlist.
+DROP FUNCTION IF EXISTS get_user_upcoming_episodes(BIGINT, INT);
+CREATE FUNCTION get_user_upcoming_episodes(p_user_id BIGINT, p_days INT)
+RETURNS TABLE (
+    id INT,
+    title TEXT,
+    tmdb_id INT,
+    overview TEXT,
+    poster_path TEXT,
+    status TEXT,
+    homepage TEXT,
+    release_date DATE,
+    first_air_date DATE,
+    last_air_date DATE,
+    number_of_episodes INT,
+    number_of_seasons INT,
+    last_episode_to_air JSONB,
+    next_episode_to_air JSONB,
+    in_production BOOLEAN,
+    seasons JSONB
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.id, m.title, m.tmdb_id, m.overview, m.poster_path, m.status, m.homepage, m.release_date,
+           s.first_air_date, s.last_air_date, s.number_of_episodes, s.number_of_seasons,
+           s.last_episode_to_air, s.next_episode_to_air, s.in_production, s.seasons
+    FROM (
+        SELECT DISTINCT e.series_id
+        FROM episodes e
+        JOIN user_media um ON um.media_id = e.series_id
+        WHERE um.user_id = p_user_id
+          AND um.status IN ('watchlist', 'watching')
+          AND e.air_date BETWEEN CURRENT_DATE AND CURRENT_DATE + p_days
+    ) upcoming
+    JOIN media m  ON m.id = upcoming.series_id
+    JOIN series s ON s.id = upcoming.series_id
+    ORDER BY s.next_episode_to_air->>'air_date';
+$$;
+
@@ -0,0 +1,16 @@
+-- ============================================================================ --
+--                                REMINDER STATE                                --
+-- ============================================================================ --
+-- Last episode each user was told about, per series and reminder kind
+-- ('upcoming' weekly digest, 'release' day-of notification). Used to suppress
+-- re-announcing the same episode after restarts or repeated loop runs.
+
+CREATE TABLE IF NOT EXISTS reminder_state (
+    user_id     BIGINT NOT NULL,
+    series_id   INT    NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+    kind        TEXT   NOT NULL,
+    season      INT    NOT NULL,
+    episode     INT    NOT NULL,
+    notified_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, kind, series_id)
+);
@@ -0,0 +1,32 @@
+-- ============================================================================ --
+--                                   DM OUTBOX                                  --
+-- ============================================================================ --
+-- Every outgoing DM is written here first and delivered by the bot's outbox
+-- worker (dispatch.py), so a crash or restart mid fan-out resumes instead of
+-- dropping the remaining messages.
+--   status: pending -> sent -> deleted (when delete_at passes)
+--           pending -> failed (DMs closed, or OUTBOX_MAX_ATTEMPTS reached)
+-- The worker's scan cursor (lowest id that may still need delivery) is kept
+-- in sync_state under the key 'dm_outbox'.
+
+CREATE TABLE IF NOT EXISTS dm_outbox (
+    id                  BIGSERIAL PRIMARY KEY,
+    user_id             BIGINT      NOT NULL,
+    content             TEXT,
+    embeds              JSONB       NOT NULL DEFAULT '[]',
+    delete_after        INT,                    -- seconds after delivery
+    fallback_channel_id BIGINT,                 -- told about the failure if the user's DMs are closed
+    status              TEXT        NOT NULL DEFAULT 'pending',
+    attempts            INT         NOT NULL DEFAULT 0,
+    last_error          TEXT,
+    next_attempt_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+    channel_id          BIGINT,
+    message_id          BIGINT,
+    delete_at           TIMESTAMPTZ,
+    created_at          TIMESTAMPTZ NOT NULL DEFAULT now(),
+    sent_at             TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS dm_outbox_delete_at_idx
+    ON dm_outbox (delete_at)
+    WHERE delete_at IS NOT NULL;
@@ -0,0 +1,11 @@
+-- ============================================================================ --
+--                                  DM CHANNELS                                 --
+-- ============================================================================ --
+-- DM channel id per user, so the outbox can send through a partial channel
+-- after a restart instead of asking Discord to open the DM again.
+
+CREATE TABLE IF NOT EXISTS dm_channels (
+    user_id    BIGINT PRIMARY KEY,
+    channel_id BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
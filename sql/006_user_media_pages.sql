@@ -0,0 +1,61 @@
+-- ============================================================================ --
+--                               USER MEDIA PAGES                               --
+-- ============================================================================ --
+-- Keyset-paginated user media lists for /all_media, /watchlist and /incomplete.
+-- Rows are ordered newest-first on (last_updated, media_id); pass the last row
+-- of a page as (p_cursor_ts, p_cursor_id) to get the next one, or NULLs for the
+-- first page. total_count is only computed for the first page.
+--   p_statuses   NULL = any status, e.g. '{watchlist}' or '{watchlist,watching}'
+--   p_media_type NULL = both, otherwise media.media_type ('movies' / 'series')
+
+CREATE INDEX IF NOT EXISTS user_media_user_recent_idx
+    ON user_media (user_id, last_updated DESC, media_id DESC);
+
+DROP FUNCTION IF EXISTS get_user_media_page(BIGINT, TEXT[], TEXT, INT, TIMESTAMPTZ, INT);
+CREATE FUNCTION get_user_media_page(
+    p_user_id    BIGINT,
+    p_statuses   TEXT[],
+    p_media_type TEXT,
+    p_limit      INT,
+    p_cursor_ts  TIMESTAMPTZ,
+    p_cursor_id  INT
+)
+RETURNS TABLE (
+    id                INT,
+    media_type        TEXT,
+    title             TEXT,
+    tmdb_id           INT,
+    overview          TEXT,
+    poster_path       TEXT,
+    media_status      TEXT,
+    release_date      DATE,
+    user_status       TEXT,
+    user_progress     JSONB,
+    last_updated      TIMESTAMPTZ,
+    last_episode_info JSONB,
+    next_episode_info JSONB,
+    total_count       BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.id, m.media_type, m.title, m.tmdb_id, m.overview, m.poster_path, m.status,
+           COALESCE(m.release_date, s.first_air_date),
+           um.status, um.progress, um.last_updated,
+           s.last_episode_to_air, s.next_episode_to_air,
+           CASE WHEN p_cursor_ts IS NULL THEN (
+               SELECT count(*)
+               FROM user_media cu
+               JOIN media cm ON cm.id = cu.media_id
+               WHERE cu.user_id = p_user_id
+                 AND (p_statuses IS NULL OR cu.status = ANY(p_statuses))
+                 AND (p_media_type IS NULL OR cm.media_type = p_media_type)
+           ) END
+    FROM user_media um
+    JOIN media m       ON m.id = um.media_id
+    LEFT JOIN series s ON s.id = um.media_id
+    WHERE um.user_id = p_user_id
+      AND (p_statuses IS NULL OR um.status = ANY(p_statuses))
+      AND (p_media_type IS NULL OR m.media_type = p_media_type)
+      AND (p_cursor_ts IS NULL OR (um.last_updated, um.media_id) < (p_cursor_ts, p_cursor_id))
+    ORDER BY um.last_updated DESC, um.media_id DESC
+    LIMIT p_limit;
+$$;
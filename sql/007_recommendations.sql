@@ -0,0 +1,55 @@
+-- ============================================================================ --
+--                                RECOMMENDATIONS                               --
+-- ============================================================================ --
+-- Top-K item-item neighbours precomputed from user_media by
+-- dbmanager/Recommender.py (cosine similarity over who watched what).
+-- /recommend sums the neighbour scores of everything a user has watched.
+
+CREATE TABLE IF NOT EXISTS media_neighbours (
+    media_id     INT  NOT NULL REFERENCES media(id) ON DELETE CASCADE,
+    neighbour_id INT  NOT NULL REFERENCES media(id) ON DELETE CASCADE,
+    score        REAL NOT NULL,
+    PRIMARY KEY (media_id, neighbour_id)
+);
+
+-- incremental recomputes look for watchers changed since the last run
+-- (superseded by changed_at, sql/012_user_media_changed_at.sql, which drops it)
+CREATE INDEX IF NOT EXISTS user_media_last_updated_idx
+    ON user_media (last_updated);
+
+DROP FUNCTION IF EXISTS get_user_recommendations(BIGINT, TEXT, INT);
+CREATE FUNCTION get_user_recommendations(p_user_id BIGINT, p_media_type TEXT, p_limit INT)
+RETURNS TABLE (
+    id           INT,
+    media_type   TEXT,
+    title        TEXT,
+    tmdb_id      INT,
+    overview     TEXT,
+    poster_path  TEXT,
+    release_date DATE,
+    score        REAL,
+    because      TEXT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.id, m.media_type, m.title, m.tmdb_id, m.overview, m.poster_path, m.release_date,
+           ranked.score, ranked.because
+    FROM (
+        SELECT n.neighbour_id,
+               SUM(n.score)::REAL AS score,
+               (array_agg(src.title ORDER BY n.score DESC))[1] AS because
+        FROM user_media um
+        JOIN media_neighbours n ON n.media_id = um.media_id
+        JOIN media src          ON src.id = um.media_id
+        WHERE um.user_id = p_user_id
+          AND um.status IN ('watched', 'watching')
+          AND NOT EXISTS (
+              SELECT 1 FROM user_media seen
+              WHERE seen.user_id = p_user_id AND seen.media_id = n.neighbour_id
+          )
+        GROUP BY n.neighbour_id
+    ) ranked
+    JOIN media m ON m.id = ranked.neighbour_id
+    WHERE p_media_type IS NULL OR m.media_type = p_media_type
+    ORDER BY ranked.score DESC
+    LIMIT p_limit;
+$$;
@@ -0,0 +1,32 @@
+-- ============================================================================ --
+--                                  LEVEL CARD                                  --
+-- ============================================================================ --
+-- XP, level and rank for /level_self in one round trip. Rank uses the same
+-- order as the leaderboard (level DESC, xp DESC): 1 + members strictly ahead,
+-- counted off the index below instead of ranking the whole guild.
+
+CREATE INDEX IF NOT EXISTS levels_guild_rank_idx
+    ON levels (guild_id, level DESC, xp DESC);
+
+DROP FUNCTION IF EXISTS get_user_level_card(BIGINT, BIGINT);
+CREATE FUNCTION get_user_level_card(
+    p_guild_id BIGINT,
+    p_user_id  BIGINT
+)
+RETURNS TABLE (
+    xp    BIGINT,
+    level BIGINT,
+    rank  BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT me.xp, me.level,
+           1 + (
+               SELECT count(*)
+               FROM levels o
+               WHERE o.guild_id = me.guild_id
+                 AND (o.level, o.xp) > (me.level, me.xp)
+           )
+    FROM levels me
+    WHERE me.guild_id = p_guild_id
+      AND me.user_id = p_user_id;
+$$;
@@ -0,0 +1,12 @@
+-- ============================================================================ --
+--                                 LEVEL CURVES                                 --
+-- ============================================================================ --
+-- Optional per-guild XP curve: reaching level L+1 from L costs
+-- int(base_xp * growth_factor ^ (L-1)). Guilds without a row use the default
+-- (100, 1.15). Loaded into leveling_curve.curves at startup.
+
+CREATE TABLE IF NOT EXISTS level_curves (
+    guild_id      BIGINT           PRIMARY KEY,
+    base_xp       INT              NOT NULL CHECK (base_xp > 0),
+    growth_factor DOUBLE PRECISION NOT NULL CHECK (growth_factor >= 1)
+);
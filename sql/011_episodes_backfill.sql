@@ -0,0 +1,81 @@
+-- ============================================================================ --
+--                               EPISODES BACKFILL                              --
+-- ============================================================================ --
+-- 002 moved upcoming-episode lookups onto `episodes`, which only fills as
+-- sync_series_episodes reaches each series. Seed it from the episode objects
+-- already cached on every series, and keep next_episode_to_air as a second
+-- source in get_user_upcoming_episodes so a series that hasn't been synced yet
+-- still shows up. get_series_episode_counts never got a caller (progress
+-- reads season sizes from series.seasons) and is dropped.
+
+DROP FUNCTION IF EXISTS get_series_episode_counts(INT);
+
+INSERT INTO episodes (series_id, season, episode, air_date, name)
+SELECT s.id,
+       (ep->>'season_number')::INT,
+       (ep->>'episode_number')::INT,
+       NULLIF(ep->>'air_date', '')::DATE,
+       ep->>'name'
+FROM series s
+CROSS JOIN LATERAL (VALUES (s.last_episode_to_air), (s.next_episode_to_air)) AS v(ep)
+WHERE jsonb_typeof(ep) = 'object'
+  AND ep->>'season_number' IS NOT NULL
+  AND ep->>'episode_number' IS NOT NULL
+ON CONFLICT (series_id, season, episode) DO NOTHING;
+
+-- the rest of each season, undated, as episode_rows() stores it
+INSERT INTO episodes (series_id, season, episode)
+SELECT s.id, (season->>'season_number')::INT, n
+FROM series s
+CROSS JOIN LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(s.seasons) = 'array' THEN s.seasons ELSE '[]'::JSONB END) AS season
+CROSS JOIN LATERAL generate_series(1, COALESCE((season->>'episode_count')::INT, 0)) AS n
+WHERE COALESCE((season->>'season_number')::INT, 0) > 0
+ON CONFLICT (series_id, season, episode) DO NOTHING;
+
+
+DROP FUNCTION IF EXISTS get_user_upcoming_episodes(BIGINT, INT);
+CREATE FUNCTION get_user_upcoming_episodes(p_user_id BIGINT, p_days INT)
+RETURNS TABLE (
+    id INT,
+    title TEXT,
+    tmdb_id INT,
+    overview TEXT,
+    poster_path TEXT,
+    status TEXT,
+    homepage TEXT,
+    release_date DATE,
+    first_air_date DATE,
+    last_air_date DATE,
+    number_of_episodes INT,
+    number_of_seasons INT,
+    last_episode_to_air JSONB,
+    next_episode_to_air JSONB,
+    in_production BOOLEAN,
+    seasons JSONB
+)
+LANGUAGE sql STABLE AS $$
+    WITH tracked AS (
+        SELECT um.media_id
+        FROM user_media um
+        WHERE um.user_id = p_user_id
+          AND um.status IN ('watchlist', 'watching')
+    ),
+    upcoming AS (
+        SELECT e.series_id
+        FROM episodes e
+        JOIN tracked t ON t.media_id = e.series_id
+        WHERE e.air_date BETWEEN CURRENT_DATE AND CURRENT_DATE + p_days
+        UNION
+        SELECT s.id
+        FROM series s
+        JOIN tracked t ON t.media_id = s.id
+        WHERE NULLIF(s.next_episode_to_air->>'air_date', '')::DATE BETWEEN CURRENT_DATE AND CURRENT_DATE + p_days
+    )
+    SELECT m.id, m.title, m.tmdb_id, m.overview, m.poster_path, m.status, m.homepage, m.release_date,
+           s.first_air_date, s.last_air_date, s.number_of_episodes, s.number_of_seasons,
+           s.last_episode_to_air, s.next_episode_to_air, s.in_production, s.seasons
+    FROM upcoming
+    JOIN media m  ON m.id = upcoming.series_id
+    JOIN series s ON s.id = upcoming.series_id
+    ORDER BY s.next_episode_to_air->>'air_date';
+$$;
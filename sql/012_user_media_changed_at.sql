@@ -0,0 +1,30 @@
+-- ============================================================================ --
+--                            USER MEDIA CHANGED AT                             --
+-- ============================================================================ --
+-- When a user_media row was last written, whatever its last_updated says.
+-- The history importer stores original watch dates in last_updated, so the
+-- recommender's incremental runs (dbmanager/Recommender.py) look for changes
+-- here instead, and 007's index on last_updated, which only they used, is
+-- dropped.
+
+ALTER TABLE user_media
+    ADD COLUMN IF NOT EXISTS changed_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS user_media_changed_at_idx
+    ON user_media (changed_at);
+
+DROP INDEX IF EXISTS user_media_last_updated_idx;
+
+CREATE OR REPLACE FUNCTION user_media_touch_changed_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.changed_at := now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_media_changed_at ON user_media;
+CREATE TRIGGER user_media_changed_at
+    BEFORE INSERT OR UPDATE ON user_media
+    FOR EACH ROW EXECUTE FUNCTION user_media_touch_changed_at();
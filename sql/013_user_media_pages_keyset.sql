@@ -0,0 +1,97 @@
+-- ============================================================================ --
+--                       USER MEDIA PAGES: KEYSET + INCOMPLETE                  --
+-- ============================================================================ --
+-- Fixes to 008:
+--   - last_updated can be NULL. The keyset now sorts and compares on
+--     COALESCE(last_updated, '-infinity'), so those rows come last and are
+--     reachable. p_cursor_id IS NULL (never a real row) marks the first page,
+--     so a cursor taken from a NULL row no longer restarts at page 1.
+--   - p_incomplete narrows to user_media_incomplete(), the one definition of
+--     "incomplete" shared by /incomplete and the incomplete-media reminder:
+--     on the watchlist or being watched, and for series, behind the last
+--     aired episode (or no progress / nothing aired known yet).
+--   - The keyset index is on the same COALESCE expression, so pages are an
+--     index range scan again; 006's index on the raw column can't serve that
+--     ORDER BY and is dropped.
+
+CREATE INDEX IF NOT EXISTS user_media_user_recent_keyset_idx
+    ON user_media (user_id, (COALESCE(last_updated, '-infinity'::timestamptz)) DESC, media_id DESC);
+
+DROP INDEX IF EXISTS user_media_user_recent_idx;
+
+CREATE OR REPLACE FUNCTION user_media_incomplete(
+    p_status       TEXT,
+    p_progress     JSONB,
+    p_media_type   TEXT,
+    p_last_episode JSONB
+)
+RETURNS BOOLEAN
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT btrim(p_status) IN ('watchlist', 'watching')
+       AND (
+           p_media_type <> 'series'
+           OR p_progress IS NULL
+           OR p_last_episode IS NULL
+           OR p_last_episode->>'season_number' IS NULL
+           OR COALESCE(
+                  ((p_progress->>'season')::INT, (p_progress->>'episode')::INT)
+                  < ((p_last_episode->>'season_number')::INT, (p_last_episode->>'episode_number')::INT),
+                  TRUE)
+       );
+$$;
+
+DROP FUNCTION IF EXISTS get_user_media_page(BIGINT, TEXT[], TEXT, INT, TIMESTAMPTZ, INT);
+DROP FUNCTION IF EXISTS get_user_media_page(BIGINT, TEXT[], TEXT, INT, TIMESTAMPTZ, INT, BOOLEAN);
+CREATE FUNCTION get_user_media_page(
+    p_user_id    BIGINT,
+    p_statuses   TEXT[],
+    p_media_type TEXT,
+    p_limit      INT,
+    p_cursor_ts  TIMESTAMPTZ,
+    p_cursor_id  INT,
+    p_incomplete BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    id                INT,
+    media_type        TEXT,
+    title             TEXT,
+    tmdb_id           INT,
+    overview          TEXT,
+    poster_path       TEXT,
+    media_status      TEXT,
+    release_date      DATE,
+    user_status       TEXT,
+    user_progress     JSONB,
+    last_updated      TIMESTAMPTZ,
+    last_episode_info JSONB,
+    next_episode_info JSONB,
+    seasons           JSONB,
+    total_count       BIGINT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.id, m.media_type, m.title, m.tmdb_id, m.overview, m.poster_path, m.status,
+           COALESCE(m.release_date, s.first_air_date),
+           um.status, um.progress, um.last_updated,
+           s.last_episode_to_air, s.next_episode_to_air, s.seasons,
+           CASE WHEN p_cursor_id IS NULL THEN (
+               SELECT count(*)
+               FROM user_media cu
+               JOIN media cm       ON cm.id = cu.media_id
+               LEFT JOIN series cs ON cs.id = cu.media_id
+               WHERE cu.user_id = p_user_id
+                 AND (p_statuses IS NULL OR cu.status = ANY(p_statuses))
+                 AND (p_media_type IS NULL OR cm.media_type = p_media_type)
+                 AND (NOT p_incomplete OR user_media_incomplete(cu.status, cu.progress, cm.media_type, cs.last_episode_to_air))
+           ) END
+    FROM user_media um
+    JOIN media m       ON m.id = um.media_id
+    LEFT JOIN series s ON s.id = um.media_id
+    WHERE um.user_id = p_user_id
+      AND (p_statuses IS NULL OR um.status = ANY(p_statuses))
+      AND (p_media_type IS NULL OR m.media_type = p_media_type)
+      AND (NOT p_incomplete OR user_media_incomplete(um.status, um.progress, m.media_type, s.last_episode_to_air))
+      AND (p_cursor_id IS NULL
+           OR (COALESCE(um.last_updated, '-infinity'::timestamptz), um.media_id) < (COALESCE(p_cursor_ts, '-infinity'::timestamptz), p_cursor_id))
+    ORDER BY COALESCE(um.last_updated, '-infinity'::timestamptz) DESC, um.media_id DESC
+    LIMIT p_limit;
+$$;
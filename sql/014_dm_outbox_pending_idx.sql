@@ -0,0 +1,15 @@
+-- ============================================================================ --
+--                           DM OUTBOX: SCAN + RETENTION                        --
+-- ============================================================================ --
+-- claim_due runs every OUTBOX_POLL_INTERVAL on (status, next_attempt_at, id);
+-- only pending rows are ever claimed, so a partial index keeps that scan the
+-- size of the backlog rather than of the whole history. Finished rows are
+-- pruned by OutboxManager.prune after OUTBOX_RETENTION_DAYS, off the second index.
+
+CREATE INDEX IF NOT EXISTS dm_outbox_pending_due_idx
+    ON dm_outbox (next_attempt_at, id)
+    WHERE status = 'pending';
+
+CREATE INDEX IF NOT EXISTS dm_outbox_finished_created_idx
+    ON dm_outbox (created_at)
+    WHERE status <> 'pending' AND delete_at IS NULL;
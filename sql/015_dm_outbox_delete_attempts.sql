@@ -0,0 +1,10 @@
+-- ============================================================================ --
+--                          DM OUTBOX: DELETE ATTEMPTS                          --
+-- ============================================================================ --
+-- Scheduled deletions that fail with a retryable error (5xx, 429 after the
+-- limiter's own retries) are pushed back with backoff instead of being retried
+-- on every scan. After OUTBOX_MAX_ATTEMPTS the worker stops trying: delete_at
+-- is cleared and the row stays 'sent' with the error in last_error.
+
+ALTER TABLE dm_outbox
+    ADD COLUMN IF NOT EXISTS delete_attempts INT NOT NULL DEFAULT 0;
@@ -1,17 +1,135 @@
 import asyncio
 import argparse
+import signal
+import time
+from datetime import datetime, timezone
+from aiohttp import web
 from dbmanager.MovieManager import MovieManager
+from dbmanager.Recommender import Recommender
+from constants import MediaType
+from handle import handler
+from rimiru import Rimiru
+from settings import UPDATER_SERIES_INTERVAL, UPDATER_MOVIE_INTERVAL, UPDATER_HEALTH_HOST, UPDATER_HEALTH_PORT, RECOMMENDER_INTERVAL
 
-async def main(target: str):
+SHUTDOWN_GRACE = 30  # seconds a running job gets to wind down after SIGTERM
+
+async def main(target: str, incremental: bool = False):
     manager = MovieManager()
-    
-    if target in ("series", "all"):
-        await manager.series_background_updater()
-    if target in ("movies", "all"):
-        await manager.movie_background_updater()
+
+    try:
+        if target in ("series", "all"):
+            if incremental:
+                await manager.incremental_background_updater(MediaType.SERIES)
+            else:
+                await manager.series_background_updater()
+        if target in ("movies", "all"):
+            if incremental:
+                await manager.incremental_background_updater(MediaType.MOVIE)
+            else:
+                await manager.movie_background_updater()
+        if target in ("recommendations", "all"):
+            await Recommender().run()
+    finally:
+        await manager.close()
+
+
+# ============================================================================ #
+#                                 DAEMON MODE                                  #
+# ============================================================================ #
+class UpdaterDaemon:
+    """
+    Keeps one process resident instead of a fresh interpreter per cron tick.
+    Series and movies run on their own intervals (incremental sync), sharing
+    the MovieManager HTTP session and the Rimiru pool, next to the recommendation
+    rebuild. A job that raises is logged and runs again next interval.
+    GET /health reports progress, and "degraded" while a job is failing.
+    On SIGTERM the refresh loops see stop_event between titles and stop
+    there; what they skipped is retried by the next run.
+    """
+
+    def __init__(self, target: str):
+        self.manager = MovieManager()
+        self.recommender = Recommender()
+        self.stop_event = asyncio.Event()
+        self.started_at = time.monotonic()
+        self.jobs: dict[str, dict] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.schedule = []
+        if target in ("series", "all"):
+            self.schedule.append(("series", lambda: self.manager.incremental_background_updater(MediaType.SERIES, self.stop_event), UPDATER_SERIES_INTERVAL))
+        if target in ("movies", "all"):
+            self.schedule.append(("movies", lambda: self.manager.incremental_background_updater(MediaType.MOVIE, self.stop_event), UPDATER_MOVIE_INTERVAL))
+        if target in ("recommendations", "all"):
+            self.schedule.append(("recommendations", self.recommender.run, RECOMMENDER_INTERVAL))
+
+    async def _run_job(self, name: str, job_fn, interval: int):
+        job = self.jobs[name] = {"interval": interval, "runs": 0, "failures": 0, "failing": False, "last_error": None, "last_run": None, "next_run": None}
+        while not self.stop_event.is_set():
+            job["last_run"] = datetime.now(timezone.utc).isoformat()
+            try:
+                await job_fn()
+                job["failing"] = False
+            except Exception as e:
+                handler.error_handle(e, context=f"updater job {name}")
+                job["failures"] += 1
+                job["failing"] = True
+                job["last_error"] = f"{type(e).__name__}: {e}"
+            job["runs"] += 1
+            job["next_run"] = datetime.fromtimestamp(time.time() + interval, timezone.utc).isoformat()
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def health(self, request: web.Request) -> web.Response:
+        if self.stop_event.is_set():
+            status = "stopping"
+        elif any(task.done() for task in self.tasks.values()) or any(job["failing"] for job in self.jobs.values()):
+            status = "degraded"  # a job loop died, or its last run raised
+        else:
+            status = "ok"
+        return web.json_response({
+            "status": status,
+            "uptime": int(time.monotonic() - self.started_at),
+            "jobs": self.jobs,
+            "progress": self.manager.sync_status,
+        })
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop_event.set)
+
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, UPDATER_HEALTH_HOST, UPDATER_HEALTH_PORT).start()
+
+        await Rimiru.shion()  # warm the pool before the first run
+        self.tasks = {name: asyncio.create_task(self._run_job(name, job_fn, interval)) for name, job_fn, interval in self.schedule}
+        handler.log_task(context="UPDATER", message=f"[UPDATER] Daemon started, health on {UPDATER_HEALTH_HOST}:{UPDATER_HEALTH_PORT}", level="Success")
+
+        await self.stop_event.wait()
+        handler.log_task(context="UPDATER", message="[UPDATER] Shutdown requested, waiting for running refreshes", level="Info")
+        done, pending = await asyncio.wait(self.tasks.values(), timeout=SHUTDOWN_GRACE)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        await runner.cleanup()
+        await self.manager.close()
+        await Rimiru.close()
+        handler.log_task(context="UPDATER", message="[UPDATER] Daemon stopped", level="Info")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--target", choices=["series", "movies", "all"], default="all")
+    parser.add_argument("--target", choices=["series", "movies", "recommendations", "all"], default="all")
+    parser.add_argument("--incremental", action="store_true", help="only refetch titles listed in TMDB's changes feed since the last run")
+    parser.add_argument("--daemon", action="store_true", help="stay resident and schedule refreshes internally")
     args = parser.parse_args()
-    asyncio.run(main(args.target))
\ No newline at end of file
+    if args.daemon:
+        asyncio.run(UpdaterDaemon(args.target).run())
+    else:
+        asyncio.run(main(args.target, args.incremental))
@@ -1,232 +1,159 @@
-from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 import discord
-import aiohttp
-from settings import FONT_DIR
-from functools import lru_cache
-
-class LeaderboardPaginationView(discord.ui.View):
-    def __init__(self, data, sep=5, timeout: int | None=180, text=None):
-        super().__init__(timeout=timeout)
-        self.data = data
-        self.sep = sep
-        self.current_page = 1
-        self.message = None
-        self.text = text
-        self._avatar_cache = {}  # Cache downloaded avatars
-        
-    async def on_timeout(self):
-        """Disable buttons when view times out"""
-        for item in self.children:
-            item.disabled = True #type: ignore
-
-        if self.message:
-            try:
-                await self.message.edit(view=self) #type: ignore
-
-            except:
-                pass
-
-    @staticmethod
-    @lru_cache(maxsize=1)
-    def _get_font(size=24):
-        """Cache font loading"""
-        try:
-            return ImageFont.truetype(str(FONT_DIR / "OpenSans-Bold.ttf"), size)
-        except:
-            return ImageFont.load_default()
-
-    @staticmethod
-    def circular_crop(im):
-        """Create circular avatar with antialiasing"""
-        size = im.size
-        mask = Image.new('L', size, 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0) + size, fill=255)
-        output = Image.new("RGBA", size, (0, 0, 0, 0))
-        output.paste(im, (0, 0), mask)
-        return output
-
-    @staticmethod
-    def truncate_name(name, max_length=18):
-        """Truncate long names with ellipsis"""
-        return name if len(name) <= max_length else name[:max_length - 3] + "..."
-
-    async def _download_avatar(self, avatar_url):
-        """Async avatar download with caching"""
-        if avatar_url in self._avatar_cache:
-            return self._avatar_cache[avatar_url]
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(avatar_url) as resp:
-                    if resp.status == 200:
-                        avatar_bytes = await resp.read()
-                        self._avatar_cache[avatar_url] = avatar_bytes
-                        return avatar_bytes
-        except:
-            pass
-        
-        # Return default avatar if download fails
+from constants import gameType
+from dbmanager import Games, LevelinManager
+from render.avatars import avatar_cache
+from render.encoders import get_profile
+from render.leaderboard import AVATAR_SIZE, RENDER_VERSION, leaderboard_image
+from render.page_cache import page_cache, page_key
+from render import rank_card
+from render.pool import render_service
+
+# Leaderboard messages carry no state of their own. Each button's custom_id is
+# lb:{kind}:{guild}:{page}:{slot}, where page is the page the button leads to
+# and slot keeps the four ids on a message distinct. A click is handled by
+# LeaderboardButton (registered with client.add_dynamic_items), which re-queries
+# the rows and renders that page, so buttons keep working after a restart.
+#   kind  levels | levels-{limit} | games | games-{game type}
+# Level pages come straight from the rank index, PAGE_SIZE rows at the page's
+# offset, and the page count from the guild's size there (or `limit`), so
+# every page is reachable and none rebuilds the whole list. Ranks are
+# positions on the full leaderboard; members who left are skipped on the page.
+# Rows are (rank, name, level, xp, avatar) where avatar is the member's
+# display_avatar Asset. Tiles are only fetched for the page being rendered,
+# through the shared avatar cache; drawing happens in the render pool.
+
+PAGE_SIZE = 5
+
+
+def levels_kind(limit: int | None = None) -> str:
+    return f"levels-{max(limit, 1)}" if limit else "levels"
+
+
+def games_kind(game_type: gameType | None = None) -> str:
+    return f"games-{game_type.value}" if game_type else "games"
+
+
+def clamp_page(page: int, total: int) -> tuple[int, int]:
+    """(page, total_pages) with `page` pulled into range."""
+    total_pages = max(1, (total - 1) // PAGE_SIZE + 1)
+    return min(max(page, 1), total_pages), total_pages
+
+
+async def load_page(guild: discord.Guild, kind: str, page: int) -> tuple[list[tuple], str | None, int, int, int]:
+    """
+    Rows of one page for `kind` (members who left are skipped), the score label,
+    the leaderboard size, the page actually shown and the page count.
+    """
+    base, _, arg = kind.partition("-")
+    entries = []
+    if base == "levels":
+        total = await LevelinManager.count_ranked_users(guild.id)
+        if arg.isdigit():
+            total = min(total, int(arg))
+        page, total_pages = clamp_page(page, total)
+        offset = (page - 1) * PAGE_SIZE
+        rows = await LevelinManager.fetch_top_users(guild.id, min(PAGE_SIZE, total - offset), offset) if total else []
+        for idx, data in enumerate(rows, start=offset + 1):
+            member = guild.get_member(data.get("user_id")) #type: ignore
+            if member:
+                entries.append((idx, member.display_name, data.get("level"), data.get("xp"), member.display_avatar))
+        return entries, None, total, page, total_pages
+
+    rows = await Games.get_leaderboard(guild.id, gameType.find_game_type(arg or None))
+    for idx, row in enumerate(rows, start=1):
+        member = guild.get_member(row["user_id"])
+        if member:
+            entries.append((idx, member.display_name, row["total_score"], 0, member.display_avatar))  # rank, username, score, placeholder, avatar asset
+    page, total_pages = clamp_page(page, len(entries))
+    return entries[(page - 1) * PAGE_SIZE:page * PAGE_SIZE], "Score", len(entries), page, total_pages
+
+
+async def render_rows(rows: list[tuple], label: str | None) -> discord.File:
+    """
+    Render one page of rows to an image file, reusing an identical page from the
+    page cache; otherwise fetch its avatar tiles concurrently and draw it in the pool.
+    """
+    profile = get_profile()
+    key = page_key(RENDER_VERSION, [(*row[:4], row[4].key if row[4] else None) for row in rows], label, profile.name)
+    data = page_cache.get(key)
+    if data is None:
+        tiles = await avatar_cache.get_many([row[4] for row in rows], AVATAR_SIZE)
+        data = await render_service.run(leaderboard_image, [(*row[:4], tile) for row, tile in zip(rows, tiles)], label, profile.name)
+        page_cache.put(key, data)
+    return discord.File(BytesIO(data), filename=f"leaderboard.{profile.ext}")
+
+
+async def render_rank_card(member: discord.Member, level: int, xp: int, needed: int, rank: int | None) -> discord.File:
+    """/level_self card, cached per (user, level, xp bucket, rank, name, avatar) in the page cache."""
+    profile = get_profile()
+    bucket = rank_card.xp_bucket(xp, needed)
+    avatar = member.display_avatar
+    key = page_key(rank_card.CARD_VERSION, [(member.id, member.display_name, level, bucket, rank, avatar.key)], "rank_card", profile.name)
+    data = page_cache.get(key)
+    if data is None:
+        tile = await avatar_cache.get(avatar, rank_card.AVATAR_SIZE)
+        data = await render_service.run(rank_card.rank_card_image, member.display_name, rank, level, bucket, tile, profile.name)
+        page_cache.put(key, data)
+    return discord.File(BytesIO(data), filename=f"rank.{profile.ext}")
+
+
+async def build_page(guild: discord.Guild, kind: str, page: int = 1) -> tuple[discord.Embed, discord.File, "LeaderboardPaginationView"] | None:
+    """Everything needed to send or edit a leaderboard message at `page`; None when there are no rows."""
+    rows, label, total, page, total_pages = await load_page(guild, kind, page)
+    if not total:
         return None
 
-    def generate_leaderboard_image(self, data):
-        """Generate leaderboard image from data"""
-        # Config
-        ROW_HEIGHT = 80
-        IMAGE_WIDTH = 800
-        MARGIN = 10
-        AVATAR_SIZE = 50
-        FONT_SIZE = 24
-        
-        # Colors
-        BACKGROUND = (44, 47, 51)
-        TEXT_COLOR = (255, 255, 255)
-        DIVIDER = (60, 60, 60)
-        RANK_COLORS = {
-            1: (255, 215, 0),    # Gold
-            2: (192, 192, 192),  # Silver
-            3: (205, 127, 50),   # Bronze
-        }
-
-        image_height = len(data) * (ROW_HEIGHT + MARGIN) + MARGIN
-        img = Image.new("RGB", (IMAGE_WIDTH, image_height), color=BACKGROUND)
-        draw = ImageDraw.Draw(img)
-        font = self._get_font(FONT_SIZE)
-
-        for i, (rank, username, level, xp, avatar_bytes) in enumerate(data):
-            top = MARGIN + i * (ROW_HEIGHT + MARGIN)
-            left = MARGIN
-
-            # Draw avatar
-            if avatar_bytes:
-                try:
-                    avatar_img = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-                    avatar_img = avatar_img.resize((AVATAR_SIZE, AVATAR_SIZE), Image.Resampling.LANCZOS)
-                    avatar_img = self.circular_crop(avatar_img)
-                    img.paste(avatar_img, (left, top), avatar_img)
-                except:
-                    pass  # Skip if avatar processing fails
-
-            # Truncate username
-            username_trunc = self.truncate_name(username)
-
-            # Rank color (gold/silver/bronze for top 3)
-            rank_color = RANK_COLORS.get(rank, TEXT_COLOR)
-
-            # Draw rank
-            rank_text = f"#{rank}"
-            text_x = left + AVATAR_SIZE + MARGIN
-            text_y = top + 10
-            draw.text((text_x, text_y), rank_text, font=font, fill=rank_color)
-
-            # Draw username
-            rank_width = draw.textlength(rank_text, font=font)
-            name_x = text_x + rank_width + 8
-            draw.text((name_x, text_y), f"• {username_trunc}", font=font, fill=TEXT_COLOR)
-
-            # Right side: Level and XP
-            level_label = self.text or "Level"
-            level_text = f"{level_label} {level}"
-            xp_text = f"XP {xp:,}" if xp != 0 else ""
-
-            level_width = draw.textlength(level_text, font=font)
-            xp_width = draw.textlength(xp_text, font=font)
-            right_width = max(level_width, xp_width)
-
-            right_x = IMAGE_WIDTH - MARGIN - right_width
-            level_y = top + 5
-            xp_y = level_y + FONT_SIZE + 2
-
-            draw.text((right_x, level_y), level_text, font=font, fill=TEXT_COLOR)
-            if xp_text:
-                draw.text((right_x, xp_y), xp_text, font=font, fill=TEXT_COLOR)
-
-            # Divider line
-            if i < len(data) - 1:  # Don't draw after last item
-                line_y = top + ROW_HEIGHT + 2
-                draw.line(
-                    [(MARGIN, line_y), (IMAGE_WIDTH - MARGIN, line_y)],
-                    fill=DIVIDER,
-                    width=1
-                )
-
-        return img
-
-    def get_current_page_data(self):
-        """Get data slice for current page"""
-        start = (self.current_page - 1) * self.sep
-        end = start + self.sep
-        return self.data[start:end]
-
-    def get_total_pages(self):
-        """Calculate total number of pages"""
-        return max(1, (len(self.data) - 1) // self.sep + 1)
-
-    def _update_buttons(self):
-        """Enable/disable buttons based on current page"""
-        total_pages = self.get_total_pages()
-        
-        # Disable first/prev on page 1
-        self.children[0].disabled = self.current_page == 1 #type: ignore
-        self.children[1].disabled = self.current_page == 1 #type: ignore
-        
-        # Disable next/last on final page
-        self.children[2].disabled = self.current_page >= total_pages #type: ignore
-        self.children[3].disabled = self.current_page >= total_pages #type: ignore
-
-    async def update_message(self, interaction: discord.Interaction):
-        """Update the message with new page"""
+    file = await render_rows(rows, label)
+    embed = discord.Embed(
+        title=f"🏆 Leaderboard (Page {page}/{total_pages})",
+        color=discord.Color.gold()
+    )
+    embed.set_image(url=f"attachment://{file.filename}")
+    embed.set_footer(text=f"Showing {len(rows)} of {total} entries")
+    return embed, file, LeaderboardPaginationView(kind, guild.id, page, total_pages)
+
+
+class LeaderboardButton(discord.ui.DynamicItem[discord.ui.Button], template=r"lb:(?P<kind>[a-z0-9-]+):(?P<guild>\d+):(?P<page>\d+):(?P<slot>[a-z]+)"):
+    def __init__(self, kind: str, guild_id: int, page: int, slot: str, label: str = "", style: discord.ButtonStyle = discord.ButtonStyle.secondary, disabled: bool = False):
+        self.kind = kind
+        self.guild_id = guild_id
+        self.page = page
+        super().__init__(discord.ui.Button(
+            label=label,
+            style=style,
+            disabled=disabled,
+            custom_id=f"lb:{kind}:{guild_id}:{page}:{slot}",
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match, /):
+        return cls(match["kind"], int(match["guild"]), int(match["page"]), match["slot"])
+
+    async def callback(self, interaction: discord.Interaction):
+        """Go to the page this button points at"""
         await interaction.response.defer()
-        
-        total_pages = self.get_total_pages()
-        page_data = self.get_current_page_data()
-
-        # Generate image
-        img = self.generate_leaderboard_image(page_data)
-        
-        # Convert to bytes
-        buffer = BytesIO()
-        img.save(buffer, format="PNG", optimize=True)
-        buffer.seek(0)
-
-        # Create Discord file
-        file = discord.File(buffer, filename="leaderboard.png")
-
-        # Create embed
-        embed = discord.Embed(
-            title=f"🏆 Leaderboard (Page {self.current_page}/{total_pages})",
-            color=discord.Color.gold()
-        )
-        embed.set_image(url="attachment://leaderboard.png")
-        embed.set_footer(text=f"Showing {len(page_data)} of {len(self.data)} entries")
-
-        # Update button states
-        self._update_buttons()
-
-        await self.message.edit(embed=embed, attachments=[file], view=self) #type: ignore
-
-
-    @discord.ui.button(label="⏮️", style=discord.ButtonStyle.secondary)
-    async def first_page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Jump to first page"""
-        self.current_page = 1
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="◀️", style=discord.ButtonStyle.primary)
-    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Go to previous page"""
-        self.current_page = max(1, self.current_page - 1)
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="▶️", style=discord.ButtonStyle.primary)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Go to next page"""
-        self.current_page = min(self.get_total_pages(), self.current_page + 1)
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="⏭️", style=discord.ButtonStyle.secondary)
-    async def last_page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Jump to last page"""
-        self.current_page = self.get_total_pages()
-        await self.update_message(interaction)
\ No newline at end of file
+        guild = interaction.guild or interaction.client.get_guild(self.guild_id)
+        if guild is None or guild.id != self.guild_id:
+            return
+        result = await build_page(guild, self.kind, self.page)
+        if result is None:
+            await interaction.edit_original_response(content="No leaderboard available.", embed=None, attachments=[], view=None)
+            return
+        embed, file, view = result
+        await interaction.edit_original_response(embed=embed, attachments=[file], view=view)
+
+
+class LeaderboardPaginationView(discord.ui.View):
+    """⏮️ ◀️ ▶️ ⏭️ for one page; holds nothing once sent."""
+
+    def __init__(self, kind: str, guild_id: int, page: int, total_pages: int):
+        super().__init__(timeout=None)
+        buttons = [
+            ("first", "⏮️", 1, discord.ButtonStyle.secondary, page == 1),
+            ("prev", "◀️", max(1, page - 1), discord.ButtonStyle.primary, page == 1),
+            ("next", "▶️", min(total_pages, page + 1), discord.ButtonStyle.primary, page >= total_pages),
+            ("last", "⏭️", total_pages, discord.ButtonStyle.secondary, page >= total_pages),
+        ]
+        for slot, label, target, style, disabled in buttons:
+            self.add_item(LeaderboardButton(kind, guild_id, target, slot, label=label, style=style, disabled=disabled))
@@ -0,0 +1,52 @@
+# ============================================================================ #
+#                               REMINDER EMBEDS                                #
+# ============================================================================ #
+
+import discord
+
+MAX_EMBEDS_PER_MESSAGE = 10     # Discord hard limit
+MAX_EMBED_CHARS_PER_MESSAGE = 6000  # combined title/description/fields/footer/author text
+
+
+def embed_from_dict(embed_data: dict) -> discord.Embed:
+    """Build an embed from the dicts produced by `UserMedia.to_embed_dict`."""
+    embed = discord.Embed(
+        title=embed_data["title"],
+        description=embed_data.get("description"),
+        color=embed_data["color"]
+    )
+    if embed_data.get("thumbnail"):
+        embed.set_thumbnail(url=embed_data["thumbnail"])
+    for field in embed_data.get("fields", []):
+        embed.add_field(
+            name=field["name"],
+            value=field["value"],
+            inline=field.get("inline", False)
+        )
+    return embed
+
+
+def pack_embeds(
+    embeds: list[discord.Embed],
+    max_embeds: int = MAX_EMBEDS_PER_MESSAGE,
+    max_chars: int = MAX_EMBED_CHARS_PER_MESSAGE,
+) -> list[list[discord.Embed]]:
+    """
+    Split embeds into as few messages as possible while keeping their order.
+    Filling each message until the next embed would break either limit is optimal
+    for an order-preserving split: no packing can end any message later than
+    this one does, so none can use fewer messages.
+    """
+    batches: list[list[discord.Embed]] = []
+    current: list[discord.Embed] = []
+    current_chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) >= max_embeds or current_chars + size > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(embed)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
@@ -6,7 +6,9 @@ import discord
 from handle import handler
 from dbmanager.MovieManager import MovieManager
 movieManager = MovieManager()
-from models import UserMedia
+from models import UserMedia, UserMediaPage
+from progress import episode_label
+from constants import MediaType
 
 class MediaSearchPaginator(discord.ui.View):
     """A Discord UI view with buttons for pagination."""
@@ -237,48 +239,103 @@ def create_selection_embed(media_options: list, media_type: str, query: str) ->
         )
 
 
+def history_field(item: UserMedia) -> tuple[str, str]:
+    """Field for /all_media: progress for series, watched state for movies."""
+    if item.is_series:
+        value = f"Type: {item.user_status.strip()} \n Progress: {item.progress_text or 'Not started'}"
+    else:
+        value = f"Type: {item.user_status.strip()} \n Status:  {'Watched' if item.is_completed else 'Not watched'}"
+    return f"{item.media_type.table_name.title()} • {item.title}", value
+
+
+def watchlist_field(item: UserMedia) -> tuple[str, str]:
+    return f"{item.title} ({item.media_type.table_name})", str(item.release_date or "Unknown date")
+
+
+def incomplete_field(media: UserMedia) -> tuple[str, str]:
+    parts = []
+
+    # Progress / status line
+    if media.is_series:
+        progress = media.progress_text or 'Not started'
+        if media.percent_complete is not None:
+            progress += f" ({media.percent_complete:.0f}%, {media.episodes_remaining} left)"
+        parts.append(f"**Progress:** {progress}")
+        if media.next_unwatched:
+            parts.append(f"**Up next:** {episode_label(media.next_unwatched)}")
+        if media.next_episode_text:
+            parts.append(f"**Next:** {media.next_episode_text}")
+    else:
+        parts.append("✓ Watched" if media.is_completed else "Not watched yet")
+
+    # Media status (Airing / Ended)
+    if media.media_status:
+        parts.append(f"**Status:** {media.media_status}")
+
+    # Overview (trimmed)
+    if media.overview:
+        parts.append(media.overview[:120] + "..." if len(media.overview) > 120 else media.overview)
+
+    return f"{media.media_type.table_name.title()} • {media.title}", "\n".join(parts)
+
+
 class WatchHistoryPaginationView(discord.ui.View):
-    def __init__(self, data: list[UserMedia], sep: int = 10, timeout: int = 60):
+    """
+    Pages through a user's media with keyset queries, one page per request.
+    `cursors[i]` is where page i+1 starts, so going back reuses a known cursor
+    and jumping to the last page (which would need every cursor) isn't offered.
+    """
+
+    def __init__(self, user_id: int, statuses: list[str] | None = None, media_type: MediaType | None = None,
+                 title: str = "Watch History", field_builder=history_field, sep: int = 10, timeout: int = 60, incomplete: bool = False):
         super().__init__(timeout=timeout)
-        self.data = data  # parse once upfront
+        self.user_id = user_id
+        self.statuses = statuses
+        self.incomplete = incomplete
+        self.media_type = media_type
+        self.title = title
+        self.field_builder = field_builder
         self.sep = sep
         self.current_page = 1
+        self.cursors: list = [None]
+        self.page: UserMediaPage | None = None
+        self.total = 0
         self.message = None
 
     # ── helpers ──────────────────────────────────────────────────────────
 
     def get_total_pages(self) -> int:
-        return max(1, (len(self.data) - 1) // self.sep + 1)
+        return max(1, (self.total - 1) // self.sep + 1)
 
-    def get_current_page_data(self) -> list[UserMedia]:
-        start = (self.current_page - 1) * self.sep
-        return self.data[start : start + self.sep]
+    async def load_page(self) -> bool:
+        """Fetch the current page; returns False if the query failed."""
+        page = await movieManager.get_user_media_page(
+            self.user_id, self.statuses, self.media_type, limit=self.sep, cursor=self.cursors[self.current_page - 1],
+            incomplete=self.incomplete,
+        )
+        if page is None:
+            return False
+        self.page = page
+        if page.total is not None:
+            self.total = page.total
+        if page.next_cursor and len(self.cursors) == self.current_page:
+            self.cursors.append(page.next_cursor)
+        self.first_page_button.disabled = self.prev_button.disabled = self.current_page == 1
+        self.next_button.disabled = page.next_cursor is None
+        return True
 
     # ── embed builder ────────────────────────────────────────────────────
 
     def build_embed(self) -> discord.Embed:
-        page_data = self.get_current_page_data()
-        total_pages = self.get_total_pages()
-
         embed = discord.Embed(
-            title=f"Watch History — Page {self.current_page}/{total_pages}",
+            title=f"{self.title} — Page {self.current_page}/{self.get_total_pages()}",
+            description=f"{self.total} item(s)",
             color=discord.Color.blurple()
         )
 
-        for item in page_data:
-            # status badge
-         
-            # value line: progress for series, watched state for movies
-            if item.is_series:
-                value = f"Type: {item.user_status.strip()} \n Progress: {item.progress_text or 'Not started'}"
-            else:
-                value = f"Type: {item.user_status.strip()} \n Status:  {'Watched' if item.is_completed else 'Not watched'}"
-
-            embed.add_field(
-                name=f"{item.media_type.table_name.title()} • {item.title}",
-                value=value,
-                inline=False
-            )
+        for idx, item in enumerate(self.page.items if self.page else [], start=(self.current_page - 1) * self.sep + 1):
+            name, value = self.field_builder(item)
+            embed.add_field(name=f"{idx}. {name}", value=value, inline=False)
 
         embed.set_footer(text="Use the buttons below to navigate.")
         return embed
@@ -286,7 +343,11 @@ class WatchHistoryPaginationView(discord.ui.View):
     # ── update helper ────────────────────────────────────────────────────
 
     async def update_message(self, interaction: discord.Interaction):
-        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+        await interaction.response.defer()
+        if not await self.load_page():
+            await interaction.followup.send("Error: Fetching media failed.", ephemeral=True)
+            return
+        await interaction.edit_original_response(embed=self.build_embed(), view=self)
 
     # ── buttons ──────────────────────────────────────────────────────────
 
@@ -303,11 +364,6 @@ class WatchHistoryPaginationView(discord.ui.View):
 
     @discord.ui.button(label=">", style=discord.ButtonStyle.primary)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.current_page < self.get_total_pages():
+        if self.current_page < len(self.cursors):
             self.current_page += 1
         await self.update_message(interaction)
-
-    @discord.ui.button(label=">|", style=discord.ButtonStyle.green)
-    async def last_page_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = self.get_total_pages()
-        await self.update_message(interaction)
\ No newline at end of file